@@ -1,5 +1,8 @@
 from .adapter import ClientDomainAdapter
+from .cache import AgeExperienceCache, PersonCache
 
 __all__ = [
-    'ClientDomainAdapter'
+    'AgeExperienceCache',
+    'ClientDomainAdapter',
+    'PersonCache',
 ]
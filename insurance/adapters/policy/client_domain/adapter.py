@@ -1,19 +1,37 @@
+import typing as t
 from uuid import UUID
 
 from insurances_adapter.objects.v1.exceptions import RequiredSetDriverLicense, WrongDriverLicense
 from insurances_adapter.sdk.client import InsurancesSDK
 
+from insurance.infrastructure.cache import BatchLoader
 from insurance.integrations.policy.person_domain import PersonDomainSDK
+from insurance.integrations.policy.person_domain.exceptions import PersonNotFound
+from insurance.integrations.policy.person_domain.schemas import GetPersonResponse
+
+from .cache import AgeExperienceCache, PersonCache
 
 
 class ClientDomainAdapter:
 
-    def __init__(self, client_sdk: PersonDomainSDK, insurances_sdk: InsurancesSDK):
+    def __init__(self,
+                 client_sdk: PersonDomainSDK,
+                 insurances_sdk: InsurancesSDK,
+                 person_cache: t.Optional[PersonCache] = None,
+                 age_experience_cache: t.Optional[AgeExperienceCache] = None,
+                 batch_persons: bool = False):
         self._client_sdk = client_sdk
         self._insurances_sdk = insurances_sdk
+        self._person_cache = person_cache
+        self._age_experience_cache = age_experience_cache
+        # Persons requested concurrently, e.g. all drivers and the insurer of a policy, are fetched in one request.
+        # Off until the person domain confirms the person endpoint accepts repeated references
+        self._persons: t.Optional[BatchLoader[UUID, GetPersonResponse]] = None
+        if batch_persons:
+            self._persons = BatchLoader(self._load_persons, not_found=lambda reference: PersonNotFound(reference))
 
     async def get_extended_person(self, reference: UUID) -> dict:
-        person = await self._client_sdk.get_client(iin=None, reference=reference)
+        person = await self._get_client(reference)
         if person.driver_license:
             driver_certificate = dict(
                 number=person.driver_license.number,
@@ -21,17 +39,41 @@ class ClientDomainAdapter:
             )
         else:
             driver_certificate = None
-        try:
-            response = await self._insurances_sdk.v1.person.get_person_age_experience_id(
+        if self._age_experience_cache is None:
+            age_experience_id = await self._get_age_experience_id(person.iin, driver_certificate)
+        else:
+            age_experience_id = await self._age_experience_cache.get(
+                lambda: self._get_age_experience_id(person.iin, driver_certificate),
                 iin=person.iin,
                 driver_certificate=driver_certificate
             )
-            age_experience_id = response.age_experience_id
-        except (RequiredSetDriverLicense, WrongDriverLicense):
-            age_experience_id = None
         # При необходжимости сюда может быть добавлен метод get_attributes
         return person.model_dump() | dict(age_experience_id=age_experience_id)
 
     async def get_person(self, reference: UUID) -> dict:
-        person = await self._client_sdk.get_client(iin=None, reference=reference)
+        person = await self._get_client(reference)
         return person.model_dump()
+
+    async def _get_client(self, reference: UUID) -> GetPersonResponse:
+        if self._person_cache is None:
+            return await self._fetch_client(reference)
+        return await self._person_cache.get(lambda: self._fetch_client(reference), reference=reference)
+
+    async def _fetch_client(self, reference: UUID) -> GetPersonResponse:
+        if self._persons is None:
+            return await self._client_sdk.get_client(iin=None, reference=reference)
+        return await self._persons.load(reference)
+
+    async def _load_persons(self, references: t.List[UUID]) -> t.Dict[UUID, GetPersonResponse]:
+        persons = await self._client_sdk.get_clients(references)
+        return {person.reference: person for person in persons}
+
+    async def _get_age_experience_id(self, iin: str, driver_certificate: t.Optional[dict]) -> t.Optional[int]:
+        try:
+            response = await self._insurances_sdk.v1.person.get_person_age_experience_id(
+                iin=iin,
+                driver_certificate=driver_certificate
+            )
+        except (RequiredSetDriverLicense, WrongDriverLicense):
+            return None
+        return response.age_experience_id
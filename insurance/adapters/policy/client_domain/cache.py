@@ -0,0 +1,140 @@
+import asyncio
+import datetime as dt
+import logging
+import typing as t
+from uuid import UUID
+
+from insurance.infrastructure.cache import LRUCache, SingleFlight
+from insurance.infrastructure.redis import RedisCacheClient
+from insurance.integrations.policy.person_domain.schemas import GetPersonResponse
+
+logger = logging.getLogger('person_cache')
+
+PersonKey = t.Tuple[str, str]
+
+
+class PersonCache:
+    """
+    Persons of the person domain by reference and by iin: in-process LRU with ttl in front of an optional
+    redis tier shared by workers. Concurrent misses of the same person share one request
+    """
+
+    def __init__(self, redis: t.Optional[RedisCacheClient] = None, maxsize: int = 1024, ttl: float = 60):
+        self._local: LRUCache[PersonKey, GetPersonResponse] = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._redis = redis
+        self._ttl = ttl
+        self._loads: SingleFlight[PersonKey, GetPersonResponse] = SingleFlight()
+
+    @property
+    def stats(self):
+        return self._local.stats
+
+    async def get(self,
+                  load: t.Callable[[], t.Awaitable[GetPersonResponse]],
+                  reference: t.Optional[UUID] = None,
+                  iin: t.Optional[str] = None) -> GetPersonResponse:
+        key = ('reference', str(reference)) if reference else ('iin', iin)
+        person = self._local.get(key)
+        if person is not None:
+            return person
+        return await self._loads.do(key, lambda: self._load(key, load))
+
+    def invalidate(self, person: GetPersonResponse):
+        for key in self._keys(person):
+            self._local.pop(key)
+
+    async def _load(self, key: PersonKey, load: t.Callable[[], t.Awaitable[GetPersonResponse]]) -> GetPersonResponse:
+        person = await self._get_shared(key)
+        if person is None:
+            person = await load()
+            await self._put_shared(person)
+        for person_key in self._keys(person):
+            self._local.set(person_key, person)
+        return person
+
+    async def _get_shared(self, key: PersonKey) -> t.Optional[GetPersonResponse]:
+        if self._redis is None:
+            return None
+        try:
+            data = await self._redis.get(self._redis_key(key))
+        except Exception:
+            logger.warning('Failed to read person %s from redis', key, exc_info=True)
+            return None
+        return GetPersonResponse.model_validate_json(data) if data is not None else None
+
+    async def _put_shared(self, person: GetPersonResponse):
+        if self._redis is None:
+            return
+        data = person.model_dump_json(by_alias=True)
+        try:
+            await asyncio.gather(*[self._redis.set(self._redis_key(key), data, self._ttl)
+                                   for key in self._keys(person)])
+        except Exception:
+            logger.warning('Failed to store person %s in redis', person.reference, exc_info=True)
+
+    @staticmethod
+    def _keys(person: GetPersonResponse) -> t.List[PersonKey]:
+        keys = [('reference', str(person.reference))]
+        if person.iin:
+            keys.append(('iin', person.iin))
+        return keys
+
+    @staticmethod
+    def _redis_key(key: PersonKey) -> str:
+        return f'person:{key[0]}:{key[1]}'
+
+
+AgeExperienceKey = t.Tuple[str, t.Optional[str], t.Optional[str]]
+
+_NO_AGE_EXPERIENCE = object()
+
+
+class AgeExperienceCache:
+    """
+    age_experience_id by iin and driver licence, it changes only with the licence.
+    No age_experience_id (licence is required or wrong) is remembered for a shorter negative_ttl
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 24 * 60 * 60, negative_ttl: float = 5 * 60):
+        self._local: LRUCache[AgeExperienceKey, t.Any] = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._negative_ttl = negative_ttl
+        self._loads: SingleFlight[AgeExperienceKey, t.Optional[int]] = SingleFlight()
+
+    @property
+    def stats(self):
+        return self._local.stats
+
+    async def get(self,
+                  load: t.Callable[[], t.Awaitable[t.Optional[int]]],
+                  iin: str,
+                  driver_certificate: t.Optional[dict]) -> t.Optional[int]:
+        key = self._key(iin, driver_certificate)
+        age_experience_id = self._local.get(key)
+        if age_experience_id is not None:
+            return None if age_experience_id is _NO_AGE_EXPERIENCE else age_experience_id
+        return await self._loads.do(key, lambda: self._load(key, load))
+
+    async def _load(self, key: AgeExperienceKey, load: t.Callable[[], t.Awaitable[t.Optional[int]]]) -> t.Optional[int]:
+        age_experience_id = await load()
+        if age_experience_id is None:
+            self._local.set(key, _NO_AGE_EXPERIENCE, ttl=self._negative_ttl)
+        else:
+            self._local.set(key, age_experience_id)
+        return age_experience_id
+
+    @classmethod
+    def _key(cls, iin: str, driver_certificate: t.Optional[dict]) -> AgeExperienceKey:
+        if not driver_certificate:
+            return iin, None, None
+        return iin, driver_certificate.get('number'), cls._issue_date(driver_certificate.get('issue_date'))
+
+    @staticmethod
+    def _issue_date(issue_date: t.Union[dt.date, str, None]) -> t.Optional[str]:
+        """
+        Licence issue date comes as a date or as its iso string, both give the same key
+        """
+        if isinstance(issue_date, dt.datetime):
+            issue_date = issue_date.date()
+        if isinstance(issue_date, dt.date):
+            return issue_date.isoformat()
+        return issue_date or None
@@ -1,8 +1,9 @@
 from insurances_adapter.sdk.client import InsurancesSDK
 from insurances_adapter.objects.v1.exceptions.policy import ClientNotVerified
 import base64
+import typing as t
 
-from insurance.adapters.policy.client_domain import ClientDomainAdapter
+from insurance.adapters.policy.client_domain import AgeExperienceCache, ClientDomainAdapter, PersonCache
 from insurance.adapters.policy.insurance_adapter.get_save_policy_payload_strategy import (
     GetSavePolicyCascoLimitPayloadStrategy,
     GetSavePolicyOgpoVtsPayloadStrategy,
@@ -20,9 +21,17 @@ from insurance.integrations.policy.person_domain import PersonDomainSDK
 
 
 class InsuranceAdapter(InsuranceAdapterABC):
-    def __init__(self, insurances_sdk: InsurancesSDK, person_sdk: PersonDomainSDK):
+    def __init__(self,
+                 insurances_sdk: InsurancesSDK,
+                 person_sdk: PersonDomainSDK,
+                 person_cache: t.Optional[PersonCache] = None,
+                 age_experience_cache: t.Optional[AgeExperienceCache] = None,
+                 batch_persons: bool = False):
         self._insurances_sdk = insurances_sdk
-        client_adapter = ClientDomainAdapter(person_sdk, insurances_sdk)
+        client_adapter = ClientDomainAdapter(person_sdk, insurances_sdk,
+                                             person_cache=person_cache,
+                                             age_experience_cache=age_experience_cache,
+                                             batch_persons=batch_persons)
         self._get_save_policy_payload_strategies = {
             ProductTypeEnum.OSGPO_VTS: GetSavePolicyOgpoVtsPayloadStrategy(client_adapter),
             ProductTypeEnum.CASCO_LIMIT: GetSavePolicyCascoLimitPayloadStrategy(client_adapter),
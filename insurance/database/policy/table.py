@@ -99,3 +99,18 @@ PolicyTable = sa.Table(
     sa.Column('updated_time', sa.DateTime(), comment='Время обновления полиса', nullable=False),
     sa.Column('version', sa.SmallInteger(), comment='Версия полиса', nullable=False)
 )
+
+OutboxEventTable = sa.Table(
+    'outbox_event', metadata,
+    sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+    sa.Column('aggregate_reference', UUID(as_uuid=True), comment='Референс полиса', nullable=False),
+    sa.Column('payload', JSONB(), comment='Событие агрегата', nullable=False),
+    sa.Column('created_time', sa.DateTime(), comment='Время создания события', nullable=False,
+              server_default=sa.func.now()),
+    sa.Column('attempts', sa.SmallInteger(), comment='Количество попыток отправки', nullable=False,
+              server_default='0'),
+    sa.Column('locked_until', sa.DateTime(), comment='Время окончания захвата события обработчиком', nullable=True),
+    sa.Column('dead_lettered_time', sa.DateTime(), comment='Время исключения события после исчерпания попыток',
+              nullable=True),
+    sa.Index('outbox_event_aggregate_reference_id_idx', 'aggregate_reference', 'id'),
+)
@@ -3,7 +3,7 @@ from .adapters import (
 )
 from .red_lock import RedLockClientABC
 from .s3_service import S3AdapterABC
-from .repository import PolicyRepositoryABC
+from .repository import PolicyRepositoryABC, PolicyLoadProfile
 from .required_data_facade import PolicyRequiredDataFacadeABC
 
 __all__ = [
@@ -15,5 +15,6 @@ __all__ = [
     'S3AdapterABC',
     'CallbackAdapterABC',
     'PolicyRepositoryABC',
+    'PolicyLoadProfile',
     'PolicyRequiredDataFacadeABC',
 ]
@@ -1,17 +1,51 @@
 import abc
+import typing as t
+from enum import Enum
 from uuid import UUID
 
 from insurance.domains.policy.model import Policy
 
 
+class PolicyLoadProfile(str, Enum):
+    """
+    Часть агрегата, загружаемая из БД: STATUS без структуры и страхователя
+    """
+    FULL = 'full'
+    STATUS = 'status'
+
+
 class PolicyRepositoryABC(abc.ABC):
 
     @abc.abstractmethod
-    async def get(self, reference: UUID) -> Policy:
+    async def get(self, reference: UUID, profile: PolicyLoadProfile = PolicyLoadProfile.FULL) -> Policy:
         """
         Метод для получения полиса из БД
         """
 
+    @abc.abstractmethod
+    async def get_many(self,
+                       references: t.Iterable[UUID],
+                       profile: PolicyLoadProfile = PolicyLoadProfile.FULL) -> t.List[Policy]:
+        """
+        Метод для получения списка полисов из БД одним запросом
+        """
+
+    @abc.abstractmethod
+    async def get_by_insurance_reference(self,
+                                         insurance_reference: str,
+                                         profile: PolicyLoadProfile = PolicyLoadProfile.FULL) -> Policy:
+        """
+        Метод для получения полиса из БД по insurance_reference
+        """
+
+    @abc.abstractmethod
+    async def get_by_global_id(self,
+                               global_id: str,
+                               profile: PolicyLoadProfile = PolicyLoadProfile.FULL) -> Policy:
+        """
+        Метод для получения полиса из БД по global_id
+        """
+
     @abc.abstractmethod
     async def get_reference_by_insurance_reference(self, insurance_reference: str) -> UUID:
         """
@@ -55,7 +55,7 @@ class DownloadPolicyPDFCommand(BaseCommand):
 
 
 class UpdatePolicyStatusCommand(BaseCommand):
-    insurance_reference = fields.String()
+    insurance_reference = fields.String(nullable=True)
     global_id = fields.String(nullable=True)
     event_type = fields.String(nullable=True)
     event_time = fields.Datetime()
@@ -1,6 +1,9 @@
 from .value_objects import (StatusRecord,
                             Period,
                             Structure,
+                            StructureDriver,
+                            StructureVehicle,
+                            StructureLimit,
                             PrevPolicy,
                             InsuranceOffer,
                             StatusInfo,
@@ -25,6 +28,9 @@ __all__ = [
     'StatusRecord',
     'Period',
     'Structure',
+    'StructureDriver',
+    'StructureVehicle',
+    'StructureLimit',
     'PrevPolicy',
     'InsuranceOffer',
     'StatusInfo',
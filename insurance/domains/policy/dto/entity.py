@@ -1,3 +1,4 @@
+import bisect
 from copy import copy
 
 import attr
@@ -11,17 +12,60 @@ from .enums import PolicyStatusEnum, PaymentTypeEnum, ProductTypeEnum, DocumentT
 from .value_objects import Period, StatusRecord, PrevPolicy, Structure
 
 
+class StatusRecordsView(t.Sequence[StatusRecord]):
+    """
+    Read-only view of status records without copying them
+    """
+    __slots__ = ('_records',)
+
+    def __init__(self, records: t.List[StatusRecord]):
+        self._records = records
+
+    def __getitem__(self, index):
+        return self._records[index]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> t.Iterator[StatusRecord]:
+        return iter(self._records)
+
+
 class StatusHistory:
+    """
+    Status records kept in timestamp order. Records are also logged in order of addition,
+    everything after the persisted cursor is yet to be written
+    """
+    __slots__ = ('_records', '_log', '_seen', '_persisted')
 
     def __init__(self, *records: StatusRecord):
-        self._records = set(records)
+        self._records: t.List[StatusRecord] = []
+        self._log: t.List[StatusRecord] = []
+        self._seen: t.Set[StatusRecord] = set()
+        self._persisted = 0
+        for record in records:
+            self._add(record)
+
+    @property
+    def records(self) -> StatusRecordsView:
+        return StatusRecordsView(self._records)
 
     @property
-    def records(self) -> t.List[StatusRecord]:
-        return sorted(tuple(record for record in self._records), key=lambda x: x.timestamp)
+    def new_records(self) -> t.List[StatusRecord]:
+        return self._log[self._persisted:]
 
     def add_record(self, status: PolicyStatusEnum, timestamp: dt.datetime):
-        self._records.add(StatusRecord(status=status, timestamp=timestamp))
+        self._add(StatusRecord(status=status, timestamp=timestamp))
+
+    def mark_persisted(self):
+        self._persisted = len(self._log)
+
+    def _add(self, record: StatusRecord):
+        if record in self._seen:
+            return
+        self._seen.add(record)
+        self._log.append(record)
+        bisect.insort_right(self._records, record, key=lambda item: item.timestamp)
 
 
 class Insurer(BaseModel):
@@ -31,6 +75,8 @@ class Insurer(BaseModel):
 
 
 class Document:
+    __slots__ = ('_reference', '_document_type', '_status', '_is_new', '_is_changed')
+
     _reference: UUID
     _document_type: DocumentType
     _status: DocumentStatus
@@ -39,6 +85,8 @@ class Document:
         self._reference = reference
         self._document_type = document_type
         self._status = status or DocumentStatus.CREATED
+        self._is_new = True
+        self._is_changed = False
 
     @property
     def reference(self) -> UUID:
@@ -64,14 +112,29 @@ class Document:
     def is_canceled(self) -> bool:
         return self._status == DocumentStatus.CANCELED
 
+    @property
+    def has_changes(self) -> bool:
+        return self._is_new or self._is_changed
+
     def set_confirmed_status(self):
-        self._status = DocumentStatus.CONFIRMED
+        self._set_status(DocumentStatus.CONFIRMED)
 
     def set_canceled_status(self):
-        self._status = DocumentStatus.CANCELED
+        self._set_status(DocumentStatus.CANCELED)
+
+    def clear_changes(self):
+        self._is_new = False
+        self._is_changed = False
+
+    def _set_status(self, status: DocumentStatus):
+        if self._status != status:
+            self._status = status
+            self._is_changed = True
 
 
 class DocumentCollection:
+    __slots__ = ('_documents',)
+
     def __init__(self, documents: t.List[Document] = None):
         self._documents: t.List[Document] = documents or []
 
@@ -82,12 +145,32 @@ class DocumentCollection:
     def add_document(self, document: Document):
         self._documents.append(document)
 
+    @property
+    def has_changes(self) -> bool:
+        return any(document.has_changes for document in self._documents)
+
     def get_document_by_type(self, document_type: DocumentType) -> t.Optional[Document]:
         return next((document for document in self._documents
                      if document.document_type == document_type and document.status != DocumentStatus.CANCELED), None)
 
+    def clear_changes(self):
+        for document in self._documents:
+            document.clear_changes()
+
+
+_UNSET = object()
+
 
 class InsuranceState:
+    __slots__ = ('reference', 'begin_date', 'email', 'payment_type', '_status', 'redirect_url', 'insurance_reference',
+                 'global_id', 'status_history', '_document_collection', '_is_new', '_is_changed', '_frozen',
+                 '_collection')
+
+    _TRACKED_FIELDS = frozenset(('begin_date', 'email', 'payment_type', '_status', 'redirect_url',
+                                 'insurance_reference', 'global_id'))
+    _INDEXED_FIELDS = frozenset(('reference', 'begin_date', 'email', 'payment_type', '_status',
+                                 'insurance_reference', 'global_id'))
+
     def __init__(self,
                  begin_date: dt.date,
                  email: t.Optional[str],
@@ -99,6 +182,10 @@ class InsuranceState:
                  status_history: StatusHistory = None,
                  reference: UUID = None,
                  document_collection: DocumentCollection = None):
+        object.__setattr__(self, '_frozen', False)
+        object.__setattr__(self, '_collection', None)
+        self._is_new = True
+        self._is_changed = False
         self.reference = reference or uuid4()
         self.begin_date = begin_date
         self.email = email or ''
@@ -118,6 +205,55 @@ class InsuranceState:
     def document_collection(self):
         return self._document_collection
 
+    @property
+    def is_new(self) -> bool:
+        return self._is_new
+
+    @property
+    def is_changed(self) -> bool:
+        """
+        Row of the insurance state must be written: it is new or one of its fields changed
+        """
+        return self._is_new or self._is_changed
+
+    @property
+    def has_changes(self) -> bool:
+        return self.is_changed or bool(self.status_history.new_records) or self._document_collection.has_changes
+
+    def __setattr__(self, key, value):
+        if self._frozen:
+            raise AttributeError(f'Insurance state snapshot is read-only, can not set {key}')
+        current = getattr(self, key, _UNSET)
+        changed = current is not _UNSET and current != value
+        if key in self._TRACKED_FIELDS and changed:
+            object.__setattr__(self, '_is_changed', True)
+        object.__setattr__(self, key, value)
+        if self._collection is not None and key in self._INDEXED_FIELDS and changed:
+            self._collection.reindex(self)
+
+    def __setstate__(self, state):
+        """
+        Copies restore slots as is, bypassing change tracking and the read-only check
+        """
+        _, slots = state
+        for key, value in slots.items():
+            object.__setattr__(self, key, value)
+
+    def bind_collection(self, collection):
+        """
+        Collection indexing the state, notified when an indexed field changes
+        """
+        object.__setattr__(self, '_collection', collection)
+
+    def freeze(self):
+        self._frozen = True
+
+    def clear_changes(self):
+        self._is_new = False
+        self._is_changed = False
+        self.status_history.mark_persisted()
+        self._document_collection.clear_changes()
+
     def set_status(self, status: PolicyStatusEnum, timestamp: dt.datetime):
         self._status = status
         self.status_history.add_record(status=status, timestamp=timestamp)
@@ -7,7 +7,7 @@ from .exceptions import (InsuranceNotCorrectError,
                          LeadGetOfferError,
                          SavePolicyError,
                          PolicyRequiredData)
-from .repository import PolicyAlreadyUpdatedError
+from .repository import PolicyAlreadyUpdatedError, PolicyDetailsNotLoadedError
 
 
 __all__ = [
@@ -16,6 +16,7 @@ __all__ = [
     'PolicyExpiredError',
     'PolicyNotFoundError',
     'PolicyAlreadyUpdatedError',
+    'PolicyDetailsNotLoadedError',
     'LeadGetOfferError',
     'LeadMustBeFreeze',
     'LeadNotFoundError',
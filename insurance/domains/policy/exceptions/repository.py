@@ -6,3 +6,7 @@ class BaseError(Exception):
 
 class PolicyAlreadyUpdatedError(BaseError):
     pass
+
+
+class PolicyDetailsNotLoadedError(BaseError):
+    pass
@@ -1,4 +1,5 @@
 import datetime as dt
+import functools
 import typing as t
 from uuid import UUID
 from copy import copy, deepcopy
@@ -6,23 +7,37 @@ from copy import copy, deepcopy
 from dddmisc import BaseAggregate
 
 from insurance.domains.policy.dto import (
-    InsuranceNameEnum, Lead, InsuranceOffer, PolicyStatusEnum, PaymentTypeEnum, StatusInfo, Document
+    InsuranceNameEnum, Lead, InsuranceOffer, PaymentTypeEnum, StatusInfo, Document, Structure, Insurer
 )
 from insurance.domains.policy.events.events import UpdatePolicyStatusEvent
 from insurance.domains.policy.exceptions import InsuranceNotCorrectError, LeadMustBeFreeze
 from insurance.domains.policy.model.model_state import PolicyState
 from insurance.domains.policy.model.policy_states import (
-    DraftState, WaitCallbackState, PayedPolicyState, CompletedInInsurancePolicyState, CompletedPolicyState,
-    OperatorErrorPolicyState, RescindedPolicyState, ReissuedPolicyState, RestoredPolicyState,
-    CreateAccrueRewardPolicyState, CancelRetentionRewardPolicyState,
-    ConfirmAccrueRewardPolicyState, CreateRetentionRewardPolicyState,
+    DraftState, WaitCallbackState, CompletedPolicyState, CreateAccrueRewardPolicyState,
+    CancelRetentionRewardPolicyState, ConfirmAccrueRewardPolicyState, CreateRetentionRewardPolicyState,
     ConfirmRetentionRewardPolicyState, CancelAccrueRewardPolicyState
 )
 from insurance.domains.policy.model.product_validators import PolicyProductABC
+from insurance.domains.policy.model.transitions import get_transition
+
+
+def _mutates(method):
+    """
+    Policy method changing the state, the snapshot is dropped and rebuilt on the next read of Policy.state
+    """
+    @functools.wraps(method)
+    def wrapper(self: 'Policy', *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._snapshot = None
+
+    return wrapper
 
 
 class Policy(BaseAggregate):
     _state: PolicyState = None
+    _snapshot: t.Optional[PolicyState] = None
 
     @classmethod
     def create(cls, lead: Lead, offer: InsuranceOffer, insurance: InsuranceNameEnum) -> 'Policy':
@@ -46,19 +61,30 @@ class Policy(BaseAggregate):
 
     @property
     def state(self) -> 'PolicyState':
-        cp_state: PolicyState = copy(self._state)
-        cp_state.insurance_states = deepcopy(self._state.insurance_states)
-        cp_state.actual_insurance_state = cp_state.insurance_states.get_by_reference(
-            self._state.actual_insurance_state.reference
-        )
-        cp_state.status_history = deepcopy(self._state.status_history)
-
-        return cp_state
+        """
+        Read-only snapshot of the state. It is shared between reads and rebuilt only after the policy changes:
+        value fields are shared with the state, insurance states and status history are copied
+        """
+        if self._snapshot is None:
+            cp_state: PolicyState = copy(self._state)
+            cp_state.insurance_states = deepcopy(self._state.insurance_states)
+            cp_state.actual_insurance_state = cp_state.insurance_states.get_by_reference(
+                self._state.actual_insurance_state.reference
+            )
+            cp_state.status_history = deepcopy(self._state.status_history)
+            cp_state.freeze()
+            self._snapshot = cp_state
+
+        return self._snapshot
 
     @property
     def reference(self) -> UUID:
         return self._state.reference
 
+    @property
+    def details_loaded(self) -> bool:
+        return self._state.details_loaded
+
     @property
     def accrue_reward_document(self) -> t.Optional[Document]:
         return self._state.actual_insurance_state.get_accrue_reward_document()
@@ -67,6 +93,7 @@ class Policy(BaseAggregate):
     def retention_reward_document(self) -> t.Optional[Document]:
         return self._state.actual_insurance_state.get_retention_reward_document()
 
+    @_mutates
     def update_policy(self,
                       begin_date: t.Optional[dt.date],
                       email: t.Optional[str],
@@ -75,65 +102,75 @@ class Policy(BaseAggregate):
         draft_state.apply(self._state)
         self._add_events()
 
+    @_mutates
     def set_insurance_info(self, insurance_reference, redirect_url: str):
         WaitCallbackState(insurance_reference=insurance_reference, redirect_url=redirect_url).apply(self._state)
         self._add_events()
 
+    @_mutates
     def update_status(self, status_info: StatusInfo):
-        match status_info.status_type:
-            case PolicyStatusEnum.PAYED:
-                status_state = PayedPolicyState(status_info=status_info)
-            case PolicyStatusEnum.COMPLETED_IN_INSURANCE:
-                status_state = CompletedInInsurancePolicyState(status_info=status_info)
-            case PolicyStatusEnum.OPERATOR_ERROR:
-                status_state = OperatorErrorPolicyState(status_info=status_info)
-            case PolicyStatusEnum.RESCINDED:
-                status_state = RescindedPolicyState(status_info=status_info)
-            case PolicyStatusEnum.REISSUED:
-                status_state = ReissuedPolicyState(status_info=status_info)
-            case PolicyStatusEnum.RESTORED:
-                status_state = RestoredPolicyState(status_info=status_info)
-            case _:
-                raise ValueError(f'Policy unknown status to update. Status: {status_info.status_type}')
-        status_state.apply(self._state)
+        transition = get_transition(self._state.status, status_info.status_type)
+        transition.handler(status_info=status_info, transition=transition).apply(self._state)
         self._add_events()
 
+    @_mutates
     def update_offer(self, offer: InsuranceOffer, insurance_reference: str):
         CompletedPolicyState(offer=offer, insurance_reference=insurance_reference).apply(self._state)
         self._add_events()
 
+    @_mutates
     def set_pdf_downloaded(self):
         self._state.downloaded = True
         self.add_aggregate_event(UpdatePolicyStatusEvent(reference=self.reference, channel_id=self._state.channel))
 
+    @_mutates
     def create_accrue_reward(self, insurance_reference: str, document_reference: UUID):
         state = CreateAccrueRewardPolicyState(insurance_reference=insurance_reference,
                                               document_reference=document_reference)
         state.apply(self._state)
         self._add_events()
 
+    @_mutates
     def cancel_accrue_reward(self, insurance_reference: str):
         state = CancelAccrueRewardPolicyState(insurance_reference=insurance_reference)
         state.apply(self._state)
 
+    @_mutates
     def confirm_accrue_reward(self, insurance_reference: str):
         state = ConfirmAccrueRewardPolicyState(insurance_reference=insurance_reference)
         state.apply(self._state)
 
+    @_mutates
     def create_retention_reward(self, insurance_reference: str, document_reference: UUID):
         state = CreateRetentionRewardPolicyState(insurance_reference=insurance_reference,
                                                  document_reference=document_reference)
         state.apply(self._state)
         self._add_events()
 
+    @_mutates
     def confirm_retention_reward(self, insurance_reference: str):
         state = ConfirmRetentionRewardPolicyState(insurance_reference=insurance_reference)
         state.apply(self._state)
 
+    @_mutates
     def cancel_retention_reward(self, insurance_reference: str):
         state = CancelRetentionRewardPolicyState(insurance_reference=insurance_reference)
         state.apply(self._state)
 
+    @_mutates
+    def attach_details(self, structure: t.List[Structure], insurer: Insurer):
+        """
+        Complete the policy restored without structure and insurer
+        """
+        self._state.attach_details(structure=structure, insurer=insurer)
+
+    @_mutates
+    def clear_changes(self):
+        """
+        Mark current state as persisted
+        """
+        self._state.clear_changes()
+
     def _add_events(self):
         for ev in self._state.get_events():
             self.add_aggregate_event(event=ev)
@@ -11,43 +11,82 @@ from insurance.domains.policy.dto import (
     PolicyStatusEnum, PaymentTypeEnum, InsuranceState, PrevPolicy, PolicyCreator, PolicyLead, Document
 )
 from insurance.domains.policy.events.events import UpdatePolicyStatusEvent
+from insurance.domains.policy.exceptions import PolicyDetailsNotLoadedError
 
 
 class InsuranceStateCollection:
+    """
+    Insurance states with hash indexes for lookups. States report changes of indexed fields
+    through `reindex`, the first added state wins when several share a key
+    """
+    __slots__ = ('_states', '_states_view', '_by_reference', '_by_insurance_reference', '_by_global_id',
+                 '_by_status', '_by_search_key')
+
     def __init__(self):
         self._states: list[InsuranceState] = []
+        self._states_view: t.Tuple[InsuranceState, ...] = ()
+        self._by_reference: t.Dict[UUID, InsuranceState] = {}
+        self._by_insurance_reference: t.Dict[str, InsuranceState] = {}
+        self._by_global_id: t.Dict[str, InsuranceState] = {}
+        self._by_status: t.Dict[PolicyStatusEnum, InsuranceState] = {}
+        self._by_search_key: t.Dict[t.Tuple[dt.date, str, PaymentTypeEnum], InsuranceState] = {}
 
     @property
     def states(self) -> t.Tuple[InsuranceState]:
-        return tuple([state for state in self._states])
+        return self._states_view
 
     def set_insurance_states(self, *states: InsuranceState):
         for state in states:
             self.add(state)
 
     def search(self, begin_date: dt.date, email: str, payment_type: PaymentTypeEnum) -> InsuranceState | None:
-        return next((item for item in self._states
-                     if all((item.begin_date == begin_date,
-                             item.email == email,
-                             item.payment_type == payment_type))), None)
+        return self._by_search_key.get((begin_date, email, payment_type))
 
     def get_by_insurance_reference(self, insurance_reference: str) -> InsuranceState | None:
-        return next((state for state in self._states if state.insurance_reference == insurance_reference), None)
+        return self._by_insurance_reference.get(insurance_reference)
 
     def get_by_status(self, status: PolicyStatusEnum) -> InsuranceState | None:
-        return next((state for state in self._states if state.status == status), None)
+        return self._by_status.get(status)
 
     def get_by_reference(self, reference: UUID) -> InsuranceState | None:
-        return next((state for state in self._states if state.reference == reference), None)
+        return self._by_reference.get(reference)
 
     def get_by_global_id(self, global_id: str) -> InsuranceState | None:
-        return next((state for state in self._states if state.global_id == global_id), None)
+        return self._by_global_id.get(global_id)
 
     def add(self, state: InsuranceState):
         self._states.append(state)
+        self._states_view = tuple(self._states)
+        state.bind_collection(self)
+        self._index(state)
+
+    def reindex(self, state: InsuranceState):
+        """
+        Indexed field of the state changed: indexes are rebuilt, lookups keep the order of states
+        """
+        for index in (self._by_reference, self._by_insurance_reference, self._by_global_id,
+                      self._by_status, self._by_search_key):
+            index.clear()
+        for item in self._states:
+            self._index(item)
+
+    def _index(self, state: InsuranceState):
+        self._by_reference.setdefault(state.reference, state)
+        self._by_insurance_reference.setdefault(state.insurance_reference, state)
+        self._by_global_id.setdefault(state.global_id, state)
+        self._by_status.setdefault(state.status, state)
+        self._by_search_key.setdefault((state.begin_date, state.email, state.payment_type), state)
+
+
+_UNSET = object()
 
 
 class PolicyState:
+    __slots__ = ('_status', '_reference', 'product', 'insurance', 'channel', 'phone', 'prev_policy', 'downloaded',
+                 'premium', 'cost', 'reward', 'retention_reward', 'conditions', 'attributes', '_structure', '_insurer',
+                 'lead', 'creator', 'period', 'status_history', 'insurance_states', 'actual_insurance_state',
+                 'created_time', 'updated_time', '_events', '_changed_fields', '_frozen', '_details_loaded')
+
     _status: PolicyStatusEnum
     _reference: UUID
     product: ProductTypeEnum
@@ -62,8 +101,8 @@ class PolicyState:
     retention_reward: Decimal
     conditions: t.Tuple[str]
     attributes: MappingProxyType
-    structure: t.List[Structure]
-    insurer: Insurer
+    _structure: t.List[Structure]
+    _insurer: Insurer
     lead: PolicyLead
     creator: PolicyCreator
     period: Period
@@ -75,6 +114,53 @@ class PolicyState:
     updated_time: dt.datetime
 
     _events: t.Set[DDDEvent]
+    _changed_fields: t.Set[str]
+
+    # Attributes persisted in the policy row, mapped to their column names
+    _TRACKED_FIELDS: t.Final[t.Mapping[str, str]] = MappingProxyType({
+        'downloaded': 'downloaded',
+        'premium': 'premium',
+        'cost': 'cost',
+        'reward': 'reward',
+        'retention_reward': 'retention_reward',
+        'conditions': 'conditions',
+        '_status': 'status',
+        'attributes': 'attributes',
+        'actual_insurance_state': 'actual_insurance_state',
+    })
+
+    def __init__(self):
+        object.__setattr__(self, '_frozen', False)
+        self._changed_fields = set()
+
+    def __setattr__(self, key, value):
+        if self._frozen:
+            raise AttributeError(f'Policy state snapshot is read-only, can not set {key}')
+        if key in self._TRACKED_FIELDS:
+            current = getattr(self, key, _UNSET)
+            if current is not _UNSET and not self._is_same(current, value):
+                self._changed_fields.add(self._TRACKED_FIELDS[key])
+        object.__setattr__(self, key, value)
+
+    def __copy__(self) -> 'PolicyState':
+        obj = self.__class__.__new__(self.__class__)
+        for key in self.__slots__:
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                object.__setattr__(obj, key, value)
+        object.__setattr__(obj, '_changed_fields', set(self._changed_fields))
+        return obj
+
+    def __setstate__(self, state):
+        _, slots = state
+        for key, value in slots.items():
+            object.__setattr__(self, key, value)
+
+    @staticmethod
+    def _is_same(current, value) -> bool:
+        if isinstance(current, InsuranceState) and isinstance(value, InsuranceState):
+            return current.reference == value.reference
+        return current == value
 
     @classmethod
     def create(cls,
@@ -85,6 +171,7 @@ class PolicyState:
         obj = cls()
         obj.parse_offer(offer)
         obj.parse_lead(lead)
+        obj._details_loaded = True
         obj.insurance = insurance
         obj.retention_reward = None
         obj._status = None
@@ -115,8 +202,8 @@ class PolicyState:
                 retention_reward: t.Optional[Decimal],
                 conditions: t.Tuple[str],
                 attributes: MappingProxyType,
-                structure: t.List[Structure],
-                insurer: Insurer,
+                structure: t.Optional[t.List[Structure]],
+                insurer: t.Optional[Insurer],
                 lead: PolicyLead,
                 creator: PolicyCreator,
                 period: Period,
@@ -140,8 +227,10 @@ class PolicyState:
         obj.retention_reward = retention_reward
         obj.conditions = conditions
         obj.attributes = attributes
-        obj.structure = structure
-        obj.insurer = insurer
+        obj._details_loaded = structure is not None and insurer is not None
+        if obj._details_loaded:
+            obj.structure = structure
+            obj.insurer = insurer
         obj.lead = lead
         obj.creator = creator
         obj.period = period
@@ -152,6 +241,7 @@ class PolicyState:
         obj.insurance_states.set_insurance_states(*insurance_states)
         obj.actual_insurance_state = obj.insurance_states.get_by_reference(actual_insurance_state_reference)
         obj._events = set()
+        obj.clear_changes()
 
         return obj
 
@@ -195,6 +285,68 @@ class PolicyState:
     def status(self):
         return self._status
 
+    @property
+    def details_loaded(self) -> bool:
+        """
+        Structure and insurer are loaded, they may be skipped when the state is restored for status changes
+        """
+        return self._details_loaded
+
+    @property
+    def structure(self) -> t.List[Structure]:
+        self._check_details_loaded()
+        return self._structure
+
+    @structure.setter
+    def structure(self, structure: t.List[Structure]):
+        self._structure = structure
+
+    @property
+    def insurer(self) -> Insurer:
+        self._check_details_loaded()
+        return self._insurer
+
+    @insurer.setter
+    def insurer(self, insurer: Insurer):
+        self._insurer = insurer
+
+    def _check_details_loaded(self):
+        if not self._details_loaded:
+            raise PolicyDetailsNotLoadedError(f'Policy {self.reference} is loaded without structure and insurer, '
+                                              f'load it with PolicyLoadProfile.FULL')
+
+    def attach_details(self, structure: t.List[Structure], insurer: Insurer):
+        self.structure = structure
+        self.insurer = insurer
+        self._details_loaded = True
+
+    @property
+    def changed_fields(self) -> t.FrozenSet[str]:
+        """
+        Columns of the policy row changed since the state was restored or last persisted
+        """
+        return frozenset(self._changed_fields)
+
+    @property
+    def has_changes(self) -> bool:
+        return (bool(self._changed_fields)
+                or bool(self.status_history.new_records)
+                or any(state.has_changes for state in self.insurance_states.states))
+
+    def freeze(self):
+        """
+        Make the state a read-only snapshot together with its insurance states
+        """
+        for state in self.insurance_states.states:
+            state.freeze()
+        self._frozen = True
+
+    def clear_changes(self):
+        self._changed_fields = set()
+        self.status_history.mark_persisted()
+        for state in self.insurance_states.states:
+            state.clear_changes()
+
     def set_status(self, status: PolicyStatusEnum, timestamp: dt.datetime):
         self._status = status
         self.status_history.add_record(status=status, timestamp=timestamp)
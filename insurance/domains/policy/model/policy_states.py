@@ -7,15 +7,16 @@ from insurance.domains.policy.dto import PaymentTypeEnum, PolicyStatusEnum, Stat
 from insurance.domains.policy.exceptions import PolicyExpiredError
 from insurance.domains.policy.model.model_state import PolicyState
 from insurance.domains.policy.model.product_validators import PolicyProductABC
-from insurance.domains.policy.model.retention_reward_calc import PolicyRetentionRewardCalc
 from insurance.domains.policy.events.events import (
-    PolicyInInsuranceCompletedEvent, PolicyReissuedEvent, PolicyRescindedEvent, PolicyRestoredEvent,
-    PolicyCompletedEvent, PolicyOperatorErrorEvent, PolicyAccrueRewardCreatedEvent, PolicyRetentionRewardCreatedEvent
+    PolicyCompletedEvent, PolicyAccrueRewardCreatedEvent, PolicyRetentionRewardCreatedEvent
 )
 
+if t.TYPE_CHECKING:
+    from insurance.domains.policy.model.transitions import StatusTransition
+
 
 class PolicyStateABC(abc.ABC):
-    ALLOWED_STATUSES: tuple[PolicyStatusEnum]
+    ALLOWED_STATUSES: t.FrozenSet[PolicyStatusEnum]
 
     @abc.abstractmethod
     def apply(self, state: PolicyState):
@@ -27,7 +28,7 @@ class PolicyStateABC(abc.ABC):
 
 
 class DraftState(PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.DRAFT, PolicyStatusEnum.WAIT_CALLBACK, None)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.DRAFT, PolicyStatusEnum.WAIT_CALLBACK, None))
 
     def __init__(self,
                  begin_date: t.Optional[dt.date],
@@ -75,7 +76,7 @@ class DraftState(PolicyStateABC):
 
 
 class WaitCallbackState(PolicyStateABC):
-    ALLOWED_STATUSES = [PolicyStatusEnum.DRAFT, PolicyStatusEnum.WAIT_CALLBACK]
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.DRAFT, PolicyStatusEnum.WAIT_CALLBACK))
 
     def __init__(self, insurance_reference: str, redirect_url: str):
         self._insurance_reference = insurance_reference
@@ -98,23 +99,28 @@ class WaitCallbackState(PolicyStateABC):
 
 
 class BaseUpdateStatusPolicy:
+    """
+    Callback status handler, dispatched through the transition table which also provides
+    its retention reward calculation and event. The table is compiled from ALLOWED_STATUSES and
+    already rejects disallowed changes, so handlers do not validate the current status again
+    """
     _status_info: StatusInfo
 
-    def __init__(self, status_info: StatusInfo):
+    def __init__(self, status_info: StatusInfo, transition: 'StatusTransition'):
         self._status_info = status_info
+        self._transition = transition
 
 
 class PayedPolicyState(BaseUpdateStatusPolicy, PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.DRAFT,
-                        PolicyStatusEnum.WAIT_CALLBACK,
-                        PolicyStatusEnum.PAYED,
-                        PolicyStatusEnum.COMPLETED_IN_INSURANCE,
-                        PolicyStatusEnum.COMPLETED)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.DRAFT,
+                                  PolicyStatusEnum.WAIT_CALLBACK,
+                                  PolicyStatusEnum.PAYED,
+                                  PolicyStatusEnum.COMPLETED_IN_INSURANCE,
+                                  PolicyStatusEnum.COMPLETED))
 
     def apply(self, state: PolicyState):
-        self.policy_change_validate(state)
         ins_state = state.insurance_states.get_by_insurance_reference(self._status_info.insurance_reference)
-        if state.status in [PolicyStatusEnum.COMPLETED_IN_INSURANCE, PolicyStatusEnum.COMPLETED]:
+        if state.status in (PolicyStatusEnum.COMPLETED_IN_INSURANCE, PolicyStatusEnum.COMPLETED):
             state.status_history.add_record(status=PolicyStatusEnum.PAYED, timestamp=self._status_info.timestamp)
             ins_state.status_history.add_record(status=PolicyStatusEnum.PAYED, timestamp=self._status_info.timestamp)
             return
@@ -128,13 +134,12 @@ class PayedPolicyState(BaseUpdateStatusPolicy, PolicyStateABC):
 
 
 class CompletedInInsurancePolicyState(BaseUpdateStatusPolicy, PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.DRAFT,
-                        PolicyStatusEnum.WAIT_CALLBACK,
-                        PolicyStatusEnum.PAYED,
-                        PolicyStatusEnum.COMPLETED_IN_INSURANCE)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.DRAFT,
+                                  PolicyStatusEnum.WAIT_CALLBACK,
+                                  PolicyStatusEnum.PAYED,
+                                  PolicyStatusEnum.COMPLETED_IN_INSURANCE))
 
     def apply(self, state: PolicyState):
-        self.policy_change_validate(state)
         ins_state = state.insurance_states.get_by_insurance_reference(self._status_info.insurance_reference)
         ins_state.set_status(status=PolicyStatusEnum.COMPLETED_IN_INSURANCE, timestamp=self._status_info.timestamp)
         ins_state.global_id = self._status_info.global_id
@@ -143,13 +148,13 @@ class CompletedInInsurancePolicyState(BaseUpdateStatusPolicy, PolicyStateABC):
 
         state.actual_insurance_state = ins_state
         state.set_status(status=PolicyStatusEnum.COMPLETED_IN_INSURANCE, timestamp=self._status_info.timestamp)
-        ev = PolicyInInsuranceCompletedEvent(reference=state.reference,
-                                             insurance_reference=self._status_info.insurance_reference)
+        ev = self._transition.event(reference=state.reference,
+                                    insurance_reference=self._status_info.insurance_reference)
         state.add_event(ev)
 
 
 class CompletedPolicyState(PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.COMPLETED_IN_INSURANCE, PolicyStatusEnum.COMPLETED)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.COMPLETED_IN_INSURANCE, PolicyStatusEnum.COMPLETED))
 
     def __init__(self, offer: InsuranceOffer, insurance_reference: str):
         self._offer = offer
@@ -170,82 +175,75 @@ class CompletedPolicyState(PolicyStateABC):
 
 
 class OperatorErrorPolicyState(BaseUpdateStatusPolicy, PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.COMPLETED,
-                        PolicyStatusEnum.COMPLETED_IN_INSURANCE,
-                        PolicyStatusEnum.RESTORED)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.COMPLETED,
+                                  PolicyStatusEnum.COMPLETED_IN_INSURANCE,
+                                  PolicyStatusEnum.RESTORED))
 
     def apply(self, state: PolicyState):
-        self.policy_change_validate(state)
         ins_state = state.insurance_states.get_by_global_id(global_id=self._status_info.global_id)
         ins_state.set_status(status=PolicyStatusEnum.OPERATOR_ERROR, timestamp=self._status_info.timestamp)
-        retention_reward = PolicyRetentionRewardCalc.calc_operator_error_reward(
-            state=state, operation_date=self._status_info.timestamp.date()
-        )
+        retention_reward = self._transition.retention_calc(state=state,
+                                                           operation_date=self._status_info.timestamp.date())
         state.retention_reward = retention_reward
         ins_state = state.insurance_states.get_by_status(PolicyStatusEnum.COMPLETED) or ins_state
         state.actual_insurance_state = ins_state
         state.set_status(status=ins_state.status, timestamp=self._status_info.timestamp)
         if state.status == PolicyStatusEnum.OPERATOR_ERROR:
-            ev = PolicyOperatorErrorEvent(reference=state.reference, insurance_reference=state.insurance_reference)
+            ev = self._transition.event(reference=state.reference, insurance_reference=state.insurance_reference)
             state.add_event(ev)
 
 
 class RescindedPolicyState(BaseUpdateStatusPolicy, PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.COMPLETED, PolicyStatusEnum.RESTORED)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.COMPLETED, PolicyStatusEnum.RESTORED))
 
     def apply(self, state: PolicyState):
-        self.policy_change_validate(state)
         ins_state = state.insurance_states.get_by_global_id(global_id=self._status_info.global_id)
         ins_state.set_status(status=PolicyStatusEnum.RESCINDED, timestamp=self._status_info.timestamp)
         state.update_attributes(extra_attrs=self._status_info.extra_attrs)
-        retention_reward = PolicyRetentionRewardCalc.calc_rescinded_reward(
-            state=state, operation_date=self._status_info.timestamp.date()
-        )
+        retention_reward = self._transition.retention_calc(state=state,
+                                                           operation_date=self._status_info.timestamp.date())
         state.retention_reward = retention_reward
         ins_state = state.insurance_states.get_by_status(PolicyStatusEnum.COMPLETED) or ins_state
         state.actual_insurance_state = ins_state
         state.set_status(status=ins_state.status, timestamp=self._status_info.timestamp)
         if state.status == PolicyStatusEnum.RESCINDED:
-            ev = PolicyRescindedEvent(reference=state.reference, insurance_reference=state.insurance_reference)
+            ev = self._transition.event(reference=state.reference, insurance_reference=state.insurance_reference)
             state.add_event(ev)
 
 
 class ReissuedPolicyState(BaseUpdateStatusPolicy, PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.COMPLETED, PolicyStatusEnum.RESTORED)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.COMPLETED, PolicyStatusEnum.RESTORED))
 
     def apply(self, state: PolicyState):
-        self.policy_change_validate(state)
         ins_state = state.insurance_states.get_by_global_id(global_id=self._status_info.global_id)
         ins_state.set_status(status=PolicyStatusEnum.REISSUED, timestamp=self._status_info.timestamp)
         state.update_attributes(extra_attrs=self._status_info.extra_attrs)
-        retention_reward = PolicyRetentionRewardCalc.calc_reissued_reward(
-            state=state, operation_date=self._status_info.timestamp.date()
-        )
+        retention_reward = self._transition.retention_calc(state=state,
+                                                           operation_date=self._status_info.timestamp.date())
         state.retention_reward = retention_reward
         state.actual_insurance_state = ins_state
         state.set_status(status=ins_state.status, timestamp=self._status_info.timestamp)
         if state.status == PolicyStatusEnum.REISSUED:
-            ev = PolicyReissuedEvent(reference=state.reference, insurance_reference=state.insurance_reference)
+            ev = self._transition.event(reference=state.reference, insurance_reference=state.insurance_reference)
             state.add_event(ev)
 
 
 class RestoredPolicyState(BaseUpdateStatusPolicy, PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.REISSUED,)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.REISSUED,))
 
     def apply(self, state: PolicyState):
-        self.policy_change_validate(state)
         ins_state = state.insurance_states.get_by_global_id(global_id=self._status_info.global_id)
         ins_state.set_status(status=PolicyStatusEnum.RESTORED, timestamp=self._status_info.timestamp)
         state.update_attributes(extra_attrs=self._status_info.extra_attrs)
         state.actual_insurance_state = ins_state
         state.set_status(status=ins_state.status, timestamp=self._status_info.timestamp)
         if state.status == PolicyStatusEnum.RESTORED:
-            ev = PolicyRestoredEvent(reference=state.reference, insurance_reference=state.insurance_reference)
+            ev = self._transition.event(reference=state.reference, insurance_reference=state.insurance_reference)
             state.add_event(ev)
 
 
 class CreateAccrueRewardPolicyState(PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.COMPLETED,)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.COMPLETED,))
 
     def __init__(self, insurance_reference: str, document_reference: UUID):
         self._insurance_reference = insurance_reference
@@ -263,7 +261,7 @@ class CreateAccrueRewardPolicyState(PolicyStateABC):
 
 
 class ConfirmAccrueRewardPolicyState(PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.COMPLETED,)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.COMPLETED,))
 
     def __init__(self, insurance_reference: str):
         self._insurance_reference = insurance_reference
@@ -278,7 +276,7 @@ class ConfirmAccrueRewardPolicyState(PolicyStateABC):
 
 
 class CancelAccrueRewardPolicyState(PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.OPERATOR_ERROR,)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.OPERATOR_ERROR,))
 
     def __init__(self, insurance_reference: str):
         self._insurance_reference = insurance_reference
@@ -293,7 +291,7 @@ class CancelAccrueRewardPolicyState(PolicyStateABC):
 
 
 class CreateRetentionRewardPolicyState(PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.RESCINDED, PolicyStatusEnum.REISSUED)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.RESCINDED, PolicyStatusEnum.REISSUED))
 
     def __init__(self, insurance_reference: str, document_reference: UUID):
         self._insurance_reference = insurance_reference
@@ -311,7 +309,7 @@ class CreateRetentionRewardPolicyState(PolicyStateABC):
 
 
 class ConfirmRetentionRewardPolicyState(PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.RESCINDED, PolicyStatusEnum.REISSUED)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.RESCINDED, PolicyStatusEnum.REISSUED))
 
     def __init__(self, insurance_reference: str):
         self._insurance_reference = insurance_reference
@@ -326,7 +324,7 @@ class ConfirmRetentionRewardPolicyState(PolicyStateABC):
 
 
 class CancelRetentionRewardPolicyState(PolicyStateABC):
-    ALLOWED_STATUSES = (PolicyStatusEnum.RESTORED,)
+    ALLOWED_STATUSES = frozenset((PolicyStatusEnum.RESTORED,))
 
     def __init__(self, insurance_reference: str):
         self._insurance_reference = insurance_reference
@@ -0,0 +1,93 @@
+import datetime as dt
+import typing as t
+from decimal import Decimal
+from uuid import UUID
+
+import numpy as np
+
+from insurance.domains.policy.dto import InsuranceNameEnum, PolicyStatusEnum, ProductTypeEnum
+from insurance.domains.policy.model.retention_reward_calc import EurasiaRefundCalc, PolicyRetentionRewardCalc
+
+_ZERO: t.Final = Decimal('0.00')
+
+
+class RetentionRewardRow(t.NamedTuple):
+    reference: UUID
+    product: ProductTypeEnum
+    insurance: InsuranceNameEnum
+    status: PolicyStatusEnum
+    reward: Decimal
+    cost: int
+    refund_amount: t.Optional[str]
+    with_inexperienced: bool
+    region_changed: bool
+    created_date: dt.date
+    operation_date: dt.date
+
+    @classmethod
+    def from_dict(cls, data: t.Mapping[str, t.Any]) -> 'RetentionRewardRow':
+        return cls(reference=data['reference'],
+                   product=ProductTypeEnum(data['product']),
+                   insurance=InsuranceNameEnum(data['insurance']),
+                   status=PolicyStatusEnum(data['status']),
+                   reward=Decimal(data['reward']),
+                   cost=data['cost'],
+                   refund_amount=data['refund_amount'],
+                   with_inexperienced=bool(data['with_inexperienced']),
+                   region_changed=bool(data['region_changed']),
+                   created_date=data['created_date'],
+                   operation_date=data['operation_date'])
+
+
+class RetentionRewardBatchCalc:
+    """
+    Retention rewards of many policies with the rules of PolicyRetentionRewardCalc applied to columns.
+    Rows are selected by masks of calculator, status and day deltas, amounts stay Decimal
+    and only the rescinded ones are computed, with the same expression as the scalar calculation
+    """
+    STATUSES: t.Final = frozenset((PolicyStatusEnum.OPERATOR_ERROR,
+                                   PolicyStatusEnum.RESCINDED,
+                                   PolicyStatusEnum.REISSUED))
+
+    @classmethod
+    def calc(cls, rows: t.Sequence[RetentionRewardRow]) -> t.List[Decimal]:
+        cls._validate(rows)
+        if not rows:
+            return []
+        calcs = PolicyRetentionRewardCalc.PRODUCT_INSURANCE_CALC[ProductTypeEnum.OSGPO_VTS]
+        default_calc = calcs[PolicyRetentionRewardCalc.DEFAULT]
+        eurasia = np.array([calcs.get(row.insurance, default_calc) is EurasiaRefundCalc for row in rows])
+        status = np.array([row.status.value for row in rows])
+        reward = np.array([row.reward for row in rows], dtype=object)
+        paid = eurasia & (reward != 0)
+        days = (np.array([row.operation_date for row in rows], dtype='datetime64[D]')
+                - np.array([row.created_date for row in rows], dtype='datetime64[D]')).astype(np.int64)
+        flagged = np.array([row.with_inexperienced or row.region_changed for row in rows])
+
+        result = np.full(len(rows), _ZERO, dtype=object)
+        keeps_reward = ((status == PolicyStatusEnum.OPERATOR_ERROR.value)
+                        | ((status == PolicyStatusEnum.REISSUED.value) & paid
+                           & (days < EurasiaRefundCalc.NINETY_ONE_DAYS) & flagged))
+        result[keeps_reward] = reward[keeps_reward]
+
+        rescinded = np.flatnonzero((status == PolicyStatusEnum.RESCINDED.value) & paid)
+        if rescinded.size:
+            result[rescinded] = cls._calc_rescinded([rows[index] for index in rescinded])
+        return result.tolist()
+
+    @staticmethod
+    def _calc_rescinded(rows: t.List[RetentionRewardRow]) -> t.List[Decimal]:
+        amounts = []
+        for row in rows:
+            if row.refund_amount is None:
+                raise ValueError(f'Policy {row.reference} has no refund_amount to calc rescinded reward')
+            amounts.append((row.reward * (Decimal(row.refund_amount) / row.cost)).quantize(_ZERO))
+        return amounts
+
+    @classmethod
+    def _validate(cls, rows: t.Sequence[RetentionRewardRow]):
+        for row in rows:
+            if row.product != ProductTypeEnum.OSGPO_VTS:
+                raise ValueError(f'Unknown request to calc retention reward of product {row.product}')
+            if row.status not in cls.STATUSES:
+                raise ValueError(f'Policy {row.reference} in status {row.status} has no retention reward')
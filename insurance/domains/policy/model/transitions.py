@@ -0,0 +1,77 @@
+import typing as t
+from decimal import Decimal
+from types import MappingProxyType
+
+from dddmisc import DDDEvent
+
+from insurance.domains.policy.dto import PolicyStatusEnum
+from insurance.domains.policy.events.events import (
+    PolicyInInsuranceCompletedEvent, PolicyReissuedEvent, PolicyRescindedEvent, PolicyRestoredEvent,
+    PolicyOperatorErrorEvent
+)
+from insurance.domains.policy.model.policy_states import (
+    BaseUpdateStatusPolicy, PayedPolicyState, CompletedInInsurancePolicyState, OperatorErrorPolicyState,
+    RescindedPolicyState, ReissuedPolicyState, RestoredPolicyState
+)
+from insurance.domains.policy.model.retention_reward_calc import PolicyRetentionRewardCalc
+
+RetentionCalc = t.Callable[..., Decimal]
+
+
+class StatusTransition(t.NamedTuple):
+    handler: t.Type[BaseUpdateStatusPolicy]
+    retention_calc: t.Optional[RetentionCalc]
+    event: t.Optional[t.Type[DDDEvent]]
+
+
+# Incoming callback status -> transition. Statuses it may come from are ALLOWED_STATUSES of the handler
+STATUS_TRANSITIONS: t.Final[t.Mapping[PolicyStatusEnum, StatusTransition]] = MappingProxyType({
+    PolicyStatusEnum.PAYED: StatusTransition(
+        handler=PayedPolicyState,
+        retention_calc=None,
+        event=None,
+    ),
+    PolicyStatusEnum.COMPLETED_IN_INSURANCE: StatusTransition(
+        handler=CompletedInInsurancePolicyState,
+        retention_calc=None,
+        event=PolicyInInsuranceCompletedEvent,
+    ),
+    PolicyStatusEnum.OPERATOR_ERROR: StatusTransition(
+        handler=OperatorErrorPolicyState,
+        retention_calc=PolicyRetentionRewardCalc.calc_operator_error_reward,
+        event=PolicyOperatorErrorEvent,
+    ),
+    PolicyStatusEnum.RESCINDED: StatusTransition(
+        handler=RescindedPolicyState,
+        retention_calc=PolicyRetentionRewardCalc.calc_rescinded_reward,
+        event=PolicyRescindedEvent,
+    ),
+    PolicyStatusEnum.REISSUED: StatusTransition(
+        handler=ReissuedPolicyState,
+        retention_calc=PolicyRetentionRewardCalc.calc_reissued_reward,
+        event=PolicyReissuedEvent,
+    ),
+    PolicyStatusEnum.RESTORED: StatusTransition(
+        handler=RestoredPolicyState,
+        retention_calc=None,
+        event=PolicyRestoredEvent,
+    ),
+})
+
+# (current status, incoming status) -> transition, compiled once at import
+TRANSITIONS: t.Final[t.Mapping[t.Tuple[PolicyStatusEnum, PolicyStatusEnum], StatusTransition]] = MappingProxyType({
+    (current, incoming): transition
+    for incoming, transition in STATUS_TRANSITIONS.items()
+    for current in transition.handler.ALLOWED_STATUSES
+})
+
+
+def get_transition(current: PolicyStatusEnum, incoming: PolicyStatusEnum) -> StatusTransition:
+    transition = TRANSITIONS.get((current, incoming))
+    if transition is not None:
+        return transition
+    if incoming not in STATUS_TRANSITIONS:
+        raise ValueError(f'Policy unknown status to update. Status: {incoming}')
+    raise ValueError(f'Not allowed status change from {current} '
+                     f'to {STATUS_TRANSITIONS[incoming].handler.__name__}')
+
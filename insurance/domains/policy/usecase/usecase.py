@@ -1,4 +1,3 @@
-from uuid import UUID
 import asyncio
 
 from dddmisc import AbstractAsyncUnitOfWork, AsyncMessageBus
@@ -6,7 +5,7 @@ from tenacity import retry, retry_if_exception_type
 
 from insurance.domains.policy.abstractions import (
     LeadAdapterABC, OfferAdapterABC, RedLockClientABC, InsuranceAdapterABC, FinDocumentAdapterABC, S3AdapterABC,
-    CallbackAdapterABC, PolicyRequiredDataFacadeABC
+    CallbackAdapterABC, PolicyRequiredDataFacadeABC, PolicyLoadProfile
 )
 from insurance.domains.policy.commands import (
     CreatePolicyCommand, UpdatePolicyCommand, SavePolicyToInsuranceCommand, CreatePolicyAccrueRewardCommand,
@@ -99,13 +98,22 @@ class PolicyUseCases:
     @retry(retry=retry_if_exception_type(PolicyAlreadyUpdatedError))
     async def update_policy_status(self, command: UpdatePolicyStatusCommand, uow: AbstractAsyncUnitOfWork):
         async with uow:
-            status_info = self._callback_adapter.get_status_info(insurance_reference=command.insurance_reference,
+            if command.insurance_reference:
+                insurance_reference = command.insurance_reference
+                policy: Policy = await uow.repository.get_by_insurance_reference(
+                    insurance_reference, profile=PolicyLoadProfile.STATUS
+                )
+            else:
+                policy: Policy = await uow.repository.get_by_global_id(
+                    command.global_id, profile=PolicyLoadProfile.STATUS
+                )
+                insurance_reference = policy.state.insurance_states.get_by_global_id(
+                    command.global_id).insurance_reference
+            status_info = self._callback_adapter.get_status_info(insurance_reference=insurance_reference,
                                                                  global_id=command.global_id,
                                                                  event_type=command.event_type,
                                                                  event_time=command.event_time,
                                                                  attributes_json=command.attributes_json)
-            policy_ref: UUID = await uow.repository.get_reference_by_insurance_reference(command.insurance_reference)
-            policy: Policy = await uow.repository.get(policy_ref)
             policy.update_status(status_info=status_info)
             await uow.commit()
         return policy
@@ -113,7 +121,7 @@ class PolicyUseCases:
     async def create_policy_accrue_reward(self, command: CreatePolicyAccrueRewardCommand, uow: AbstractAsyncUnitOfWork):
         async with (await self._redlock.lock(f'policy-create-accrue-reward: {command.reference}')):
             async with uow:
-                policy: Policy = await uow.repository.get(command.reference)
+                policy: Policy = await uow.repository.get(command.reference, profile=PolicyLoadProfile.STATUS)
                 if not policy.accrue_reward_document:
                     document_reference = await self._fin_doc_adapter.create_pay_reward(policy=policy)
                     policy.create_accrue_reward(insurance_reference=command.insurance_reference,
@@ -123,7 +131,7 @@ class PolicyUseCases:
 
     async def confirm_policy_accrue_reward(self, command: ConfirmPolicyAccrueRewardCommand, uow: AbstractAsyncUnitOfWork):
         async with uow:
-            policy: Policy = await uow.repository.get(command.reference)
+            policy: Policy = await uow.repository.get(command.reference, profile=PolicyLoadProfile.STATUS)
             document = policy.accrue_reward_document
             if document and document.is_created:
                 await self._fin_doc_adapter.confirm_pay_reward(policy_reference=policy.reference,
@@ -135,7 +143,7 @@ class PolicyUseCases:
     async def cancel_policy_accrue_reward(self, command: CancelPolicyAccrueRewardCommand, uow: AbstractAsyncUnitOfWork):
         async with (await self._redlock.lock(f'policy-cancel-accrue-reward: {command.reference}')):
             async with uow:
-                policy: Policy = await uow.repository.get(command.reference)
+                policy: Policy = await uow.repository.get(command.reference, profile=PolicyLoadProfile.STATUS)
                 document = policy.accrue_reward_document
                 if document and document.is_confirmed:
                     await self._fin_doc_adapter.cancel_reward(policy_reference=policy.reference,
@@ -147,7 +155,7 @@ class PolicyUseCases:
     async def create_policy_retention_reward(self, command: CreatePolicyRetentionRewardCommand, uow: AbstractAsyncUnitOfWork):
         async with (await self._redlock.lock(f'policy-create-retention-reward: {command.reference}')):
             async with uow:
-                policy: Policy = await uow.repository.get(command.reference)
+                policy: Policy = await uow.repository.get(command.reference, profile=PolicyLoadProfile.STATUS)
                 if not policy.retention_reward_document:
                     document_reference = await self._fin_doc_adapter.create_retention_reward(policy)
                     policy.create_retention_reward(insurance_reference=command.insurance_reference,
@@ -157,7 +165,7 @@ class PolicyUseCases:
 
     async def confirm_policy_retention_reward(self, command: ConfirmPolicyRetentionRewardCommand, uow: AbstractAsyncUnitOfWork):
         async with uow:
-            policy: Policy = await uow.repository.get(command.reference)
+            policy: Policy = await uow.repository.get(command.reference, profile=PolicyLoadProfile.STATUS)
             document = policy.retention_reward_document
             if document and document.is_created:
                 await self._fin_doc_adapter.confirm_retention_reward(policy_reference=policy.reference,
@@ -169,7 +177,7 @@ class PolicyUseCases:
     async def cancel_policy_retention_reward(self, command: CancelPolicyRetentionRewardCommand, uow: AbstractAsyncUnitOfWork):
         async with (await self._redlock.lock(f'policy-cancel-retention-reward: {command.reference}')):
             async with uow:
-                policy: Policy = await uow.repository.get(command.reference)
+                policy: Policy = await uow.repository.get(command.reference, profile=PolicyLoadProfile.STATUS)
                 document = policy.retention_reward_document
                 if document and document.is_confirmed:
                     await self._fin_doc_adapter.cancel_reward(policy_reference=policy.reference,
@@ -182,7 +190,7 @@ class PolicyUseCases:
     async def download_policy_pdf(self, command: DownloadPolicyPDFCommand, uow: AbstractAsyncUnitOfWork):
         async with (await self._redlock.lock(f'policy-download: {command.reference}')):
             async with uow:
-                policy: Policy = await uow.repository.get(command.reference)
+                policy: Policy = await uow.repository.get(command.reference, profile=PolicyLoadProfile.STATUS)
                 policy_state = policy.state
                 if policy_state.downloaded:
                     return policy_state.downloaded
@@ -197,7 +205,7 @@ class PolicyUseCases:
 
     async def get_policy_pdf(self, command: GetPolicyPDFCommand, uow: AbstractAsyncUnitOfWork):
         async with uow:
-            policy: Policy = await uow.repository.get(command.reference)
+            policy: Policy = await uow.repository.get(command.reference, profile=PolicyLoadProfile.STATUS)
             policy_state = policy.state
             if policy_state.downloaded:
                 return self._s3_adapter.get_url(policy.reference)
@@ -0,0 +1,10 @@
+from .batch_loader import BatchLoader
+from .lru import CacheStats, LRUCache
+from .single_flight import SingleFlight
+
+__all__ = [
+    'BatchLoader',
+    'CacheStats',
+    'LRUCache',
+    'SingleFlight',
+]
@@ -0,0 +1,62 @@
+import asyncio
+import typing as t
+
+K = t.TypeVar('K')
+V = t.TypeVar('V')
+
+
+class BatchLoader(t.Generic[K, V]):
+    """
+    Loads of keys requested within one event loop iteration are sent as one call of `load_many`,
+    split by `max_batch_size`. A key missing in the result fails with `not_found(key)`
+    """
+
+    def __init__(self,
+                 load_many: t.Callable[[t.List[K]], t.Awaitable[t.Mapping[K, V]]],
+                 max_batch_size: int = 100,
+                 not_found: t.Callable[[K], Exception] = KeyError):
+        self._load_many = load_many
+        self._max_batch_size = max_batch_size
+        self._not_found = not_found
+        self._pending: t.Dict[K, asyncio.Future] = {}
+        self._dispatch_scheduled = False
+        # Loop keeps only weak references to tasks
+        self._tasks: t.Set[asyncio.Task] = set()
+        self.batches = 0
+
+    async def load(self, key: K) -> V:
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        self._dispatch_scheduled = False
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        for start in range(0, len(keys), self._max_batch_size):
+            batch = {key: pending[key] for key in keys[start:start + self._max_batch_size]}
+            task = asyncio.ensure_future(self._load_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, batch: t.Dict[K, asyncio.Future]):
+        self.batches += 1
+        try:
+            values = await self._load_many(list(batch))
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for key, future in batch.items():
+            if future.done():
+                continue
+            if key in values:
+                future.set_result(values[key])
+            else:
+                future.set_exception(self._not_found(key))
@@ -0,0 +1,65 @@
+import time
+import typing as t
+from collections import OrderedDict
+from dataclasses import dataclass
+
+K = t.TypeVar('K')
+V = t.TypeVar('V')
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(t.Generic[K, V]):
+    """
+    In-process LRU with per entry time to live.
+    Expired entries are dropped on access, the least recently used one is evicted on overflow
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: t.Optional[float] = None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[K, t.Tuple[float, V]] = OrderedDict()
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K, default: t.Optional[V] = None) -> t.Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            self.stats.misses += 1
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.stats.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: t.Optional[float] = None):
+        ttl = self._ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else float('inf')
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def pop(self, key: K, default: t.Optional[V] = None) -> t.Optional[V]:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        self._data.clear()
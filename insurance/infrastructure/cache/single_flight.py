@@ -0,0 +1,36 @@
+import asyncio
+import functools
+import typing as t
+
+K = t.TypeVar('K')
+V = t.TypeVar('V')
+
+
+class SingleFlight(t.Generic[K, V]):
+    """
+    Concurrent calls with the same key share one running call. The call is not cancelled
+    when the caller that started it is, the others still get its result
+    """
+
+    def __init__(self):
+        self._calls: t.Dict[K, asyncio.Future] = {}
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: K, func: t.Callable[[], t.Awaitable[V]]) -> V:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = asyncio.ensure_future(func())
+            call.add_done_callback(functools.partial(self._done, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(call)
+
+    def _done(self, key: K, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Retrieved here, so an error nobody waits for anymore is not reported as never retrieved
+            call.exception()
@@ -0,0 +1,12 @@
+from .config import UpstreamConfig
+from .factory import HttpClientFactory
+from .service import HttpClientService
+from .transport import CountingTransport, PoolStats
+
+__all__ = [
+    'CountingTransport',
+    'HttpClientFactory',
+    'HttpClientService',
+    'PoolStats',
+    'UpstreamConfig',
+]
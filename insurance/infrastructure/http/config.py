@@ -0,0 +1,31 @@
+import typing as t
+
+from httpx import Limits, Timeout
+from pydantic import BaseModel
+
+
+class UpstreamConfig(BaseModel):
+    base_url: str = ''
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30
+    http2: bool = False
+    connect_timeout: float = 5
+    read_timeout: float = 30
+    write_timeout: float = 30
+    # Time to wait for a free connection of the pool
+    pool_timeout: float = 5
+    headers: t.Dict[str, str] = {}
+
+    @property
+    def limits(self) -> Limits:
+        return Limits(max_connections=self.max_connections,
+                      max_keepalive_connections=self.max_keepalive_connections,
+                      keepalive_expiry=self.keepalive_expiry)
+
+    @property
+    def timeout(self) -> Timeout:
+        return Timeout(connect=self.connect_timeout,
+                       read=self.read_timeout,
+                       write=self.write_timeout,
+                       pool=self.pool_timeout)
@@ -0,0 +1,49 @@
+import logging
+import typing as t
+
+from httpx import AsyncClient
+
+from insurance.infrastructure.http.config import UpstreamConfig
+from insurance.infrastructure.http.transport import CountingTransport, PoolStats
+
+logger = logging.getLogger('http_client_factory')
+
+
+class HttpClientFactory:
+    """
+    One pooled client per upstream, tuned by the upstream config. Unknown upstreams get the default config
+    """
+
+    def __init__(self, upstreams: t.Mapping[str, UpstreamConfig | dict], default: t.Optional[UpstreamConfig] = None):
+        self._configs = {name: UpstreamConfig.model_validate(config) for name, config in upstreams.items()}
+        self._default = default or UpstreamConfig()
+        self._clients: t.Dict[str, AsyncClient] = {}
+        self._stats: t.Dict[str, PoolStats] = {}
+
+    def client(self, upstream: str) -> AsyncClient:
+        client = self._clients.get(upstream)
+        if client is None:
+            client = self._clients[upstream] = self._create(upstream, self._configs.get(upstream, self._default))
+        return client
+
+    def stats(self) -> t.Dict[str, PoolStats]:
+        """
+        Pool utilization gauges by upstream
+        """
+        return dict(self._stats)
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for upstream, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception:
+                logger.warning('Failed to close http client of %s', upstream, exc_info=True)
+
+    def _create(self, upstream: str, config: UpstreamConfig) -> AsyncClient:
+        stats = self._stats[upstream] = PoolStats(max_connections=config.max_connections)
+        transport = CountingTransport(stats, http2=config.http2, limits=config.limits)
+        return AsyncClient(base_url=config.base_url,
+                           timeout=config.timeout,
+                           headers=config.headers,
+                           transport=transport)
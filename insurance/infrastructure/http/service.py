@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import typing as t
+
+from aiomisc import Service
+
+from insurance.infrastructure.http.config import UpstreamConfig
+from insurance.infrastructure.http.factory import HttpClientFactory
+from insurance.infrastructure.http.transport import PoolStats
+
+logger = logging.getLogger('http_client_factory')
+
+
+class HttpClientService(Service):
+    """
+    Owns the upstream clients. Services of integrations take their client from `factory` as session,
+    e.g. ClientDomainService(..., session=http.factory.client('person_domain')).
+    Pool gauges are available from `stats` and logged every `stats_interval` seconds
+    """
+    factory: HttpClientFactory
+
+    def __init__(self,
+                 upstreams: t.Mapping[str, UpstreamConfig | dict],
+                 stats_interval: t.Optional[float] = 60,
+                 **kwargs: t.Any):
+        super().__init__(**kwargs)
+        self.factory = HttpClientFactory(upstreams)
+        self._stats_interval = stats_interval
+        self._task: t.Optional[asyncio.Task] = None
+
+    def stats(self) -> t.Dict[str, PoolStats]:
+        return self.factory.stats()
+
+    async def start(self) -> t.Any:
+        if self._stats_interval:
+            self._task = asyncio.create_task(self._log_stats())
+        logger.info('Http client service started')
+
+    async def stop(self, exception: Exception = None) -> t.Any:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.factory.aclose()
+        logger.info('Http client service stopped')
+
+    async def _log_stats(self):
+        while True:
+            await asyncio.sleep(self._stats_interval)
+            for upstream, stats in self.stats().items():
+                logger.info('Http pool %s: in flight %s of %s, peak %s, requests %s, pool timeouts %s',
+                            upstream, stats.in_flight, stats.max_connections, stats.peak_in_flight,
+                            stats.requests, stats.pool_timeouts)
@@ -0,0 +1,74 @@
+import typing as t
+from dataclasses import dataclass
+
+from httpx import AsyncByteStream, AsyncHTTPTransport, PoolTimeout, Request, Response
+
+
+@dataclass
+class PoolStats:
+    max_connections: int
+    # Requests holding a connection: sent and not yet read or closed
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    requests: int = 0
+    pool_timeouts: int = 0
+
+    @property
+    def utilization(self) -> float:
+        return self.in_flight / self.max_connections if self.max_connections else 0.0
+
+    @property
+    def peak_utilization(self) -> float:
+        return self.peak_in_flight / self.max_connections if self.max_connections else 0.0
+
+
+class _ReleasingStream(AsyncByteStream):
+    def __init__(self, stream: AsyncByteStream, release: t.Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> t.AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class CountingTransport(AsyncHTTPTransport):
+    """
+    Pooled transport counting requests which hold a connection of the pool
+    """
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: Request) -> Response:
+        stats = self.stats
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            response = await super().handle_async_request(request)
+        except PoolTimeout:
+            stats.in_flight -= 1
+            stats.pool_timeouts += 1
+            raise
+        except BaseException:
+            stats.in_flight -= 1
+            raise
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                stats.in_flight -= 1
+
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
@@ -0,0 +1,5 @@
+from .service import OutboxDispatcherService
+
+__all__ = [
+    'OutboxDispatcherService',
+]
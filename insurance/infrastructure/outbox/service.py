@@ -0,0 +1,104 @@
+import asyncio
+import json
+import logging
+import typing as t
+
+from aiomisc import Service
+from dddmisc import AsyncMessageBus, get_message_class
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from insurance.infrastructure.outbox.statement import Statement
+
+logger = logging.getLogger('outbox_dispatcher')
+
+
+class OutboxDispatcherService(Service):
+    """
+    Hands events of the outbox table to the message bus in batches. Events of one policy are handled
+    one at a time in the order they were written, different policies concurrently. An event is deleted
+    only after it is handled, a failed or lost one is leased again after `lease` seconds, so delivery
+    is at least once. An event failed `max_attempts` times is dead lettered.
+
+    Repository classes passed in `repositories` write their events to the outbox once the dispatcher
+    is started, so events are never written without a dispatcher to deliver them
+    """
+
+    def __init__(self,
+                 engine: AsyncEngine,
+                 message_bus: AsyncMessageBus,
+                 repositories: t.Iterable[type] = (),
+                 batch_size: int = 100,
+                 concurrency: int = 10,
+                 lease: float = 60,
+                 poll_interval: float = 1,
+                 max_attempts: int = 10,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self._engine = engine
+        self._message_bus = message_bus
+        self._repositories = tuple(repositories)
+        self._batch_size = batch_size
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lease = lease
+        self._poll_interval = poll_interval
+        self._max_attempts = max_attempts
+        self._task: t.Optional[asyncio.Task] = None
+
+    async def start(self) -> t.Any:
+        for repository in self._repositories:
+            repository.outbox = True
+        self._task = asyncio.create_task(self._run())
+        logger.info('Outbox dispatcher started')
+
+    async def stop(self, exception: Exception = None) -> t.Any:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        logger.info('Outbox dispatcher stopped')
+
+    async def dispatch(self) -> int:
+        """
+        Dispatch one batch, returns the number of claimed events
+        """
+        async with self._engine.begin() as conn:
+            cursor = await conn.execute(Statement.claim_events, dict(lease=self._lease, batch_size=self._batch_size))
+            rows = cursor.fetchall()
+        if not rows:
+            return 0
+
+        handled = await asyncio.gather(*[self._handle(row) for row in rows])
+
+        ids = [row.id for row, ok in zip(rows, handled) if ok]
+        dead = [row.id for row, ok in zip(rows, handled) if not ok and row.attempts >= self._max_attempts]
+        if ids or dead:
+            async with self._engine.begin() as conn:
+                if ids:
+                    await conn.execute(Statement.delete_events, dict(ids=ids))
+                if dead:
+                    logger.error('Outbox events %s are dead lettered after %s attempts', dead, self._max_attempts)
+                    await conn.execute(Statement.dead_letter_events, dict(ids=dead))
+        return len(rows)
+
+    async def _run(self):
+        while True:
+            try:
+                claimed = await self.dispatch()
+            except Exception:
+                logger.exception('Outbox dispatch failed')
+                claimed = 0
+            # Each claim takes only the earliest event of a policy, the next ones are claimable right away
+            if not claimed:
+                await asyncio.sleep(self._poll_interval)
+
+    async def _handle(self, row) -> bool:
+        async with self._semaphore:
+            try:
+                payload = json.loads(row.payload) if isinstance(row.payload, (str, bytes)) else row.payload
+                event = get_message_class(payload['type']).load(payload['data'],
+                                                                reference=payload['reference'],
+                                                                timestamp=payload['timestamp'])
+                await self._message_bus.handle(event)
+            except Exception:
+                logger.exception('Failed to dispatch outbox event %s', row.id)
+                return False
+        return True
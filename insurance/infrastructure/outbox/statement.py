@@ -0,0 +1,37 @@
+from sqlalchemy import text
+
+
+class Statement:
+    # Undispatched events with an expired or no lease are leased to this dispatcher, rows leased by other
+    # dispatchers are skipped. An event is claimed only when no earlier event of its policy is left,
+    # so events of one policy are dispatched one at a time in the order they were written
+    claim_events = text("""
+    update outbox_event
+    set locked_until = now() + make_interval(secs => :lease),
+        attempts = attempts + 1
+    where id in (select e.id
+                 from outbox_event e
+                 where e.dead_lettered_time is null
+                   and (e.locked_until is null or e.locked_until < now())
+                   and not exists (select 1
+                                   from outbox_event e2
+                                   where e2.aggregate_reference = e.aggregate_reference
+                                     and e2.id < e.id
+                                     and e2.dead_lettered_time is null)
+                 order by e.id
+                 limit :batch_size
+                 for update skip locked)
+    returning id, aggregate_reference, payload, attempts
+    """)
+
+    delete_events = text("""
+    delete from outbox_event where id = any(cast(:ids as bigint[]))
+    """)
+
+    # Dead lettered events are kept for investigation and no longer hold back later events of their policy
+    dead_letter_events = text("""
+    update outbox_event
+    set dead_lettered_time = now(),
+        locked_until = null
+    where id = any(cast(:ids as bigint[]))
+    """)
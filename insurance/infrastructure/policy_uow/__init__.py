@@ -1,5 +1,7 @@
+from .transaction import UOWTransaction
 from .uow import UOW
 
 __all__ = [
-    'UOW'
+    'UOW',
+    'UOWTransaction',
 ]
@@ -0,0 +1,80 @@
+import contextlib
+import logging
+import typing as t
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger('uow_transaction')
+
+
+class UOWTransaction:
+    """
+    Connection holder shared by the repository for the lifetime of a unit of work.
+    One connection is checked out of the pool with the first write and keeps a single
+    transaction open until the unit of work is committed or rolled back.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine
+        self._connection: t.Optional[AsyncConnection] = None
+        self._commit_callbacks: t.List[t.Callable[[], t.Awaitable]] = []
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._connection is not None
+
+    @contextlib.asynccontextmanager
+    async def begin(self) -> t.AsyncIterator[AsyncConnection]:
+        if self._connection is not None:
+            yield self._connection
+            return
+        async with self._engine.begin() as conn:
+            yield conn
+
+    async def connection(self) -> AsyncConnection:
+        if self._connection is None:
+            connection = await self._engine.connect()
+            try:
+                await connection.begin()
+            except Exception:
+                await connection.close()
+                raise
+            self._connection = connection
+        return self._connection
+
+    def on_commit(self, callback: t.Callable[[], t.Awaitable]):
+        """
+        Run callback after the transaction is committed, dropped on rollback
+        """
+        self._commit_callbacks.append(callback)
+
+    async def commit(self):
+        if self._connection is None:
+            return
+        try:
+            await self._connection.commit()
+        except Exception:
+            self._commit_callbacks.clear()
+            raise
+        finally:
+            await self._close()
+
+        callbacks, self._commit_callbacks = self._commit_callbacks, []
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception:
+                logger.exception('After commit callback failed')
+
+    async def rollback(self):
+        self._commit_callbacks.clear()
+        if self._connection is None:
+            return
+        try:
+            await self._connection.rollback()
+        finally:
+            await self._close()
+
+    async def _close(self):
+        connection, self._connection = self._connection, None
+        await connection.close()
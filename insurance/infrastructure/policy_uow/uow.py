@@ -1,13 +1,15 @@
 from dddmisc.unit_of_work import AbstractAsyncUnitOfWork
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+from .transaction import UOWTransaction
+
 
 class UOW(AbstractAsyncUnitOfWork):
-    async def _begin_transaction(self, factory: AsyncEngine) -> AsyncEngine:
-        return factory
+    async def _begin_transaction(self, factory: AsyncEngine) -> UOWTransaction:
+        return UOWTransaction(factory)
 
-    async def _commit_transaction(self, *args, **kwargs):
-        pass
+    async def _commit_transaction(self, transaction: UOWTransaction):
+        await transaction.commit()
 
-    async def _rollback_transaction(self, *args, **kwargs):
-        pass
+    async def _rollback_transaction(self, transaction: UOWTransaction):
+        await transaction.rollback()
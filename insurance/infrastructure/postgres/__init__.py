@@ -0,0 +1,8 @@
+from .advisory_lock import AdvisoryLock, AdvisoryLockClient
+from .service import AdvisoryLockService
+
+__all__ = [
+    'AdvisoryLock',
+    'AdvisoryLockClient',
+    'AdvisoryLockService',
+]
@@ -0,0 +1,113 @@
+import logging
+import typing as t
+import uuid
+
+from aioredlock import LockError
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger('advisory_lock_client')
+
+_LOCK_NOT_AVAILABLE: t.Final = '55P03'
+
+# Timeouts are local to the lock transaction. A holder that does not release the lock in lock_timeout
+# has its lock session terminated by the server, as a redis lock would expire
+_SET_TIMEOUTS = text("""
+select set_config('lock_timeout', :acquire_timeout, true),
+       set_config('idle_in_transaction_session_timeout', :lock_timeout, true)
+""")
+
+_LOCK = text("select pg_advisory_xact_lock(hashtext(:resource))")
+
+_TRY_LOCK = text("select pg_try_advisory_xact_lock(hashtext(:resource))")
+
+
+class AdvisoryLock:
+    """
+    Transaction level advisory lock held on its own connection until released
+    """
+    __slots__ = ('_client', '_connection', 'resource', 'id', 'valid')
+
+    def __init__(self, client: 'AdvisoryLockClient', connection: AsyncConnection, resource: str, lock_identifier: str):
+        self._client = client
+        self._connection = connection
+        self.resource = resource
+        self.id = lock_identifier
+        self.valid = True
+
+    async def release(self):
+        if not self.valid:
+            return
+        self.valid = False
+        self._client._held.pop(self.id, None)
+        try:
+            await self._connection.commit()
+        except Exception:
+            logger.warning('Failed to release advisory lock %s', self.resource, exc_info=True)
+        finally:
+            await self._connection.close()
+
+    async def __aenter__(self) -> 'AdvisoryLock':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release()
+
+
+class AdvisoryLockClient:
+    """
+    Policy locks on pg_advisory_xact_lock for installations with a single database, without redis.
+    Every held lock keeps a connection of the engine pool checked out. The use cases take a lock before
+    their unit of work checks out its own connection, so the engine must not share the pool of the
+    unit of work: a locked handler needs one connection of each pool, and with a shared pool handlers
+    holding locks can wait forever for connections held by each other. See AdvisoryLockService
+    """
+
+    def __init__(self, engine: AsyncEngine, acquire_timeout: float = 60):
+        self._engine = engine
+        self._acquire_timeout = acquire_timeout
+        self._held: t.Dict[str, AdvisoryLock] = {}
+
+    async def destroy(self, exception: Exception = None) -> t.Any:
+        for lock in list(self._held.values()):
+            await lock.release()
+
+    async def lock(self,
+                   resource: str,
+                   lock_identifier: t.Optional[str] = None,
+                   lock_timeout: int = 60) -> AdvisoryLock:
+        resource = str(resource)
+        try:
+            connection = await self._engine.connect()
+        except PoolTimeoutError as exc:
+            raise LockError(f'Can not acquire lock {resource}, no free lock connection') from exc
+        try:
+            await connection.begin()
+            await connection.execute(_SET_TIMEOUTS, dict(acquire_timeout=f'{int(self._acquire_timeout * 1000)}ms',
+                                                         lock_timeout=f'{int(lock_timeout * 1000)}ms'))
+            await connection.execute(_LOCK, dict(resource=resource))
+        except DBAPIError as exc:
+            await connection.close()
+            if getattr(exc.orig, 'sqlstate', None) == _LOCK_NOT_AVAILABLE:
+                raise LockError(f'Can not acquire lock {resource}') from exc
+            raise
+        except BaseException:
+            await connection.close()
+            raise
+
+        lock = AdvisoryLock(self, connection, resource, lock_identifier or str(uuid.uuid4()))
+        self._held[lock.id] = lock
+        return lock
+
+    async def unlock(self, resource: str, lock_identifier: str):
+        lock = self._held.get(lock_identifier)
+        if lock is not None:
+            await lock.release()
+
+    async def is_locked(self, resource_or_lock: str | AdvisoryLock) -> bool:
+        if isinstance(resource_or_lock, AdvisoryLock):
+            return resource_or_lock.valid
+        async with self._engine.begin() as conn:
+            cursor = await conn.execute(_TRY_LOCK, dict(resource=str(resource_or_lock)))
+            return not cursor.scalar()
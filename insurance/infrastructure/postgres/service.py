@@ -0,0 +1,37 @@
+import logging
+import typing as t
+
+from aiomisc import Service
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from insurance.infrastructure.postgres.advisory_lock import AdvisoryLockClient
+from insurance.infrastructure.redis.lock_manager import RedlockManager
+
+logger = logging.getLogger('advisory_lock_client')
+
+
+class AdvisoryLockService(Service):
+    """
+    Drop-in replacement of RedlockService locking on the policy database.
+
+    Locks are held on a separate engine with at most `pool_size` connections. RedlockManager queues
+    waiters of one resource in-process, so a process holds one connection per locked policy and
+    `pool_size` bounds the number of policies locked at once. A lock waiting longer than
+    `acquire_timeout` for a connection fails with LockError. The database must allow `pool_size`
+    connections per process on top of the application pool
+    """
+    client: RedlockManager
+
+    def __init__(self, url: str, pool_size: int = 10, acquire_timeout: float = 60):
+        super().__init__()
+        self._engine = create_async_engine(url, pool_size=pool_size, max_overflow=0, pool_timeout=acquire_timeout)
+        self.client = RedlockManager(AdvisoryLockClient(self._engine, acquire_timeout=acquire_timeout),
+                                     acquire_timeout=acquire_timeout)
+
+    async def start(self) -> t.Any:
+        logger.info('Advisory lock service started')
+
+    async def stop(self, exception: Exception = None) -> t.Any:
+        await self.client.destroy(exception)
+        await self._engine.dispose()
+        logger.info('Advisory lock service stopped')
@@ -1,5 +1,14 @@
-from .service import RedlockService
+from .cache_client import RedisCacheClient
+from .lock_manager import LockStats, RedlockManager
+from .pubsub_lock import PubSubLock, PubSubLockClient
+from .service import RedlockService, RedisCacheService
 
 __all__ = [
+    'LockStats',
+    'PubSubLock',
+    'PubSubLockClient',
+    'RedisCacheClient',
+    'RedisCacheService',
+    'RedlockManager',
     'RedlockService',
 ]
@@ -0,0 +1,49 @@
+import logging
+import typing as t
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger('redis_cache_client')
+
+# Entry is a hash {version, data}. The write is skipped when the stored version is not older,
+# so a slow writer can not replace a newer aggregate with a stale one
+_SET_VERSIONED = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if current and tonumber(current) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'version', ARGV[1], 'data', ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisCacheClient:
+    def __init__(self, host: str, port: int = 6379, db: int = 0, prefix: str = 'insurance'):
+        self._redis = Redis(host=host, port=port, db=db)
+        self._prefix = prefix
+        self._set_versioned = self._redis.register_script(_SET_VERSIONED)
+
+    async def destroy(self, exception: Exception = None) -> t.Any:
+        await self._redis.aclose()
+
+    async def get_versioned(self, key: str) -> t.Optional[t.Tuple[int, bytes]]:
+        version, data = await self._redis.hmget(self._key(key), 'version', 'data')
+        if version is None or data is None:
+            return None
+        return int(version), data
+
+    async def set_versioned(self, key: str, version: int, data: bytes, ttl: float) -> bool:
+        return bool(await self._set_versioned(keys=[self._key(key)], args=[version, data, int(ttl * 1000)]))
+
+    async def get(self, key: str) -> t.Optional[bytes]:
+        return await self._redis.get(self._key(key))
+
+    async def set(self, key: str, data: bytes | str, ttl: float):
+        await self._redis.set(self._key(key), data, px=int(ttl * 1000))
+
+    async def delete(self, key: str):
+        await self._redis.delete(self._key(key))
+
+    def _key(self, key: str) -> str:
+        return f'{self._prefix}:{key}'
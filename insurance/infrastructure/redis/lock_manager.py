@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+import typing as t
+from dataclasses import dataclass
+
+from aioredlock import Lock, LockError
+
+from insurance.infrastructure.redis.client import RedlockClient
+from insurance.infrastructure.redis.pubsub_lock import PubSubLock, PubSubLockClient
+
+if t.TYPE_CHECKING:
+    from insurance.infrastructure.postgres import AdvisoryLockClient
+
+logger = logging.getLogger('redlock_manager')
+
+
+@dataclass
+class LockStats:
+    acquired: int = 0
+    # Acquisitions that had to wait for another holder of the resource on this node
+    contended: int = 0
+    failed: int = 0
+    wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    @property
+    def avg_wait_time(self) -> float:
+        return self.wait_time / self.acquired if self.acquired else 0.0
+
+    def record_wait(self, wait_time: float):
+        self.acquired += 1
+        self.wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+
+class _LocalLock:
+    __slots__ = ('lock', 'users')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class HeldLock:
+    """
+    Redis lock together with the local lock of the resource, released on exit of `async with`
+    """
+
+    def __init__(self, manager: 'RedlockManager', resource: str, lock: Lock | PubSubLock):
+        self._manager = manager
+        self._resource = resource
+        self._lock = lock
+        self._released = False
+
+    @property
+    def valid(self) -> bool:
+        return self._lock.valid
+
+    async def release(self):
+        if self._released:
+            return
+        self._released = True
+        try:
+            await self._lock.release()
+        finally:
+            self._manager._release_local(self._resource)
+
+    async def __aenter__(self) -> 'HeldLock':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release()
+
+
+class RedlockManager:
+    """
+    Redlock with waiters of the same resource queued in-process first, so only one of them per node
+    polls redis for the lock. A waiter queued longer than `acquire_timeout` fails with LockError
+    """
+
+    def __init__(self, client: 'RedlockClient | PubSubLockClient | AdvisoryLockClient', acquire_timeout: float = 60):
+        self._client = client
+        self._acquire_timeout = acquire_timeout
+        self._local: t.Dict[str, _LocalLock] = {}
+        self.stats = LockStats()
+
+    async def destroy(self, exception: Exception = None) -> t.Any:
+        logger.info('Lock stats: %s, average wait %.3fs', self.stats, self.stats.avg_wait_time)
+        await self._client.destroy(exception)
+
+    async def lock(self, resource: str, lock_identifier: t.Optional[str] = None, lock_timeout: int = 60) -> HeldLock:
+        resource = str(resource)
+        local = self._local.get(resource)
+        if local is None:
+            local = self._local[resource] = _LocalLock()
+        if local.lock.locked():
+            self.stats.contended += 1
+        local.users += 1
+
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(local.lock.acquire(), self._acquire_timeout)
+        except asyncio.TimeoutError:
+            self.stats.failed += 1
+            self._leave(resource, local)
+            raise LockError(f'Can not acquire lock {resource}, queued for {self._acquire_timeout}s') from None
+        except BaseException:
+            self._leave(resource, local)
+            raise
+        try:
+            lock = await self._client.lock(resource, lock_identifier=lock_identifier, lock_timeout=lock_timeout)
+        except BaseException:
+            self.stats.failed += 1
+            self._release_local(resource)
+            raise
+        self.stats.record_wait(time.monotonic() - started)
+        return HeldLock(self, resource, lock)
+
+    async def unlock(self, resource: str, lock_identifier: str):
+        """
+        Release the redis lock held by identifier, local waiters are released with the lock returned by `lock`
+        """
+        return await self._client.unlock(str(resource), lock_identifier)
+
+    async def is_locked(self, resource_or_lock: str | Lock | PubSubLock):
+        return await self._client.is_locked(resource_or_lock)
+
+    def _release_local(self, resource: str):
+        local = self._local[resource]
+        local.lock.release()
+        self._leave(resource, local)
+
+    def _leave(self, resource: str, local: _LocalLock):
+        local.users -= 1
+        if not local.users:
+            del self._local[resource]
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+import typing as t
+import uuid
+
+from aioredlock import LockError
+from redis.asyncio import Redis
+
+logger = logging.getLogger('pubsub_lock_client')
+
+# Lock is released only by its holder, waiters of the resource are notified in the same call
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    redis.call('PUBLISH', KEYS[2], '')
+    return 1
+end
+return 0
+"""
+
+
+class PubSubLock:
+    __slots__ = ('_client', 'resource', 'id', 'lock_timeout', 'valid')
+
+    def __init__(self, client: 'PubSubLockClient', resource: str, lock_identifier: str, lock_timeout: float):
+        self._client = client
+        self.resource = resource
+        self.id = lock_identifier
+        self.lock_timeout = lock_timeout
+        self.valid = True
+
+    async def release(self):
+        await self._client.unlock(self.resource, self.id)
+        self.valid = False
+
+    async def __aenter__(self) -> 'PubSubLock':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release()
+
+
+class PubSubLockClient:
+    """
+    Single instance redis lock, waiters are woken by the release notification instead of polling.
+    A waiter also retries when the lock expires, so a holder that died without release is not waited forever
+    """
+
+    def __init__(self, redis: Redis, prefix: str = 'insurance', acquire_timeout: float = 60):
+        self._redis = redis
+        self._prefix = prefix
+        self._acquire_timeout = acquire_timeout
+        self._release = self._redis.register_script(_RELEASE)
+        self._waiters: t.Dict[str, t.Set[asyncio.Event]] = {}
+        self._listener: t.Optional[asyncio.Task] = None
+        self._subscribed: t.Optional[asyncio.Future] = None
+
+    async def destroy(self, exception: Exception = None) -> t.Any:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        await self._redis.aclose()
+
+    async def lock(self, resource: str, lock_identifier: t.Optional[str] = None, lock_timeout: int = 60) -> PubSubLock:
+        resource = str(resource)
+        lock_identifier = lock_identifier or str(uuid.uuid4())
+        deadline = time.monotonic() + self._acquire_timeout
+        released = asyncio.Event()
+        self._waiters.setdefault(resource, set()).add(released)
+        try:
+            while True:
+                # Subscribed and cleared before the attempt, a release after a failed one is not missed
+                await self._ensure_listener()
+                released.clear()
+                acquired = await self._redis.set(self._lock_key(resource), lock_identifier,
+                                                 nx=True, px=int(lock_timeout * 1000))
+                if acquired:
+                    return PubSubLock(self, resource, lock_identifier, lock_timeout)
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    raise LockError(f'Can not acquire lock {resource}')
+                ttl = await self._redis.pttl(self._lock_key(resource))
+                if ttl > 0:
+                    timeout = min(timeout, ttl / 1000)
+                try:
+                    await asyncio.wait_for(released.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            waiters = self._waiters[resource]
+            waiters.discard(released)
+            if not waiters:
+                del self._waiters[resource]
+
+    async def unlock(self, resource: str, lock_identifier: str) -> bool:
+        keys = [self._lock_key(resource), self._channel(resource)]
+        return bool(await self._release(keys=keys, args=[lock_identifier]))
+
+    async def is_locked(self, resource_or_lock: str | PubSubLock) -> bool:
+        if isinstance(resource_or_lock, PubSubLock):
+            value = await self._redis.get(self._lock_key(resource_or_lock.resource))
+            return value is not None and value.decode() == resource_or_lock.id
+        return bool(await self._redis.exists(self._lock_key(resource_or_lock)))
+
+    async def _ensure_listener(self):
+        if self._listener is None or self._listener.done():
+            self._subscribed = asyncio.get_running_loop().create_future()
+            self._listener = asyncio.create_task(self._listen(self._subscribed))
+        try:
+            await asyncio.shield(self._subscribed)
+        except Exception:
+            # Without notifications waiters still retry when the lock expires
+            pass
+
+    async def _listen(self, subscribed: asyncio.Future):
+        """
+        One pattern subscription per client for release notifications of all resources
+        """
+        channel_prefix = self._channel('')
+        pubsub = self._redis.pubsub()
+        try:
+            await pubsub.psubscribe(self._channel('*'))
+            subscribed.set_result(None)
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None or message['type'] != 'pmessage':
+                    continue
+                resource = message['channel'].decode()[len(channel_prefix):]
+                for released in self._waiters.get(resource, ()):
+                    released.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning('Lock release listener failed', exc_info=True)
+            if not subscribed.done():
+                subscribed.set_exception(exc)
+        finally:
+            await pubsub.aclose()
+
+    def _lock_key(self, resource: str) -> str:
+        return f'{self._prefix}:lock:{resource}'
+
+    def _channel(self, resource: str) -> str:
+        return f'{self._prefix}:lock-released:{resource}'
@@ -2,18 +2,38 @@ import logging
 import typing as t
 
 from aiomisc import Service
+from redis.asyncio import Redis
 
+from insurance.infrastructure.redis.cache_client import RedisCacheClient
 from insurance.infrastructure.redis.client import RedlockClient
+from insurance.infrastructure.redis.lock_manager import RedlockManager
+from insurance.infrastructure.redis.pubsub_lock import PubSubLockClient
 
 logger = logging.getLogger('redlock_client')
 
 
 class RedlockService(Service):
-    client: RedlockClient
-
-    def __init__(self, host: str, port: int = 6379, db: int = 0):
+    """
+    Policy locks: `redlock` polls redis with aioredlock, `pubsub` wakes waiters by release notifications
+    """
+    client: RedlockManager
+
+    def __init__(self,
+                 host: str,
+                 port: int = 6379,
+                 db: int = 0,
+                 mode: str = 'redlock',
+                 prefix: str = 'insurance',
+                 acquire_timeout: float = 60):
         super().__init__()
-        self.client = RedlockClient(host=host, port=port, db=db)
+        if mode == 'pubsub':
+            lock_client = PubSubLockClient(Redis(host=host, port=port, db=db), prefix=prefix,
+                                           acquire_timeout=acquire_timeout)
+        elif mode == 'redlock':
+            lock_client = RedlockClient(host=host, port=port, db=db)
+        else:
+            raise ValueError(f'Unknown lock mode {mode}')
+        self.client = RedlockManager(lock_client, acquire_timeout=acquire_timeout)
 
     async def start(self) -> t.Any:
         logger.info('Redlock service started')
@@ -21,3 +41,18 @@ class RedlockService(Service):
     async def stop(self, exception: Exception = None) -> t.Any:
         await self.client.destroy(exception)
         logger.info('Redlock service stopped')
+
+
+class RedisCacheService(Service):
+    client: RedisCacheClient
+
+    def __init__(self, host: str, port: int = 6379, db: int = 0, prefix: str = 'insurance'):
+        super().__init__()
+        self.client = RedisCacheClient(host=host, port=port, db=db, prefix=prefix)
+
+    async def start(self) -> t.Any:
+        logger.info('Redis cache service started')
+
+    async def stop(self, exception: Exception = None) -> t.Any:
+        await self.client.destroy(exception)
+        logger.info('Redis cache service stopped')
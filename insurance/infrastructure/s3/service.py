@@ -7,9 +7,10 @@ from .client import S3Client
 
 
 class S3Service(Service):
-    def __init__(self, timeout, url: str, secret_access_key: str, access_key_id: str,):
+    def __init__(self, timeout, url: str, secret_access_key: str, access_key_id: str,
+                 session: t.Optional[AsyncClient] = None):
         super().__init__()
-        self._session: AsyncClient = AsyncClient(timeout=timeout)
+        self._session: AsyncClient = session or AsyncClient(timeout=timeout)
         self._client: S3Client = S3Client(session=self._session,
                                           url=url,
                                           secret_access_key=secret_access_key,
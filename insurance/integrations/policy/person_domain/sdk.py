@@ -8,10 +8,13 @@ from . import exceptions as exc
 
 
 class PersonDomainSDK:
+    _session: AsyncClient
 
-    def __init__(self, base_url: str, timeout: int = 10):
-        self._base_url = base_url
-        self._timeout = timeout
+    def set_session(self, session: AsyncClient):
+        self._session = session
+
+    async def aclose(self):
+        await self._session.aclose()
 
     async def get_client(self, iin: t.Optional[str], reference: t.Optional[UUID] = None) -> GetPersonResponse:
         param = dict()
@@ -26,6 +29,18 @@ class PersonDomainSDK:
         )
         return GetPersonResponse(**response[0])
 
+    async def get_clients(self, references: t.Sequence[UUID]) -> t.List[GetPersonResponse]:
+        """
+        Persons by references in one request, unknown references are skipped.
+        Relies on the person endpoint accepting repeated reference parameters, used only with batch_persons
+        """
+        response = await self._send_request(
+            method='GET',
+            url='/internal/v2/client/person',
+            params={'reference': [str(reference) for reference in references]}
+        )
+        return [GetPersonResponse(**person) for person in response]
+
     async def get_drivers_info(self, iin_list: t.Sequence[str]) -> GetDriversInfoResponse:
         param = {'iin': iin_list}
         response = await self._send_request(
@@ -43,14 +58,13 @@ class PersonDomainSDK:
             params: dict | None = None,
             headers: dict | None = None,
     ):
-        async with AsyncClient(base_url=self._base_url, timeout=self._timeout) as _session:
-            response = await _session.request(
-                method=method,
-                url=url,
-                data=data,
-                params=params,
-                headers=headers,
-            )
+        response = await self._session.request(
+            method=method,
+            url=url,
+            data=data,
+            params=params,
+            headers=headers,
+        )
         data = response.json()
         self._check_error(status_code=response.status_code, data=data)
         return data['data']
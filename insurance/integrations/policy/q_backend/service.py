@@ -8,10 +8,10 @@ from .client import QascoBackendClient
 
 
 class QascoBackendService(Service):
-    def __init__(self, base_url: str, timeout=30, **kwargs: t.Any):
+    def __init__(self, base_url: str, timeout=30, session: t.Optional[AsyncClient] = None, **kwargs: t.Any):
         super().__init__(**kwargs)
         self._client = QascoBackendClient()
-        self._client.set_session(AsyncClient(base_url=base_url, timeout=timeout))
+        self._client.set_session(session or AsyncClient(base_url=base_url, timeout=timeout))
 
     @property
     def client(self):
@@ -5,8 +5,8 @@ import insurance.integrations.policy.system_accounting.exceptions as exc
 
 
 class BaseClient:
-    def __init__(self, base_url: str, timeout: int = 10):
-        self._session = AsyncClient(base_url=base_url, timeout=timeout)
+    def __init__(self, base_url: str, timeout: int = 10, session: t.Optional[AsyncClient] = None):
+        self._session = session or AsyncClient(base_url=base_url, timeout=timeout)
 
     async def aclose(self):
         await self._session.aclose()
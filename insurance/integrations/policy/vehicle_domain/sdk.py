@@ -8,10 +8,13 @@ from .schemas import GetVehicleResponse
 
 
 class VehicleDomainSDK:
+    _session: AsyncClient
 
-    def __init__(self, base_url: str, timeout: int = 10):
-        self._base_url = base_url
-        self._timeout = timeout
+    def set_session(self, session: AsyncClient):
+        self._session = session
+
+    async def aclose(self):
+        await self._session.aclose()
 
     async def get_vehicle(
             self,
@@ -38,14 +41,13 @@ class VehicleDomainSDK:
             params: dict | None = None,
             headers: dict | None = None,
     ):
-        async with AsyncClient(base_url=self._base_url, timeout=self._timeout) as _session:
-            response = await _session.request(
-                method=method,
-                url=url,
-                data=data,
-                params=params,
-                headers=headers,
-            )
+        response = await self._session.request(
+            method=method,
+            url=url,
+            data=data,
+            params=params,
+            headers=headers,
+        )
         data = response.json()
         self._check_error(status_code=response.status_code, data=data)
         return data['data']
@@ -2,13 +2,30 @@ import typing as t
 
 from .sdk import VehicleDomainSDK
 from aiomisc import Service
+from httpx import AsyncClient, Limits
 
 
 class VehicleDomainService(Service):
 
-    def __init__(self, base_url: str, timeout, **kwargs: t.Any):
+    def __init__(self,
+                 base_url: str,
+                 timeout,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30,
+                 session: t.Optional[AsyncClient] = None,
+                 **kwargs: t.Any):
         super().__init__(**kwargs)
-        self._client = VehicleDomainSDK(base_url=base_url, timeout=timeout)
+        self._client = VehicleDomainSDK()
+        # Only a session created here is closed on stop, an injected one belongs to its owner
+        self._owns_session = session is None
+        if session is None:
+            session = AsyncClient(base_url=base_url,
+                                  timeout=timeout,
+                                  limits=Limits(max_connections=max_connections,
+                                                max_keepalive_connections=max_keepalive_connections,
+                                                keepalive_expiry=keepalive_expiry))
+        self._client.set_session(session)
 
     @property
     def client(self):
@@ -18,4 +35,5 @@ class VehicleDomainService(Service):
         ...
 
     async def stop(self, exception: Exception = None) -> t.Any:
-        ...
+        if self._owns_session:
+            await self._client.aclose()
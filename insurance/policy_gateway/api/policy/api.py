@@ -23,6 +23,7 @@ class PolicyApiV4:
         router = APIRouter(tags=['internal'], prefix='/internal/v4/policy')
         router.post('')(internal_handler.create_policy)
         router.get('')(internal_handler.get_policies)
+        router.get('/retention-reward')(internal_handler.get_retention_rewards)
         router.get('/{reference}')(internal_handler.get_policy)
         self._router.include_router(router)
 
@@ -71,6 +72,8 @@ class PolicyApiV1:
                     }
                     )(internal_handler.create_policy)
         router.get('', description='Получение списка Полисов')(internal_handler.get_policies)
+        router.get('/retention-reward',
+                   description='Сверка сумм удержания вознаграждения за период')(internal_handler.get_retention_rewards)
         router.get('/{reference}', description='Получение Полиса',
                    responses={
                        404: {'model': exc.PolicyNotFoundError.model()},
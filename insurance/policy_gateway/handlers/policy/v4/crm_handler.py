@@ -46,9 +46,7 @@ async def get_policies(request: Request,
 
 
 async def set_rescinded_policy(request: Request, reference: UUID, data: v1.SetRescindedPolicyRequest):
-    insurance_reference = await request.state.policy_view.get_insurance_reference_by_global_id(data.global_id)  # noqa
     command = cmd.UpdatePolicyStatusCommand(
-        insurance_reference=insurance_reference,
         global_id=data.global_id,
         event_type=PolicyStatusEnum.RESCINDED.value,
         event_time=data.timestamp,
@@ -58,9 +56,7 @@ async def set_rescinded_policy(request: Request, reference: UUID, data: v1.SetRe
 
 
 async def set_reissued_policy(request: Request, reference: UUID, data: v1.SetReissuedPolicyRequest):
-    insurance_reference = await request.state.policy_view.get_insurance_reference_by_global_id(data.global_id)  # noqa
     command = cmd.UpdatePolicyStatusCommand(
-        insurance_reference=insurance_reference,
         global_id=data.global_id,
         event_type=PolicyStatusEnum.REISSUED.value,
         event_time=data.timestamp,
@@ -70,9 +66,7 @@ async def set_reissued_policy(request: Request, reference: UUID, data: v1.SetRei
 
 
 async def set_operator_error_policy(request: Request, reference: UUID, data: v1.SetOperatorErrorRequest):
-    insurance_reference = await request.state.policy_view.get_insurance_reference_by_global_id(data.global_id)
-    command = cmd.UpdatePolicyStatusCommand(insurance_reference=insurance_reference,
-                                            global_id=data.global_id,
+    command = cmd.UpdatePolicyStatusCommand(global_id=data.global_id,
                                             event_type=PolicyStatusEnum.OPERATOR_ERROR.value,
                                             event_time=data.timestamp)
     await request.state.messagebus.handle(command)
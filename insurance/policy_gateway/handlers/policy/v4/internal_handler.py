@@ -6,6 +6,7 @@ from fastapi.requests import Request
 
 from insurance.policy_gateway.schemas.policy import v1
 from insurance.domains.policy import commands as cmd
+from insurance.domains.policy.model.retention_reward_batch import RetentionRewardBatchCalc, RetentionRewardRow
 
 
 async def create_policy(request: Request, data: v1.CreatePolicyRequest) -> v1.CreatePolicyResponse:
@@ -44,3 +45,24 @@ async def get_policies(request: Request,
     page_count = (count // limit) + 1
 
     return v1.InternalPoliciesResponse(data=policy_list, items=count, limit=limit, page=page, pages_count=page_count)
+
+
+async def get_retention_rewards(request: Request,
+                                start_date: dt.date = Query(default=dt.date.today(), alias='start-date'),
+                                end_date: dt.date = Query(default=dt.date.today(), alias='end-date'),
+                                ) -> v1.RetentionRewardsResponse:
+    rows = await request.state.policy_view.get_retention_reward_rows(
+        start_date=start_date,
+        end_date=end_date,
+        statuses=[status.value for status in RetentionRewardBatchCalc.STATUSES],
+    )
+    rewards = RetentionRewardBatchCalc.calc([RetentionRewardRow.from_dict(row) for row in rows])
+
+    return v1.RetentionRewardsResponse(data=[
+        dict(reference=row['reference'],
+             status=row['status'],
+             operation_date=row['operation_date'],
+             retention_reward=row['retention_reward'],
+             calculated_retention_reward=reward)
+        for row, reward in zip(rows, rewards)
+    ])
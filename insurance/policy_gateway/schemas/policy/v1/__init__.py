@@ -4,7 +4,7 @@ from .request import (
 )
 
 from .public_response import PublicPolicyResponse, CreatePolicyResponse, PolicyPDFResponse, PublicPoliciesResponse
-from .internal_response import InternalPolicyResponse, InternalPoliciesResponse
+from .internal_response import InternalPolicyResponse, InternalPoliciesResponse, RetentionRewardsResponse
 from .crm_response import CRMPolicyResponse, CRMPoliciesResponse
 
 __all__ = [
@@ -19,6 +19,7 @@ __all__ = [
     'PublicPoliciesResponse',
     'InternalPolicyResponse',
     'InternalPoliciesResponse',
+    'RetentionRewardsResponse',
     'CRMPolicyResponse',
     'CRMPoliciesResponse'
 ]
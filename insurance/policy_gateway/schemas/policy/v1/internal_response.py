@@ -67,3 +67,15 @@ class InternalPoliciesResponse(BaseModel):
     limit: int
     page: int
     pages_count: int
+
+
+class RetentionRewardStructure(BaseModel):
+    reference: UUID
+    status: str
+    operation_date: dt.date
+    retention_reward: t.Optional[Decimal]
+    calculated_retention_reward: Decimal
+
+
+class RetentionRewardsResponse(BaseModel):
+    data: t.List[RetentionRewardStructure]
@@ -0,0 +1,65 @@
+import logging
+import typing as t
+from uuid import UUID
+
+from insurance.domains.policy.model import Policy
+from insurance.infrastructure.cache import CacheStats, LRUCache
+from insurance.infrastructure.redis import RedisCacheClient
+from insurance.repository.policy.converter import Converter
+
+logger = logging.getLogger('policy_cache')
+
+
+class PolicyCache:
+    """
+    Read-through cache of policy aggregates: in-process LRU in front of an optional redis tier.
+    Entries are keyed by policy reference and valid only for the version they were stored with
+    """
+
+    def __init__(self, redis: t.Optional[RedisCacheClient] = None, maxsize: int = 1024, ttl: float = 300):
+        self._local: LRUCache[str, t.Tuple[int, bytes]] = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._redis = redis
+        self._ttl = ttl
+        self.stats = CacheStats()
+
+    @property
+    def local_stats(self) -> CacheStats:
+        return self._local.stats
+
+    async def get(self, reference: UUID, version: int) -> t.Optional[Policy]:
+        data = await self._get_data(self._key(reference), version)
+        if data is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return Converter.load_policy(data)
+
+    async def put(self, reference: UUID, version: int, data: bytes):
+        key = self._key(reference)
+        self._local.set(key, (version, data))
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set_versioned(key, version, data, self._ttl)
+        except Exception:
+            logger.warning('Failed to store policy %s in redis', reference, exc_info=True)
+
+    async def _get_data(self, key: str, version: int) -> t.Optional[bytes]:
+        entry = self._local.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        if self._redis is None:
+            return None
+        try:
+            entry = await self._redis.get_versioned(key)
+        except Exception:
+            logger.warning('Failed to read policy %s from redis', key, exc_info=True)
+            return None
+        if entry is None or entry[0] != version:
+            return None
+        self._local.set(key, entry)
+        return entry[1]
+
+    @staticmethod
+    def _key(reference: UUID) -> str:
+        return f'policy:{reference}'
@@ -1,19 +1,30 @@
 import datetime as dt
 import json
 import typing as t
+from collections import defaultdict
 from decimal import Decimal
-from types import MappingProxyType
+from types import MappingProxyType, SimpleNamespace
 from uuid import UUID
 
+from dddmisc import DDDEvent
+
 from insurance.domains.policy.dto import (
     Structure, InsuranceState, ProductTypeEnum, InsuranceNameEnum, PaymentTypeEnum,
     PolicyStatusEnum, PrevPolicy, PolicyLead, PolicyCreator, Insurer, Period, PeriodTypeEnum, StatusHistory,
-    DocumentCollection, Document, DocumentType, DocumentStatus
+    DocumentCollection, Document, DocumentType, DocumentStatus, StructureDriver, StructureVehicle, StructureLimit
 )
 from insurance.domains.policy.model import Policy, PolicyState
 
 
 class Converter:
+    # Columns of the get_policy row which are not plain json types in the cached form
+    _CACHED_UUID_FIELDS: t.Final = ('reference', 'lead_reference', 'creator_reference', 'actual_insurance_state')
+    _CACHED_DATETIME_FIELDS: t.Final = ('created_time', 'updated_time')
+    _STRUCTURE_ATTRS: t.Final = MappingProxyType({
+        'driver': StructureDriver,
+        'vehicle': StructureVehicle,
+        'limit': StructureLimit,
+    })
 
     @classmethod
     def create_policy(cls, policy: Policy) -> dict:
@@ -41,42 +52,145 @@ class Converter:
             created_time=state.created_time,
             updated_time=state.updated_time,
             version=1,
+            **cls.create_insurer(state.insurer),
+            **cls.create_structure(state.structure),
+            **cls.save_aggregate_children(state),
         )
 
     @classmethod
-    def create_insurance_state(cls, policy_reference: UUID, insurance_state: InsuranceState, period: Period):
-        return dict(reference=insurance_state.reference,
-                    policy_reference=policy_reference,
-                    begin_date=insurance_state.begin_date,
-                    end_date=period.end_date(insurance_state.begin_date),
-                    email=insurance_state.email,
-                    payment_type=insurance_state.payment_type.value,
-                    redirect_url=insurance_state.redirect_url,
-                    insurance_reference=insurance_state.insurance_reference,
-                    global_id=insurance_state.global_id,
-                    status=insurance_state.status.value)
+    def create_insurer(cls, insurer: Insurer) -> dict:
+        return dict(insurer_reference=insurer.reference,
+                    insurer_is_privileged=insurer.is_privileged,
+                    insurer_title=insurer.title)
 
     @classmethod
-    def create_documents(cls, document_collection: DocumentCollection, insurance_state_reference: UUID) -> t.List[dict]:
-        return [
-            dict(
-                reference=document.reference,
-                insurance_state_reference=insurance_state_reference,
-                type=document.document_type.value,
-                status=document.status.value
-            )
-            for document in document_collection.documents
-        ]
+    def create_structure(cls, list_structure: t.List[Structure]) -> dict:
+        return dict(structure_item_references=[strct.item_reference for strct in list_structure],
+                    structure_types=[strct.type for strct in list_structure],
+                    structure_titles=[strct.title for strct in list_structure],
+                    structure_attrs=[strct.attrs.model_dump_json() for strct in list_structure])
+
+    @classmethod
+    def save_aggregate_children(cls, policy_state: PolicyState) -> dict:
+        """
+        New or changed insurance states, documents and status records of the aggregate as parallel arrays
+        """
+        states = [state for state in policy_state.insurance_states.states if state.is_changed]
+        documents = [(insurance_state.reference, document)
+                     for insurance_state in policy_state.insurance_states.states
+                     for document in insurance_state.document_collection.documents
+                     if document.has_changes]
+        state_records = [(insurance_state.reference, record)
+                         for insurance_state in policy_state.insurance_states.states
+                         for record in insurance_state.status_history.new_records]
+        policy_records = policy_state.status_history.new_records
+        return dict(
+            policy_record_statuses=[record.status.value for record in policy_records],
+            policy_record_timestamps=[record.timestamp for record in policy_records],
+            state_references=[state.reference for state in states],
+            state_begin_dates=[state.begin_date for state in states],
+            state_end_dates=[policy_state.period.end_date(state.begin_date) for state in states],
+            state_emails=[state.email for state in states],
+            state_payment_types=[state.payment_type.value for state in states],
+            state_redirect_urls=[state.redirect_url for state in states],
+            state_insurance_references=[state.insurance_reference for state in states],
+            state_global_ids=[state.global_id for state in states],
+            state_statuses=[state.status.value for state in states],
+            state_record_statuses=[record.status.value for _, record in state_records],
+            state_record_timestamps=[record.timestamp for _, record in state_records],
+            state_record_state_references=[reference for reference, _ in state_records],
+            document_references=[document.reference for _, document in documents],
+            document_state_references=[reference for reference, _ in documents],
+            document_types=[document.document_type.value for _, document in documents],
+            document_statuses=[document.status.value for _, document in documents],
+        )
+
+    @classmethod
+    def get_policies(cls, rows: t.Iterable) -> t.List[Policy]:
+        get_policy = cls.get_policy
+        return [get_policy(policy_data) for policy_data in rows]
 
     @classmethod
     def get_policy(cls, policy_data) -> Policy:
+        structure, insurer = None, None
+        if policy_data.details_loaded:
+            structure = [Structure(**structure) for structure in policy_data.structure]
+            insurer = Insurer(**policy_data.insurer)
+        insurance_states = cls.parse_insurance_state(policy_data.insurance_states)
+        return cls._restore_policy(policy_data,
+                                   structure=structure,
+                                   insurer=insurer,
+                                   insurance_states=insurance_states)
+
+    @classmethod
+    def get_policies_typed(cls, rows: t.Iterable) -> t.List[Policy]:
+        get_policy_typed = cls.get_policy_typed
+        return [get_policy_typed(policy_data) for policy_data in rows]
+
+    @classmethod
+    def get_policy_typed(cls, policy_data) -> Policy:
+        """
+        Typed row of Statement.select_policies: values come from our own tables already typed by the driver,
+        so entities are built without parsing. Pydantic dto are still validated, from typed values
+        it is faster than model_construct
+        """
+        documents = defaultdict(list)
+        for state_reference, reference, document_type, status in zip(policy_data.document_state_references,
+                                                                      policy_data.document_references,
+                                                                      policy_data.document_types,
+                                                                      policy_data.document_statuses):
+            documents[state_reference].append(Document(reference=reference,
+                                                        document_type=DocumentType(document_type),
+                                                        status=DocumentStatus(status)))
+        insurance_states = [
+            InsuranceState(begin_date=begin_date,
+                           email=email,
+                           payment_type=PaymentTypeEnum(payment_type),
+                           status=PolicyStatusEnum(status),
+                           redirect_url=redirect_url,
+                           insurance_reference=insurance_reference,
+                           global_id=global_id,
+                           status_history=StatusHistory(),
+                           reference=reference,
+                           document_collection=DocumentCollection(documents=documents.get(reference)))
+            for reference, begin_date, email, payment_type, redirect_url, insurance_reference, global_id, status
+            in zip(policy_data.state_references,
+                   policy_data.state_begin_dates,
+                   policy_data.state_emails,
+                   policy_data.state_payment_types,
+                   policy_data.state_redirect_urls,
+                   policy_data.state_insurance_references,
+                   policy_data.state_global_ids,
+                   policy_data.state_statuses)
+        ]
+        if not policy_data.details_loaded:
+            return cls._restore_policy(policy_data, structure=None, insurer=None, insurance_states=insurance_states)
+        structure = [
+            Structure(item_reference=item_reference,
+                      type=structure_type,
+                      title=title,
+                      attrs=cls._STRUCTURE_ATTRS[structure_type](**attrs))
+            for item_reference, structure_type, title, attrs in zip(policy_data.structure_item_references,
+                                                                    policy_data.structure_types,
+                                                                    policy_data.structure_titles,
+                                                                    policy_data.structure_attrs)
+        ]
+        insurer = Insurer(reference=policy_data.insurer_reference,
+                          is_privileged=policy_data.insurer_is_privileged,
+                          title=policy_data.insurer_title)
+        return cls._restore_policy(policy_data, structure=structure, insurer=insurer, insurance_states=insurance_states)
+
+    @classmethod
+    def _restore_policy(cls,
+                        policy_data,
+                        structure: t.Optional[t.List[Structure]],
+                        insurer: t.Optional[Insurer],
+                        insurance_states: t.List[InsuranceState]) -> Policy:
         prev_policy = None
         if policy_data.prev_global_id:
             prev_policy = PrevPolicy(prev_global_id=policy_data.prev_global_id,
                                      insurance=InsuranceNameEnum(policy_data.insurance))
         retention_reward = Decimal(policy_data.retention_reward) if policy_data.retention_reward is not None else None
-        structure = [Structure(**structure) for structure in policy_data.structure]
-        insurance_states = cls.parse_insurance_state(policy_data.insurance_states)
         state = PolicyState.restore(
             reference=policy_data.reference,
             product=ProductTypeEnum(policy_data.product),
@@ -93,7 +207,7 @@ class Converter:
             conditions=tuple(policy_data.conditions),
             attributes=MappingProxyType(policy_data.attributes),
             structure=structure,
-            insurer=Insurer(**policy_data.insurer),
+            insurer=insurer,
             lead=PolicyLead(reference=policy_data.lead_reference),
             creator=PolicyCreator(reference=policy_data.creator_reference),
             period=Period(type=PeriodTypeEnum(policy_data.period_type), value=policy_data.period_value),
@@ -138,18 +252,97 @@ class Converter:
             ]
         )
 
-
     @classmethod
     def update_policy(cls, policy: Policy) -> dict:
+        """
+        Only columns changed since the policy was loaded are sent, see PolicyState.changed_fields
+        """
+        state = policy.state
+        columns = dict(downloaded=state.downloaded,
+                       premium=state.premium,
+                       cost=state.cost,
+                       reward=state.reward,
+                       retention_reward=state.retention_reward,
+                       status=state.status.value,
+                       conditions=state.conditions,
+                       attributes=json.dumps(dict(state.attributes)),
+                       actual_insurance_state=state.actual_insurance_state.reference)
+        return dict({column: columns[column] for column in state.changed_fields},
+                    reference=policy.reference,
+                    version=getattr(policy, '__version', None),
+                    **cls.save_aggregate_children(state))
+
+    @classmethod
+    def outbox_events(cls, policy: Policy, events: t.Iterable[DDDEvent]) -> dict:
+        """
+        Events in the order they were raised, with the message key, reference and timestamp to restore them
+        """
+        payloads = [json.dumps(dict(type=f'{event.__domain__}.{type(event).__name__}',
+                                    reference=str(event.__reference__),
+                                    timestamp=event.__timestamp__.isoformat(),
+                                    data=event.dump()))
+                    for event in sorted(events, key=lambda event: event.__timestamp__)]
+        return dict(aggregate_reference=policy.reference, payloads=payloads)
+
+    @classmethod
+    def dump_policy(cls, policy: Policy) -> bytes:
+        """
+        Compact cached form of the aggregate loaded with details, same shape as the row of Statement.select_policies
+        """
         state = policy.state
-        return dict(reference=policy.reference,
-                    downloaded=state.downloaded,
-                    premium=state.premium,
-                    cost=state.cost,
-                    reward=state.reward,
-                    retention_reward=str(state.retention_reward) if state.retention_reward is not None else None,
-                    status=state.status.value,
-                    conditions=state.conditions,
-                    attributes=json.dumps(dict(state.attributes)),
-                    actual_insurance_state_ref=state.actual_insurance_state.reference,
-                    version=getattr(policy, '__version', None))
+        row = dict(
+            reference=state.reference,
+            product=state.product.value,
+            insurance=state.insurance.value,
+            channel=state.channel,
+            phone=state.phone,
+            prev_global_id=state.prev_policy.prev_global_id if state.prev_policy else None,
+            downloaded=state.downloaded,
+            premium=state.premium,
+            cost=state.cost,
+            reward=state.reward,
+            retention_reward=state.retention_reward,
+            conditions=state.conditions,
+            status=state.status.value,
+            attributes=dict(state.attributes),
+            lead_reference=state.lead.reference,
+            creator_reference=state.creator.reference,
+            period_type=state.period.type.value,
+            period_value=state.period.value,
+            actual_insurance_state=state.actual_insurance_state.reference,
+            created_time=state.created_time,
+            updated_time=state.updated_time,
+            version=getattr(policy, '__version'),
+            details_loaded=True,
+            insurer=state.insurer.model_dump(mode='json'),
+            insurance_states=[cls._dump_insurance_state(insurance_state)
+                              for insurance_state in state.insurance_states.states],
+            structure=[strct.model_dump(mode='json') for strct in state.structure],
+        )
+        return json.dumps(row, default=str, separators=(',', ':')).encode()
+
+    @classmethod
+    def load_policy(cls, data: bytes) -> Policy:
+        row = json.loads(data)
+        for field in cls._CACHED_UUID_FIELDS:
+            row[field] = UUID(row[field])
+        for field in cls._CACHED_DATETIME_FIELDS:
+            row[field] = dt.datetime.fromisoformat(row[field])
+        return cls.get_policy(SimpleNamespace(**row))
+
+    @classmethod
+    def _dump_insurance_state(cls, insurance_state: InsuranceState) -> dict:
+        return dict(reference=insurance_state.reference,
+                    begin_date=insurance_state.begin_date,
+                    email=insurance_state.email,
+                    payment_type=insurance_state.payment_type.value,
+                    redirect_url=insurance_state.redirect_url,
+                    insurance_reference=insurance_state.insurance_reference,
+                    global_id=insurance_state.global_id,
+                    status=insurance_state.status.value,
+                    status_history=[],
+                    document_collection=[dict(reference=document.reference,
+                                              type=document.document_type.value,
+                                              status=document.status.value)
+                                         for document in insurance_state.document_collection.documents
+                                         if not document.is_canceled])
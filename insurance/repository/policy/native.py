@@ -0,0 +1,106 @@
+import functools
+import re
+import typing as t
+
+import asyncpg
+import orjson
+from sqlalchemy import TextClause, event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# `:name` bind parameters of text() statements, `::type` casts are not parameters
+_BIND_PARAM = re.compile(r'(?<![:\w]):(\w+)')
+
+_JSONB_FORMAT_VERSION: t.Final = b'\x01'
+
+
+@functools.lru_cache(maxsize=None)
+def compile_statement(stmt: TextClause) -> t.Tuple[str, t.Tuple[str, ...]]:
+    """
+    text() statement as asyncpg sql with `$n` placeholders and parameter names in placeholder order
+    """
+    names: t.Dict[str, int] = {}
+
+    def placeholder(match: re.Match) -> str:
+        return f'${names.setdefault(match.group(1), len(names) + 1)}'
+
+    sql = _BIND_PARAM.sub(placeholder, stmt.text)
+    return sql, tuple(names)
+
+
+class Row(asyncpg.Record):
+    """
+    Record with attribute access to columns, like sqlalchemy rows
+    """
+
+    def __getattr__(self, name: str) -> t.Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class Result:
+    """
+    Fetched rows with the part of the sqlalchemy result interface used by the repository
+    """
+    __slots__ = ('_rows',)
+
+    def __init__(self, rows: t.List[Row]):
+        self._rows = iter(rows)
+
+    def fetchone(self) -> t.Optional[Row]:
+        return next(self._rows, None)
+
+    def fetchall(self) -> t.List[Row]:
+        return list(self._rows)
+
+    def scalar(self) -> t.Any:
+        row = self.fetchone()
+        return None if row is None else row[0]
+
+
+async def execute(conn: AsyncConnection, stmt: TextClause, params: dict) -> Result:
+    """
+    Run statement with positional parameters on the asyncpg connection of the sqlalchemy connection,
+    inside its transaction. asyncpg prepares the statement on the server once per connection and reuses it
+    from its statement cache, sqlalchemy compilation, parameter processing and result wrapping are skipped
+    """
+    sql, names = compile_statement(stmt)
+    if not conn.in_transaction():
+        await conn.begin()
+    adapted = (await conn.get_raw_connection()).dbapi_connection
+    async with adapted._execute_mutex:
+        # The adapter begins the transaction on the server lazily, with its first statement
+        if adapted._transaction is None:
+            await adapted._start_transaction()
+        rows = await adapted.driver_connection.fetch(sql, *[params[name] for name in names], record_class=Row)
+    return Result(rows)
+
+
+def _encode_json(value: t.Any) -> bytes:
+    return value.encode() if isinstance(value, str) else orjson.dumps(value)
+
+
+def _encode_jsonb(value: t.Any) -> bytes:
+    return _JSONB_FORMAT_VERSION + _encode_json(value)
+
+
+def _decode_jsonb(value: bytes) -> t.Any:
+    return orjson.loads(value[1:])
+
+
+async def _set_orjson_codecs(connection):
+    await connection.set_type_codec('json', schema='pg_catalog', format='binary',
+                                    encoder=_encode_json, decoder=orjson.loads)
+    await connection.set_type_codec('jsonb', schema='pg_catalog', format='binary',
+                                    encoder=_encode_jsonb, decoder=_decode_jsonb)
+
+
+def register_orjson_codecs(engine: AsyncEngine):
+    """
+    Decode json/jsonb with orjson on every new connection of the engine.
+    Already serialized strings are sent as is, the same as sqlalchemy json types do
+    """
+    @event.listens_for(engine.sync_engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.run_async(_set_orjson_codecs)
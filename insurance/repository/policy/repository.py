@@ -1,12 +1,17 @@
+import asyncio
 import typing as t
 from uuid import UUID
 
 from dddmisc import AbstractAsyncRepository, decorators
+from sqlalchemy.ext.asyncio import AsyncEngine
 
-from insurance.domains.policy.abstractions import PolicyRepositoryABC
-from insurance.domains.policy.dto import InsuranceState, StatusRecord, Insurer, Structure
+from insurance.domains.policy.abstractions import PolicyRepositoryABC, PolicyLoadProfile
 from insurance.domains.policy.exceptions import PolicyNotFoundError, PolicyAlreadyUpdatedError
-from insurance.domains.policy.model import Policy, PolicyState
+from insurance.domains.policy.model import Policy
+from insurance.infrastructure.cache import LRUCache
+from insurance.infrastructure.policy_uow import UOWTransaction
+from insurance.repository.policy.cache import PolicyCache
+from insurance.repository.policy import native
 from insurance.repository.policy.converter import Converter
 from insurance.repository.policy.statement import Statement
 
@@ -14,30 +19,108 @@ from insurance.repository.policy.statement import Statement
 class PolicyRepository(AbstractAsyncRepository, PolicyRepositoryABC):
     aggregate_class = Policy
 
+    _connection: UOWTransaction
+
+    # Optional aggregate cache shared by all repositories, set up on application start
+    cache: t.ClassVar[t.Optional[PolicyCache]] = None
+
+    # (insurance_reference | global_id, value) -> policy reference, shared by the process.
+    # Unknown values are not remembered, a callback may arrive before its insurance info is committed
+    _references: t.ClassVar[LRUCache[t.Tuple[str, str], UUID]] = LRUCache(maxsize=10_000)
+
+    # Run statements as prepared statements directly on asyncpg connections, see native.execute.
+    # Switched on with use_native_backend
+    native_backend: t.ClassVar[bool] = False
+
+    # Read aggregates as native arrays and build dto without validation, see Converter.get_policy_typed
+    typed_rows: t.ClassVar[bool] = False
+
+    # Write aggregate events to the outbox table in the aggregate transaction instead of handing them
+    # to the message bus on commit, they are dispatched by OutboxDispatcherService. Switched on when it starts
+    outbox: t.ClassVar[bool] = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._stored = set()
 
+    @classmethod
+    def use_native_backend(cls, engine: AsyncEngine):
+        """
+        Run statements on asyncpg connections of the engine, json/jsonb of its connections are decoded
+        with orjson. Called on application start before the engine opens connections
+        """
+        native.register_orjson_codecs(engine)
+        cls.native_backend = True
+
     @decorators.agetter
-    async def get(self, reference: UUID) -> Policy:
-        async with self._connection.begin() as conn:
-            cursor = await conn.execute(Statement.get_policy, dict(reference=reference))
-        policy_data = cursor.fetchone()
-        if not policy_data:
-            raise PolicyNotFoundError()
+    async def get(self, reference: UUID, profile: PolicyLoadProfile = PolicyLoadProfile.FULL) -> Policy:
+        loaded = self._get_stored(reference)
+        if loaded is not None:
+            # Policy loaded without details is completed in place, see _get_filter
+            if profile == PolicyLoadProfile.FULL:
+                await self._load_details([loaded])
+            return loaded
+
+        policy = await self._get_cached(reference) if self.cache else None
+        if policy is None:
+            async with self._connection.begin() as conn:
+                cursor = await self._run(conn, self._select('reference', profile), dict(reference=reference))
+            policy_data = cursor.fetchone()
+            if not policy_data:
+                raise PolicyNotFoundError()
 
-        policy = Converter.get_policy(policy_data)
+            policy = self._decode(policy_data)
+            if self.cache:
+                await self._put_cached(policy)
         self._stored.add(policy)
         return policy
 
     @get.filter
-    def _get_filter(self, aggregator: Policy, reference: UUID):
-        return aggregator.reference == reference
+    def _get_filter(self, aggregator: Policy, reference: UUID, profile: PolicyLoadProfile = PolicyLoadProfile.FULL):
+        return aggregator.reference == reference and (profile == PolicyLoadProfile.STATUS or aggregator.details_loaded)
+
+    async def get_many(self,
+                       references: t.Iterable[UUID],
+                       profile: PolicyLoadProfile = PolicyLoadProfile.FULL) -> t.List[Policy]:
+        """
+        Policies already loaded by this repository are reused, the rest is loaded in one query.
+        Result keeps the order of references, unknown references are skipped
+        """
+        references = list(dict.fromkeys(references))
+        loaded = {policy.reference: policy for policy in self._stored}
+        if profile == PolicyLoadProfile.FULL:
+            await self._load_details([loaded[reference] for reference in references
+                                      if reference in loaded and not loaded[reference].details_loaded])
+        missing = [reference for reference in references if reference not in loaded]
+        if missing and self.cache:
+            for policy in await self._get_many_cached(missing):
+                self.add(policy)
+                self._stored.add(policy)
+                loaded[policy.reference] = policy
+            missing = [reference for reference in missing if reference not in loaded]
+        if missing:
+            async with self._connection.begin() as conn:
+                cursor = await self._run(conn, self._select('references', profile), dict(references=missing))
+            rows = cursor.fetchall()
+            policies = Converter.get_policies_typed(rows) if self.typed_rows else Converter.get_policies(rows)
+            for policy in policies:
+                self.add(policy)
+                self._stored.add(policy)
+                loaded[policy.reference] = policy
+        return [loaded[reference] for reference in references if reference in loaded]
+
+    async def get_by_insurance_reference(self,
+                                         insurance_reference: str,
+                                         profile: PolicyLoadProfile = PolicyLoadProfile.FULL) -> Policy:
+        return await self._get_by_insurance_state('insurance_reference', insurance_reference, profile)
+
+    async def get_by_global_id(self, global_id: str, profile: PolicyLoadProfile = PolicyLoadProfile.FULL) -> Policy:
+        return await self._get_by_insurance_state('global_id', global_id, profile)
 
     async def get_reference_by_insurance_reference(self, insurance_reference: str) -> UUID:
         async with self._connection.begin() as conn:
-            cursor = await conn.execute(Statement.get_policy_reference_by_insurance_reference,
-                                        dict(insurance_reference=insurance_reference))
+            cursor = await self._run(conn, Statement.get_policy_reference_by_insurance_reference,
+                                     dict(insurance_reference=insurance_reference))
         insurance_data = cursor.fetchone()
         if not insurance_data:
             raise PolicyNotFoundError()
@@ -49,108 +132,145 @@ class PolicyRepository(AbstractAsyncRepository, PolicyRepositoryABC):
             await self._update_policy(policy)
         else:
             await self._create_policy(policy)
+        if self.outbox:
+            await self._save_events(policy)
         self._stored.add(policy)
+        self._connection.on_commit(lambda: self._remember_references(policy))
+
+    async def _get_by_insurance_state(self, field: str, value: str, profile: PolicyLoadProfile) -> Policy:
+        """
+        Policy is resolved and loaded by a field of one of its insurance states in one statement,
+        known policy references go through get
+        """
+        reference = self._references.get((field, value))
+        if reference is not None:
+            return await self.get(reference, profile)
 
-    async def _create_policy(self, policy: Policy):
-        policy_state = policy.state
-        await self._create_policy_record(policy)
-        await self._create_or_update_insurance_state(policy_state)
-        await self._create_insurer(policy_reference=policy.reference, insurer=policy_state.insurer)
-        await self._create_structure(policy_reference=policy.reference, list_structure=policy_state.structure)
-
-    async def _create_policy_record(self, policy: Policy):
-        data = Converter.create_policy(policy)
-        stmt = Statement.insert_policy
         async with self._connection.begin() as conn:
-            await conn.execute(stmt, data)
-        records = policy.state.status_history.records
-        if not records:
+            cursor = await self._run(conn, self._select(field, profile), {field: value})
+        policy_data = cursor.fetchone()
+        if not policy_data:
+            raise PolicyNotFoundError()
+
+        loaded = self._get_stored(policy_data.reference)
+        if loaded is not None:
+            if profile == PolicyLoadProfile.FULL:
+                await self._load_details([loaded])
+            return loaded
+
+        policy = self._decode(policy_data)
+        self.add(policy)
+        self._stored.add(policy)
+        await self._remember_references(policy)
+        if self.cache:
+            await self._put_cached(policy)
+        return policy
+
+    def _select(self, by: str, profile: PolicyLoadProfile):
+        return Statement.select_policies(by, typed=self.typed_rows, details=profile == PolicyLoadProfile.FULL)
+
+    def _decode(self, policy_data) -> Policy:
+        return Converter.get_policy_typed(policy_data) if self.typed_rows else Converter.get_policy(policy_data)
+
+    def _get_stored(self, reference: UUID) -> t.Optional[Policy]:
+        return next((policy for policy in self._stored if policy.reference == reference), None)
+
+    async def _load_details(self, policies: t.List[Policy]):
+        """
+        Attach structure and insurer to policies loaded without them, keeping the loaded aggregates
+        and their unsaved changes
+        """
+        policies = [policy for policy in policies if not policy.details_loaded]
+        if not policies:
             return
-        await self._create_policy_status_records(policy_reference=policy.reference, records=records)
-
-    async def _create_or_update_insurance_state(self, policy_state: PolicyState):
-        insurance_state_data = []
-        documents_data = []
-        for insurance_state in policy_state.insurance_states.states:
-            insurance_state_data.append(
-                Converter.create_insurance_state(
-                    policy_reference=policy_state.reference,
-                    insurance_state=insurance_state,
-                    period=policy_state.period
-                )
-            )
-            documents_data.extend(
-                Converter.create_documents(
-                    document_collection=insurance_state.document_collection,
-                    insurance_state_reference=insurance_state.reference,
-                )
-            )
-        stmt = Statement.insert_or_update_insurance_state
         async with self._connection.begin() as conn:
-            await conn.execute(stmt, insurance_state_data)
-        for insurance_state in policy_state.insurance_states.states:
-            if insurance_state.status_history.records:
-                await self._create_insurance_state_status_record(insurance_state_reference=insurance_state.reference,
-                                                                 records=insurance_state.status_history.records)
-        if documents_data:
-            stmt = Statement.insert_or_update_document
-            async with self._connection.begin() as conn:
-                await conn.execute(stmt, documents_data)
+            cursor = await self._run(conn, self._select('references', PolicyLoadProfile.FULL),
+                                     dict(references=[policy.reference for policy in policies]))
+        details = {policy.reference: policy.state for policy in map(self._decode, cursor.fetchall())}
+        for policy in policies:
+            state = details.get(policy.reference)
+            if state is None:
+                raise PolicyNotFoundError()
+            policy.attach_details(structure=state.structure, insurer=state.insurer)
 
-    async def _create_insurer(self, policy_reference: UUID, insurer: Insurer):
-        async with self._connection.begin() as conn:
-            await conn.execute(
-                Statement.insert_policy_insurer,
-                dict(reference=insurer.reference,
-                     policy_reference=policy_reference,
-                     is_privileged=insurer.is_privileged,
-                     title=insurer.title
-                     )
-            )
-
-    async def _create_policy_status_records(self, policy_reference: UUID, records: t.List[StatusRecord]):
-        data = [dict(status=record.status,
-                     timestamp=record.timestamp,
-                     policy_reference=policy_reference) for record in records]
-        async with self._connection.begin() as conn:
-            await conn.execute(Statement.insert_policy_status_record, data)
-
-    async def _create_insurance_state_status_record(self,
-                                                    insurance_state_reference: UUID,
-                                                    records: t.List[StatusRecord]):
-        data = [dict(status=record.status,
-                     timestamp=record.timestamp,
-                     insurance_state_reference=insurance_state_reference) for record in records]
+    async def _remember_references(self, policy: Policy):
+        for insurance_state in policy.state.insurance_states.states:
+            if insurance_state.insurance_reference:
+                self._references.set(('insurance_reference', insurance_state.insurance_reference), policy.reference)
+            if insurance_state.global_id:
+                self._references.set(('global_id', insurance_state.global_id), policy.reference)
+
+    async def _get_cached(self, reference: UUID) -> t.Optional[Policy]:
+        """
+        Cached aggregate of the current version. The version is read on every hit: a primary key lookup
+        is much cheaper than the full select and decoding, and a stale aggregate is never served, because
+        use cases take decisions on loaded state before the version checked write
+        """
         async with self._connection.begin() as conn:
-            await conn.execute(Statement.insert_insurance_state_status_record, data)
-
-    async def _create_structure(self, policy_reference: UUID, list_structure: t.List[Structure]):
-        data = [dict(policy_reference=str(policy_reference),
-                     item_reference=strct.item_reference,
-                     type=strct.type,
-                     title=strct.title,
-                     attrs=strct.attrs.model_dump_json(),
-                     ) for strct in list_structure]
+            cursor = await self._run(conn, Statement.get_policy_version, dict(reference=reference))
+        version = cursor.scalar()
+        if version is None:
+            return None
+        return await self.cache.get(reference, version)
+
+    async def _get_many_cached(self, references: t.List[UUID]) -> t.List[Policy]:
         async with self._connection.begin() as conn:
-            await conn.execute(
-                Statement.insert_policy_structure,
-                data
-            )
+            cursor = await self._run(conn, Statement.get_policy_versions, dict(references=references))
+        versions = cursor.fetchall()
+        policies = await asyncio.gather(*[self.cache.get(row.reference, row.version) for row in versions])
+        return [policy for policy in policies if policy is not None]
+
+    async def _put_cached(self, policy: Policy):
+        """
+        Data read or written inside an open transaction is cached only after it is committed.
+        Policies loaded without details are not cached
+        """
+        if not policy.details_loaded:
+            return
+        reference, version, data = policy.reference, getattr(policy, '__version'), Converter.dump_policy(policy)
+        if self._connection.in_transaction:
+            self._connection.on_commit(lambda: self.cache.put(reference, version, data))
+        else:
+            await self.cache.put(reference, version, data)
+
+    async def _execute(self, stmt, params: dict):
+        conn = await self._connection.connection()
+        return await self._run(conn, stmt, params)
+
+    async def _run(self, conn, stmt, params: dict):
+        if self.native_backend:
+            return await native.execute(conn, stmt, params)
+        return await conn.execute(stmt, params)
+
+    async def _save_events(self, policy: Policy):
+        events = policy.get_aggregate_events()
+        if events:
+            await self._execute(Statement.insert_outbox_events, Converter.outbox_events(policy, events))
+
+    async def _create_policy(self, policy: Policy):
+        cursor = await self._execute(Statement.create_policy, Converter.create_policy(policy))
+        policy_data = cursor.fetchone()
+        setattr(policy, '__version', policy_data.version)
+        policy.clear_changes()
+        if self.cache:
+            await self._put_cached(policy)
 
     async def _update_policy(self, policy: Policy):
         """
-        Update policy data in two iterations
-        In firstly updates policy table
-        then updates insurance_state table
+        Update changed policy columns with version check and upsert its changed insurance states,
+        documents and new status records in one statement. Unchanged aggregates are not written
         """
-        async with self._connection.begin() as conn:
-            cursor = await conn.execute(Statement.update_policy, Converter.update_policy(policy))
+        policy_state = policy.state
+        if not policy_state.has_changes:
+            return
+
+        stmt = Statement.update_policy(tuple(sorted(policy_state.changed_fields)))
+        cursor = await self._execute(stmt, Converter.update_policy(policy))
         policy_data = cursor.fetchone()
         if not policy_data:
             raise PolicyAlreadyUpdatedError()
 
-        policy_state = policy.state
         setattr(policy, '__version', policy_data.version)
-        await self._create_or_update_insurance_state(policy_state)
-        if records := policy_state.status_history.records:
-            await self._create_policy_status_records(policy_reference=policy.reference, records=records)
+        policy.clear_changes()
+        if self.cache:
+            await self._put_cached(policy)
@@ -1,71 +1,78 @@
-from sqlalchemy import text
+import functools
+import typing as t
 
+from sqlalchemy import text, TextClause
 
-class Statement:
-    insert_policy = text("""
-    insert into policy(reference, product, insurance, channel, phone, prev_global_id, downloaded, premium, cost, 
-    reward, retention_reward, conditions, status, attributes, lead_reference, creator_reference, 
-    period_type, period_value, actual_insurance_state, created_time, updated_time, version)
-    values (:reference, :product, :insurance, :channel, :phone, :prev_global_id, :downloaded, :premium, :cost, 
-    :reward, :retention_reward, :conditions, :status, :attributes,:lead_reference, :creator_reference, 
-    :period_type, :period_value, :actual_insurance_state, :created_time, :updated_time, :version)
-    """)
-
-    insert_or_update_insurance_state = text("""
-    insert into insurance_state(
-    reference, policy_reference, begin_date, end_date, email, payment_type, redirect_url, insurance_reference, 
-    global_id, status)
-    values (
-    :reference, :policy_reference, :begin_date, :end_date, :email, :payment_type, :redirect_url, :insurance_reference, 
-    :global_id, :status
-    )
-    on conflict (reference) do update
-    set begin_date=:begin_date,
-        end_date=:end_date,
-        email=:email,
-        payment_type=:payment_type,
-        redirect_url=:redirect_url,
-        insurance_reference=:insurance_reference,
-        global_id=:global_id,
-        status=:status
-    """)
-
-    insert_or_update_document = text("""
-    insert into fin_document(reference, insurance_state_reference, type, status)
-    values (:reference, :insurance_state_reference, :type, :status)
-    on conflict (reference) do update
-    set status=:status
-    """)
-
-    insert_policy_status_record = text("""
-    insert into policy_status_record(
-    status, timestamp, policy_reference
-    )
-    values (
-    :status, :timestamp, :policy_reference
-    )
-    """)
-
-    insert_insurance_state_status_record = text("""
-    insert into insurance_state_status_record(
-    status, timestamp, insurance_state_reference
-    )
-    values (
-    :status, :timestamp, :insurance_state_reference
+# Child rows of the policy aggregate are sent as parallel arrays and unnested inside data-modifying CTEs.
+# Every CTE is gated on `{anchor}` (the inserted or version-checked updated policy row), so children are
+# written only when the policy row itself was written.
+_SAVE_AGGREGATE_CHILDREN = """
+    policy_records as (
+        insert into policy_status_record(status, timestamp, policy_reference)
+        select record.status, record.timestamp, cast(:reference as uuid)
+        from unnest(
+            cast(:policy_record_statuses as varchar[]),
+            cast(:policy_record_timestamps as timestamp[])
+        ) record(status, timestamp)
+        where exists(select 1 from {anchor})
+    ),
+    insurance_states as (
+        insert into insurance_state(
+        reference, policy_reference, begin_date, end_date, email, payment_type, redirect_url, insurance_reference, 
+        global_id, status)
+        select state.reference, cast(:reference as uuid), state.begin_date, state.end_date, state.email, 
+               state.payment_type, state.redirect_url, state.insurance_reference, state.global_id, state.status
+        from unnest(
+            cast(:state_references as uuid[]),
+            cast(:state_begin_dates as date[]),
+            cast(:state_end_dates as date[]),
+            cast(:state_emails as varchar[]),
+            cast(:state_payment_types as smallint[]),
+            cast(:state_redirect_urls as text[]),
+            cast(:state_insurance_references as varchar[]),
+            cast(:state_global_ids as varchar[]),
+            cast(:state_statuses as varchar[])
+        ) state(reference, begin_date, end_date, email, payment_type, redirect_url, insurance_reference, 
+                global_id, status)
+        where exists(select 1 from {anchor})
+        on conflict (reference) do update
+        set begin_date=excluded.begin_date,
+            end_date=excluded.end_date,
+            email=excluded.email,
+            payment_type=excluded.payment_type,
+            redirect_url=excluded.redirect_url,
+            insurance_reference=excluded.insurance_reference,
+            global_id=excluded.global_id,
+            status=excluded.status
+    ),
+    insurance_state_records as (
+        insert into insurance_state_status_record(status, timestamp, insurance_state_reference)
+        select record.status, record.timestamp, record.insurance_state_reference
+        from unnest(
+            cast(:state_record_statuses as varchar[]),
+            cast(:state_record_timestamps as timestamp[]),
+            cast(:state_record_state_references as uuid[])
+        ) record(status, timestamp, insurance_state_reference)
+        where exists(select 1 from {anchor})
+    ),
+    documents as (
+        insert into fin_document(reference, insurance_state_reference, type, status)
+        select document.reference, document.insurance_state_reference, document.type, document.status
+        from unnest(
+            cast(:document_references as uuid[]),
+            cast(:document_state_references as uuid[]),
+            cast(:document_types as varchar[]),
+            cast(:document_statuses as varchar[])
+        ) document(reference, insurance_state_reference, type, status)
+        where exists(select 1 from {anchor})
+        on conflict (reference) do update
+        set status=excluded.status
     )
-    """)
+"""
 
-    insert_policy_insurer = text("""
-    insert into insurer (reference, policy_reference, is_privileged, title)
-    values (:reference, :policy_reference, :is_privileged, :title)
-    """)
-
-    insert_policy_structure = text("""
-    insert into structure_item (item_reference, policy_reference, type, title, attrs)
-    values (:item_reference, :policy_reference, :type, :title, :attrs)
-    """)
 
-    get_policy = text("""
+# Aggregate rows of the policies matched by `{condition}` on the policy reference, see Statement.select_policies
+_GET_POLICIES = """
     with structure as (select policy_reference,
                               json_agg(
                                       json_build_object(
@@ -76,22 +83,9 @@ class Statement:
                                           )
                                   ) structure
                        from structure_item
-                       where policy_reference = :reference
+                       where policy_reference {condition}
                        group by policy_reference),
     insurance_states as (
-        with fin_documents as (
-            select insurance_state_reference,
-            json_agg(
-                json_build_object(
-                    'reference', reference,
-                    'type', type,
-                    'status', status
-                )
-            ) fin_documents
-            from fin_document
-            where status != 'CANCELED'
-            group by insurance_state_reference
-        )
         select policy_reference,
             json_agg(
                 json_build_object(
@@ -104,15 +98,26 @@ class Statement:
                     'global_id', global_id,
                     'status', status,
                     'status_history', array []::varchar[],
-                    'document_collection', coalesce(document_collection.fin_documents, '[]')
+                    'document_collection', coalesce(
+                        (select json_agg(
+                                    json_build_object(
+                                        'reference', fin_document.reference,
+                                        'type', fin_document.type,
+                                        'status', fin_document.status
+                                    )
+                                )
+                         from fin_document
+                         where fin_document.insurance_state_reference = insurance_state.reference
+                           and fin_document.status != 'CANCELED'),
+                        '[]'
+                    )
                 )
             ) "insurance_states"
         from insurance_state
-        left join fin_documents document_collection on document_collection.insurance_state_reference = insurance_state.reference
-        where policy_reference = :reference
+        where policy_reference {condition}
         group by policy_reference
     )
-    
+
     select p.reference,
            p.product,
            p.insurance,
@@ -135,18 +140,224 @@ class Statement:
            p.created_time,
            p.updated_time,
            p.version,
+           {details_columns},
+           states.insurance_states
+    from policy p
+             join insurance_states states on states.policy_reference = p.reference
+             {details_joins}
+    where p.reference {condition}
+"""
+
+_DETAILS_COLUMNS = """true details_loaded,
            json_build_object(
                    'reference', i.reference,
                    'is_privileged', i.is_privileged,
                    'title', i.title
                ) insurer,
-           states.insurance_states,
-           strct.structure
+           strct.structure"""
+
+_NO_DETAILS_COLUMNS = """false details_loaded,
+           null insurer,
+           null structure"""
+
+
+# Same aggregate rows with children as native arrays instead of json, decoded by Converter.get_policy_typed.
+# Parallel arrays of one aggregate call share the order of input rows
+_GET_POLICIES_TYPED = """
+    with structure as (
+        select policy_reference,
+               array_agg(item_reference) structure_item_references,
+               array_agg(type) structure_types,
+               array_agg(title) structure_titles,
+               array_agg(attrs) structure_attrs
+        from structure_item
+        where policy_reference {condition}
+        group by policy_reference
+    ),
+    insurance_states as (
+        select policy_reference,
+               array_agg(reference) state_references,
+               array_agg(begin_date) state_begin_dates,
+               array_agg(email) state_emails,
+               array_agg(payment_type) state_payment_types,
+               array_agg(redirect_url) state_redirect_urls,
+               array_agg(insurance_reference) state_insurance_references,
+               array_agg(global_id) state_global_ids,
+               array_agg(status) state_statuses
+        from insurance_state
+        where policy_reference {condition}
+        group by policy_reference
+    ),
+    documents as (
+        select insurance_state.policy_reference,
+               array_agg(fin_document.insurance_state_reference) document_state_references,
+               array_agg(fin_document.reference) document_references,
+               array_agg(fin_document.type) document_types,
+               array_agg(fin_document.status) document_statuses
+        from fin_document
+                 join insurance_state on insurance_state.reference = fin_document.insurance_state_reference
+        where insurance_state.policy_reference {condition}
+          and fin_document.status != 'CANCELED'
+        group by insurance_state.policy_reference
+    )
+
+    select p.reference,
+           p.product,
+           p.insurance,
+           p.channel,
+           p.phone,
+           p.prev_global_id,
+           p.downloaded,
+           p.premium,
+           p.cost,
+           p.reward,
+           p.retention_reward,
+           p.conditions,
+           p.status,
+           p.attributes,
+           p.lead_reference,
+           p.creator_reference,
+           p.period_type,
+           p.period_value,
+           p.actual_insurance_state,
+           p.created_time,
+           p.updated_time,
+           p.version,
+           {details_columns},
+           states.state_references,
+           states.state_begin_dates,
+           states.state_emails,
+           states.state_payment_types,
+           states.state_redirect_urls,
+           states.state_insurance_references,
+           states.state_global_ids,
+           states.state_statuses,
+           coalesce(docs.document_state_references, array[]::uuid[]) document_state_references,
+           coalesce(docs.document_references, array[]::uuid[]) document_references,
+           coalesce(docs.document_types, array[]::varchar[]) document_types,
+           coalesce(docs.document_statuses, array[]::varchar[]) document_statuses
     from policy p
              join insurance_states states on states.policy_reference = p.reference
-             join structure strct on strct.policy_reference = p.reference
-             join insurer i on p.reference = i.policy_reference
-    where p.reference = :reference    
+             left join documents docs on docs.policy_reference = p.reference
+             {details_joins}
+    where p.reference {condition}
+"""
+
+_TYPED_DETAILS_COLUMNS = """true details_loaded,
+           i.reference insurer_reference,
+           i.is_privileged insurer_is_privileged,
+           i.title insurer_title,
+           strct.structure_item_references,
+           strct.structure_types,
+           strct.structure_titles,
+           strct.structure_attrs"""
+
+_TYPED_NO_DETAILS_COLUMNS = """false details_loaded,
+           null insurer_reference,
+           null insurer_is_privileged,
+           null insurer_title,
+           null structure_item_references,
+           null structure_types,
+           null structure_titles,
+           null structure_attrs"""
+
+# Structure and insurer of the policy. Without them the structure CTE is not referenced and not evaluated
+_DETAILS_JOINS = """join structure strct on strct.policy_reference = p.reference
+             join insurer i on p.reference = i.policy_reference"""
+
+# Conditions on the policy reference of aggregate reads by name of the parameter
+_POLICY_CONDITIONS: t.Final[t.Mapping[str, str]] = {
+    'reference': '= :reference',
+    'references': '= any(cast(:references as uuid[]))',
+    'insurance_reference': """= (
+        select policy_reference from insurance_state where insurance_reference = :insurance_reference
+    )""",
+    'global_id': """= (
+        select policy_reference from insurance_state where global_id = :global_id
+    )""",
+}
+
+
+class Statement:
+    create_policy = text(f"""
+    with inserted_policy as (
+        insert into policy(reference, product, insurance, channel, phone, prev_global_id, downloaded, premium, cost, 
+        reward, retention_reward, conditions, status, attributes, lead_reference, creator_reference, 
+        period_type, period_value, actual_insurance_state, created_time, updated_time, version)
+        values (:reference, :product, :insurance, :channel, :phone, :prev_global_id, :downloaded, :premium, :cost, 
+        :reward, :retention_reward, :conditions, :status, :attributes,:lead_reference, :creator_reference, 
+        :period_type, :period_value, :actual_insurance_state, :created_time, :updated_time, :version)
+        returning reference, version
+    ),
+    {_SAVE_AGGREGATE_CHILDREN.format(anchor='inserted_policy')},
+    insurer as (
+        insert into insurer (reference, policy_reference, is_privileged, title)
+        select cast(:insurer_reference as uuid), reference, cast(:insurer_is_privileged as boolean), 
+               cast(:insurer_title as varchar)
+        from inserted_policy
+    ),
+    structure as (
+        insert into structure_item (item_reference, policy_reference, type, title, attrs)
+        select item.item_reference, cast(:reference as uuid), item.type, item.title, item.attrs
+        from unnest(
+            cast(:structure_item_references as uuid[]),
+            cast(:structure_types as varchar[]),
+            cast(:structure_titles as varchar[]),
+            cast(:structure_attrs as jsonb[])
+        ) item(item_reference, type, title, attrs)
+        where exists(select 1 from inserted_policy)
+    )
+    select reference, version from inserted_policy
+    """)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def update_policy(columns: t.Tuple[str, ...]) -> TextClause:
+        """
+        Version checked update of the given policy columns together with changed child rows
+        """
+        assignments = ''.join(f'{column}=:{column},\n            ' for column in columns)
+        return text(f"""
+    with updated_policy as (
+        update policy
+        set {assignments}version=version + 1
+        where reference = :reference and version=:version
+        returning reference, version
+    ),
+    {_SAVE_AGGREGATE_CHILDREN.format(anchor='updated_policy')}
+    select reference, version from updated_policy
+    """)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def select_policies(by: str, typed: bool = False, details: bool = True) -> TextClause:
+        """
+        Aggregate rows matched by the parameter `by`, children as json or as native arrays (typed).
+        Structure and insurer are read only with details
+        """
+        if typed:
+            template = _GET_POLICIES_TYPED
+            details_columns = _TYPED_DETAILS_COLUMNS if details else _TYPED_NO_DETAILS_COLUMNS
+        else:
+            template = _GET_POLICIES
+            details_columns = _DETAILS_COLUMNS if details else _NO_DETAILS_COLUMNS
+        return text(template.format(condition=_POLICY_CONDITIONS[by],
+                                    details_columns=details_columns,
+                                    details_joins=_DETAILS_JOINS if details else ''))
+
+    get_policy_version = text("""
+    select version from policy where reference = :reference
+    """)
+
+    get_policy_versions = text("""
+    select reference, version from policy where reference = any(cast(:references as uuid[]))
+    """)
+
+    insert_outbox_events = text("""
+    insert into outbox_event(aggregate_reference, payload)
+    select cast(:aggregate_reference as uuid), cast(event.payload as jsonb)
+    from unnest(cast(:payloads as text[])) with ordinality event(payload, position)
+    order by event.position
     """)
 
     get_policy_reference_by_insurance_reference = text("""
@@ -155,18 +366,3 @@ class Statement:
     where insurance_reference=:insurance_reference
     """)
 
-    update_policy = text("""
-    update policy
-    set downloaded=:downloaded,
-        premium=:premium,
-        cost=:cost,
-        reward=:reward,
-        retention_reward=:retention_reward,
-        status=:status,
-        attributes=:attributes,
-        actual_insurance_state=:actual_insurance_state_ref,
-        version=version + 1
-    where reference = :reference and version=:version
-    returning *;
-    """)
-
@@ -227,3 +227,49 @@ class View:
         if not ins_state:
             raise PolicyNotFoundError()
         return ins_state.insurance_reference
+
+    async def get_retention_reward_rows(self,
+                                        start_date: dt.date,
+                                        end_date: dt.date,
+                                        statuses: t.Iterable[str]) -> list[dict]:
+        """
+        Columns needed to recalc retention rewards of policies which got one of statuses in the period,
+        operation_date is the date of the last such status record
+        """
+        pol = sa.alias(PolicyTable, 'pol')
+        record = sa.alias(PolicyStatusRecordTable, 'record')
+        statuses = list(statuses)
+
+        operation_stmt = sa.select(
+            record.c.policy_reference,
+            record.c.status,
+            sa.func.max(record.c.timestamp).label('operation_time'),
+        ).where(
+            record.c.status.in_(statuses),
+            record.c.timestamp >= dt.datetime.combine(start_date, dt.datetime.min.time()),
+            record.c.timestamp <= dt.datetime.combine(end_date, dt.datetime.max.time()),
+        ).group_by(record.c.policy_reference, record.c.status).cte('operation_stmt')
+
+        stmt = sa.select(
+            pol.c.reference,
+            pol.c.product,
+            pol.c.insurance,
+            pol.c.status,
+            pol.c.reward,
+            pol.c.retention_reward,
+            pol.c.cost,
+            pol.c.attributes['refund_amount'].astext.label('refund_amount'),
+            pol.c.attributes['with_inexperienced'].label('with_inexperienced'),
+            pol.c.attributes['region_changed'].label('region_changed'),
+            sa.cast(pol.c.created_time, sa.Date).label('created_date'),
+            sa.cast(operation_stmt.c.operation_time, sa.Date).label('operation_date'),
+        ).join(
+            operation_stmt, sa.and_(operation_stmt.c.policy_reference == pol.c.reference,
+                                    operation_stmt.c.status == pol.c.status)
+        ).order_by(pol.c.created_time)
+
+        async with self._engine.begin() as conn:
+            cursor = await conn.execute(stmt)
+            rows = cursor.fetchall()
+
+        return [row._asdict() for row in rows]
@@ -0,0 +1,171 @@
+import asyncio
+import datetime as dt
+import uuid
+
+import pytest
+
+# The package also exports the adapter built on the insurances adapter sdk
+pytest.importorskip('insurances_adapter')
+
+from insurance.adapters.policy.client_domain import AgeExperienceCache, PersonCache  # noqa: E402
+from insurance.infrastructure.cache import lru  # noqa: E402
+from insurance.integrations.policy.person_domain.schemas import GetPersonResponse  # noqa: E402
+
+
+class _Redis:
+    def __init__(self, fail: bool = False):
+        self.data = {}
+        self._fail = fail
+
+    async def get(self, key):
+        if self._fail:
+            raise ConnectionError()
+        return self.data.get(key)
+
+    async def set(self, key, data, ttl):
+        if self._fail:
+            raise ConnectionError()
+        self.data[key] = data
+
+
+def _person(iin='900101300000') -> GetPersonResponse:
+    return GetPersonResponse.model_validate(dict(
+        iin=iin, surname='Ivanov', name='Ivan', reference=str(uuid.uuid4()),
+        id_document=dict(document_type='ID', document_number='042', document_date='2020-01-02'),
+        driver_license=dict(number='AB123', issue_date='2019-05-06'),
+        required_id_document=False, can_drive_car=True, phone='77000000000', required_phone_number=False,
+    ))
+
+
+def _loader(person):
+    calls = []
+
+    async def load():
+        calls.append(True)
+        await asyncio.sleep(0)
+        return person
+
+    return load, calls
+
+
+@pytest.mark.asyncio
+async def test_person_is_cached_by_reference_and_iin():
+    person = _person()
+    load, calls = _loader(person)
+    cache = PersonCache()
+
+    assert await cache.get(load, reference=person.reference) is person
+    assert await cache.get(load, reference=person.reference) is person
+    assert await cache.get(load, iin=person.iin) is person
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_person_without_iin_is_cached_by_reference_only():
+    person = _person().model_copy(update=dict(iin=None))
+    load, _ = _loader(person)
+    cache = PersonCache()
+
+    await cache.get(load, reference=person.reference)
+
+    assert list(cache._local._data) == [('reference', str(person.reference))]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    person = _person()
+    load, calls = _loader(person)
+    cache = PersonCache()
+
+    persons = await asyncio.gather(*[cache.get(load, reference=person.reference) for _ in range(5)])
+
+    assert persons == [person] * 5
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_round_trip():
+    person = _person()
+    redis = _Redis()
+    load, calls = _loader(person)
+    await PersonCache(redis).get(load, reference=person.reference)
+
+    # Another worker with an empty local cache reads the person stored with field aliases
+    shared = await PersonCache(redis).get(load, iin=person.iin)
+
+    assert len(calls) == 1
+    assert shared == person
+    assert shared.id_document.issue_date == dt.date(2020, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_load():
+    person = _person()
+    load, calls = _loader(person)
+
+    assert await PersonCache(_Redis(fail=True)).get(load, reference=person.reference) is person
+    assert len(calls) == 1
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _age_experience_loader(*results):
+    results = list(results)
+    calls = []
+
+    async def load():
+        calls.append(True)
+        return results.pop(0)
+
+    return load, calls
+
+
+@pytest.mark.asyncio
+async def test_age_experience_is_cached_for_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(lru.time, 'monotonic', clock)
+    cache = AgeExperienceCache(ttl=100, negative_ttl=10)
+    load, calls = _age_experience_loader(7, 8)
+    certificate = dict(number='AB123', issue_date=dt.date(2019, 5, 6))
+
+    assert await cache.get(load, '900101300000', certificate) == 7
+    clock.now = 50
+    assert await cache.get(load, '900101300000', certificate) == 7
+    clock.now = 101
+    assert await cache.get(load, '900101300000', certificate) == 8
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_age_experience_is_cached_for_negative_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(lru.time, 'monotonic', clock)
+    cache = AgeExperienceCache(ttl=100, negative_ttl=10)
+    load, calls = _age_experience_loader(None, 7)
+
+    assert await cache.get(load, '900101300000', None) is None
+    clock.now = 5
+    assert await cache.get(load, '900101300000', None) is None
+    assert len(calls) == 1
+
+    clock.now = 11
+    assert await cache.get(load, '900101300000', None) == 7
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize('issue_date', [dt.date(2019, 5, 6), dt.datetime(2019, 5, 6, 10), '2019-05-06'])
+def test_age_experience_key_accepts_issue_date_as_date_or_string(issue_date):
+    key = AgeExperienceCache._key('900101300000', dict(number='AB123', issue_date=issue_date))
+
+    assert key == ('900101300000', 'AB123', '2019-05-06')
+
+
+def test_age_experience_key_without_licence():
+    assert AgeExperienceCache._key('900101300000', None) == ('900101300000', None, None)
+    assert AgeExperienceCache._key('900101300000', dict(number='AB123')) == ('900101300000', 'AB123', None)
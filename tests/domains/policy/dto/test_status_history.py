@@ -0,0 +1,63 @@
+import datetime as dt
+
+from insurance.domains.policy.dto import PolicyStatusEnum, StatusHistory, StatusRecord
+
+_START = dt.datetime(2024, 1, 1, 12)
+
+
+def _record(status: PolicyStatusEnum, minutes: int) -> StatusRecord:
+    return StatusRecord(status=status, timestamp=_START + dt.timedelta(minutes=minutes))
+
+
+def test_out_of_order_records_are_kept_in_timestamp_order():
+    draft = _record(PolicyStatusEnum.DRAFT, 0)
+    wait = _record(PolicyStatusEnum.WAIT_CALLBACK, 1)
+    payed = _record(PolicyStatusEnum.PAYED, 2)
+    history = StatusHistory(payed, draft)
+
+    history.add_record(wait.status, wait.timestamp)
+
+    assert list(history.records) == [draft, wait, payed]
+    assert history.new_records == [payed, draft, wait]
+
+
+def test_records_of_equal_timestamps_keep_insertion_order():
+    history = StatusHistory(_record(PolicyStatusEnum.PAYED, 1))
+
+    history.add_record(PolicyStatusEnum.COMPLETED_IN_INSURANCE, _START)
+    history.add_record(PolicyStatusEnum.COMPLETED, _START)
+    history.add_record(PolicyStatusEnum.DRAFT, _START)
+
+    assert [record.status for record in history.records] == [PolicyStatusEnum.COMPLETED_IN_INSURANCE,
+                                                             PolicyStatusEnum.COMPLETED,
+                                                             PolicyStatusEnum.DRAFT,
+                                                             PolicyStatusEnum.PAYED]
+
+
+def test_duplicate_record_is_ignored():
+    draft = _record(PolicyStatusEnum.DRAFT, 0)
+    history = StatusHistory(draft)
+
+    history.add_record(draft.status, draft.timestamp)
+
+    assert list(history.records) == [draft]
+    assert history.new_records == [draft]
+
+
+def test_only_records_added_after_mark_persisted_are_new():
+    draft = _record(PolicyStatusEnum.DRAFT, 1)
+    history = StatusHistory(draft)
+    history.mark_persisted()
+
+    assert history.new_records == []
+
+    earlier = _record(PolicyStatusEnum.WAIT_CALLBACK, 0)
+    history.add_record(earlier.status, earlier.timestamp)
+
+    assert history.new_records == [earlier]
+    assert list(history.records) == [earlier, draft]
+
+    history.mark_persisted()
+    history.add_record(draft.status, draft.timestamp)
+
+    assert history.new_records == []
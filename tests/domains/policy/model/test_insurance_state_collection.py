@@ -0,0 +1,53 @@
+from copy import deepcopy
+
+from insurance.domains.policy.dto import PaymentTypeEnum, PolicyStatusEnum
+from insurance.domains.policy.model.model_state import InsuranceStateCollection
+
+
+def _collection(*states) -> InsuranceStateCollection:
+    collection = InsuranceStateCollection()
+    collection.set_insurance_states(*states)
+    return collection
+
+
+def test_lookups_return_first_state_in_collection_order(insurance_state_factory):
+    first = insurance_state_factory(PolicyStatusEnum.DRAFT, global_id=None)
+    second = insurance_state_factory(PolicyStatusEnum.DRAFT, global_id=None)
+    collection = _collection(first, second)
+
+    assert collection.states == (first, second)
+    assert collection.get_by_status(PolicyStatusEnum.DRAFT) is first
+    assert collection.get_by_global_id(None) is first
+    assert collection.get_by_reference(second.reference) is second
+    assert collection.get_by_insurance_reference(second.insurance_reference) is second
+    assert collection.search(first.begin_date, first.email, first.payment_type) is first
+    assert collection.get_by_status(PolicyStatusEnum.COMPLETED) is None
+
+
+def test_changed_indexed_field_is_reindexed(insurance_state_factory):
+    draft = insurance_state_factory(PolicyStatusEnum.DRAFT)
+    collection = _collection(draft)
+    old_insurance_reference = draft.insurance_reference
+
+    draft.insurance_reference = 'new-reference'
+    draft.set_status(PolicyStatusEnum.WAIT_CALLBACK, timestamp=draft.status_history.records[0].timestamp)
+    draft.payment_type = PaymentTypeEnum.WITH_OUT_ANY_PAY
+
+    assert collection.get_by_insurance_reference('new-reference') is draft
+    assert collection.get_by_insurance_reference(old_insurance_reference) is None
+    assert collection.get_by_status(PolicyStatusEnum.WAIT_CALLBACK) is draft
+    assert collection.get_by_status(PolicyStatusEnum.DRAFT) is None
+    assert collection.search(draft.begin_date, draft.email, PaymentTypeEnum.WITH_OUT_ANY_PAY) is draft
+
+
+def test_deep_copy_indexes_copied_states(insurance_state_factory):
+    state = insurance_state_factory()
+    copied = deepcopy(_collection(state))
+    [copied_state] = copied.states
+
+    assert copied_state is not state
+    assert copied.get_by_reference(state.reference) is copied_state
+
+    copied_state.global_id = 'copied'
+    assert copied.get_by_global_id('copied') is copied_state
+    assert state.global_id != 'copied'
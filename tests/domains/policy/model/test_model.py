@@ -0,0 +1,39 @@
+import pytest
+
+
+def test_state_snapshot_is_shared_until_policy_changes(policy):
+    snapshot = policy.state
+
+    assert policy.state is snapshot
+    policy.set_pdf_downloaded()
+
+    assert policy.state is not snapshot
+    assert policy.state.downloaded and not snapshot.downloaded
+
+
+def test_state_snapshot_is_rebuilt_after_changes_are_cleared(policy):
+    policy.set_pdf_downloaded()
+    snapshot = policy.state
+
+    policy.clear_changes()
+
+    assert policy.state is not snapshot
+    assert snapshot.has_changes and not policy.state.has_changes
+
+
+def test_state_snapshot_is_read_only(policy):
+    snapshot = policy.state
+
+    with pytest.raises(AttributeError):
+        snapshot.downloaded = True
+    with pytest.raises(AttributeError):
+        snapshot.actual_insurance_state.email = 'changed@example.com'
+    assert policy.state.actual_insurance_state.email == ''
+
+
+def test_state_snapshot_does_not_share_insurance_states(policy):
+    snapshot = policy.state
+
+    assert snapshot.actual_insurance_state is not policy._state.actual_insurance_state
+    assert snapshot.insurance_states.get_by_reference(snapshot.actual_insurance_state.reference) \
+        is snapshot.actual_insurance_state
@@ -0,0 +1,70 @@
+import datetime as dt
+import random
+import types
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from insurance.domains.policy.dto import InsuranceNameEnum, PolicyStatusEnum, ProductTypeEnum
+from insurance.domains.policy.model.retention_reward_batch import RetentionRewardBatchCalc, RetentionRewardRow
+from insurance.domains.policy.model.retention_reward_calc import PolicyRetentionRewardCalc
+
+_SCALAR_CALC = {
+    PolicyStatusEnum.OPERATOR_ERROR: PolicyRetentionRewardCalc.calc_operator_error_reward,
+    PolicyStatusEnum.RESCINDED: PolicyRetentionRewardCalc.calc_rescinded_reward,
+    PolicyStatusEnum.REISSUED: PolicyRetentionRewardCalc.calc_reissued_reward,
+}
+
+
+def _random_row(rnd: random.Random) -> RetentionRewardRow:
+    cost = rnd.choice([rnd.randint(1, 500_000), 3, 7, 200, 400])
+    reward = rnd.choice([Decimal(0), Decimal(rnd.randint(0, 10_000_000)).scaleb(-2), Decimal('0.01'), Decimal('0.05')])
+    created_date = dt.date(2024, 1, 1) + dt.timedelta(days=rnd.randint(0, 365))
+    return RetentionRewardRow(
+        reference=uuid.uuid4(),
+        product=ProductTypeEnum.OSGPO_VTS,
+        insurance=rnd.choice(list(InsuranceNameEnum)),
+        status=rnd.choice(sorted(RetentionRewardBatchCalc.STATUSES, key=lambda status: status.value)),
+        reward=reward,
+        cost=cost,
+        # Refunds that put the amount on a half cent are the rounding edge
+        refund_amount=str(rnd.choice([rnd.randint(0, cost), cost // 2, 1, cost])),
+        with_inexperienced=rnd.random() < 0.3,
+        region_changed=rnd.random() < 0.3,
+        created_date=created_date,
+        operation_date=created_date + dt.timedelta(days=rnd.randint(0, 200)),
+    )
+
+
+def _scalar(row: RetentionRewardRow) -> Decimal:
+    state = types.SimpleNamespace(
+        product=row.product,
+        insurance=row.insurance,
+        reward=row.reward,
+        cost=row.cost,
+        created_time=dt.datetime.combine(row.created_date, dt.time(12)),
+        attributes=dict(refund_amount=row.refund_amount,
+                        with_inexperienced=row.with_inexperienced,
+                        region_changed=row.region_changed),
+    )
+    return _SCALAR_CALC[row.status](state=state, operation_date=row.operation_date)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_batch_calc_equals_scalar_calc(seed):
+    rnd = random.Random(seed)
+    rows = [_random_row(rnd) for _ in range(2_000)]
+
+    assert RetentionRewardBatchCalc.calc(rows) == [_scalar(row) for row in rows]
+
+
+def test_rejects_status_without_retention_reward():
+    row = _random_row(random.Random(0))._replace(status=PolicyStatusEnum.DRAFT)
+
+    with pytest.raises(ValueError):
+        RetentionRewardBatchCalc.calc([row])
+
+
+def test_empty_batch():
+    assert RetentionRewardBatchCalc.calc([]) == []
@@ -0,0 +1,51 @@
+import datetime as dt
+import uuid
+from copy import copy, deepcopy
+
+import pytest
+
+from insurance.domains.policy.dto import (
+    Document, DocumentCollection, DocumentType, PolicyStatusEnum, StatusHistory
+)
+from insurance.domains.policy.model.model_state import InsuranceStateCollection
+
+
+def test_state_entities_have_no_instance_dict(policy_state_factory):
+    state = policy_state_factory()
+    document = Document(reference=uuid.uuid4(), document_type=DocumentType.ACCRUE)
+
+    for obj in (state, state.actual_insurance_state, state.insurance_states, state.status_history,
+                document, DocumentCollection([document]), StatusHistory(), InsuranceStateCollection()):
+        assert not hasattr(obj, '__dict__'), type(obj).__name__
+
+
+def test_policy_state_copy_keeps_fields_and_separate_change_tracking(policy_state_factory):
+    state = policy_state_factory()
+    copied = copy(state)
+
+    assert (copied.reference, copied.reward, copied.insurance_states) == (state.reference, state.reward,
+                                                                          state.insurance_states)
+    copied.downloaded = True
+
+    assert copied.changed_fields == {'downloaded'}
+    assert state.changed_fields == frozenset()
+
+
+def test_insurance_state_deep_copy_keeps_tracking_flags(insurance_state_factory):
+    state = insurance_state_factory()
+    state.clear_changes()
+    state.email = 'changed@example.com'
+
+    copied = deepcopy(state)
+
+    assert (copied.reference, copied.email, copied.is_changed) == (state.reference, 'changed@example.com', True)
+    copied.set_status(PolicyStatusEnum.RESCINDED, timestamp=dt.datetime(2024, 2, 1))
+    assert state.status == PolicyStatusEnum.COMPLETED
+
+
+def test_frozen_insurance_state_rejects_writes(insurance_state_factory):
+    state = insurance_state_factory()
+    state.freeze()
+
+    with pytest.raises(AttributeError):
+        state.email = 'changed@example.com'
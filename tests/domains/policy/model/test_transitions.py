@@ -0,0 +1,30 @@
+import pytest
+
+from insurance.domains.policy.dto import PolicyStatusEnum
+from insurance.domains.policy.model.policy_states import ReissuedPolicyState, RestoredPolicyState
+from insurance.domains.policy.model.transitions import STATUS_TRANSITIONS, TRANSITIONS, get_transition
+
+
+def test_transitions_are_compiled_from_allowed_statuses():
+    expected = {(current, incoming)
+                for incoming, transition in STATUS_TRANSITIONS.items()
+                for current in transition.handler.ALLOWED_STATUSES}
+
+    assert set(TRANSITIONS) == expected
+
+
+def test_get_transition_returns_handler_of_incoming_status():
+    transition = get_transition(PolicyStatusEnum.COMPLETED, PolicyStatusEnum.REISSUED)
+
+    assert transition.handler is ReissuedPolicyState
+
+
+def test_get_transition_rejects_not_allowed_change():
+    with pytest.raises(ValueError, match=f'Not allowed status change from {PolicyStatusEnum.DRAFT} '
+                                         f'to {RestoredPolicyState.__name__}'):
+        get_transition(PolicyStatusEnum.DRAFT, PolicyStatusEnum.RESTORED)
+
+
+def test_get_transition_rejects_unknown_status():
+    with pytest.raises(ValueError, match='Policy unknown status to update'):
+        get_transition(PolicyStatusEnum.COMPLETED, PolicyStatusEnum.DRAFT)
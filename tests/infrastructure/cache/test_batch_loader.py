@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from insurance.infrastructure.cache import BatchLoader
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_sent_in_one_batch():
+    calls = []
+
+    async def load_many(keys):
+        calls.append(keys)
+        return {key: key * 10 for key in keys}
+
+    loader = BatchLoader(load_many)
+
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1)) == [10, 20, 10]
+    assert calls == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_by_max_batch_size():
+    calls = []
+
+    async def load_many(keys):
+        calls.append(keys)
+        return {key: key for key in keys}
+
+    loader = BatchLoader(load_many, max_batch_size=2)
+
+    await asyncio.gather(*[loader.load(key) for key in range(5)])
+    assert calls == [[0, 1], [2, 3], [4]]
+    assert loader.batches == 3
+
+
+@pytest.mark.asyncio
+async def test_missing_key_fails_with_not_found():
+    async def load_many(keys):
+        return {}
+
+    loader = BatchLoader(load_many, not_found=LookupError)
+
+    with pytest.raises(LookupError):
+        await loader.load(1)
+
+
+@pytest.mark.asyncio
+async def test_batch_tasks_are_kept_until_done():
+    release = asyncio.Event()
+
+    async def load_many(keys):
+        await release.wait()
+        return {key: key for key in keys}
+
+    loader = BatchLoader(load_many)
+    load = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert len(loader._tasks) == 1
+    release.set()
+    assert await load == 1
+    await asyncio.sleep(0)
+    assert not loader._tasks
@@ -0,0 +1,50 @@
+from insurance.infrastructure.cache import LRUCache
+from insurance.infrastructure.cache import lru
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(lru.time, 'monotonic', clock)
+    cache = LRUCache(ttl=10)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=30)
+
+    clock.now = 10
+    assert cache.get('a') == 1
+    clock.now = 10.5
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    assert len(cache) == 1
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats.evictions == 1
+
+
+def test_pop_and_clear():
+    cache = LRUCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'missing') == 'missing'
+    cache.clear()
+    assert len(cache) == 0
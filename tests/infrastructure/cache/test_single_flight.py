@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from insurance.infrastructure.cache import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = asyncio.Event()
+
+    async def load():
+        calls.append(True)
+        await release.wait()
+        return 'person'
+
+    callers = [asyncio.ensure_future(flight.do('key', load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*callers) == ['person'] * 3
+    assert len(calls) == 1
+    assert flight.coalesced == 2
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return 'person'
+
+    first = asyncio.ensure_future(flight.do('key', load))
+    second = asyncio.ensure_future(flight.do('key', load))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == 'person'
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_error_is_shared_and_next_call_starts_again():
+    flight = SingleFlight()
+    results = iter([RuntimeError('failed'), 'person'])
+
+    async def load():
+        await asyncio.sleep(0)
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    failed = await asyncio.gather(flight.do('key', load), flight.do('key', load), return_exceptions=True)
+
+    assert [type(error) for error in failed] == [RuntimeError, RuntimeError]
+    assert await flight.do('key', load) == 'person'
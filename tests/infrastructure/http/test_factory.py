@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from insurance.infrastructure.http import HttpClientFactory, UpstreamConfig
+
+
+@pytest.mark.asyncio
+async def test_factory_keeps_one_pooled_client_per_upstream(stub_server):
+    factory = HttpClientFactory({'person_domain': UpstreamConfig(base_url=stub_server.url, max_connections=4)})
+    try:
+        client = factory.client('person_domain')
+        assert factory.client('person_domain') is client
+
+        for _ in range(3):
+            await asyncio.gather(*[client.get('/') for _ in range(4)])
+
+        stats = factory.stats()['person_domain']
+        assert (stats.requests, stats.in_flight, stats.peak_in_flight) == (12, 0, 4)
+        assert stub_server.connections == 4
+    finally:
+        await factory.aclose()
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_holds_connection_until_closed(stub_server):
+    factory = HttpClientFactory({'upstream': UpstreamConfig(base_url=stub_server.url)})
+    try:
+        client = factory.client('upstream')
+        stats = factory.stats()['upstream']
+        async with client.stream('GET', '/') as response:
+            assert stats.in_flight == 1
+            await response.aread()
+        assert stats.in_flight == 0
+    finally:
+        await factory.aclose()
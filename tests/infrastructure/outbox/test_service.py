@@ -0,0 +1,149 @@
+import asyncio
+import contextlib
+import json
+import types
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from insurance.database.policy.table import SCHEMA_NAME, OutboxEventTable
+from insurance.domains.policy.events.events import PolicyCompletedEvent, UpdatePolicyStatusEvent
+from insurance.infrastructure.outbox import OutboxDispatcherService
+from insurance.infrastructure.outbox.statement import Statement
+from insurance.repository.policy.converter import Converter
+
+
+class _Connection:
+    def __init__(self, engine):
+        self._engine = engine
+
+    async def execute(self, stmt, params):
+        self._engine.statements.append((stmt, params))
+        if stmt is Statement.claim_events:
+            return types.SimpleNamespace(fetchall=lambda: self._engine.rows)
+
+
+class _Engine:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    @contextlib.asynccontextmanager
+    async def begin(self):
+        yield _Connection(self)
+
+
+class _MessageBus:
+    def __init__(self, fail=()):
+        self.handled = []
+        self._fail = fail
+
+    async def handle(self, event):
+        if event.reference in self._fail:
+            raise RuntimeError('handler failed')
+        self.handled.append(event)
+
+
+def _rows(policy, events, attempts=1):
+    payloads = Converter.outbox_events(policy, events)['payloads']
+    return [types.SimpleNamespace(id=index, aggregate_reference=policy.reference,
+                                  payload=json.loads(payload), attempts=attempts)
+            for index, payload in enumerate(payloads, start=1)]
+
+
+def test_outbox_payload_restores_event():
+    event = PolicyCompletedEvent(reference=uuid.uuid4(), insurance_reference='123')
+    policy = types.SimpleNamespace(reference=event.reference)
+
+    [row] = _rows(policy, [event])
+
+    assert row.payload['type'] == 'insurance-product.PolicyCompletedEvent'
+    assert row.payload['reference'] == str(event.__reference__)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_deletes_handled_events():
+    event = UpdatePolicyStatusEvent(reference=uuid.uuid4(), channel_id='web')
+    engine, bus = _Engine(_rows(types.SimpleNamespace(reference=event.reference), [event])), _MessageBus()
+    dispatcher = OutboxDispatcherService(engine, bus)
+
+    assert await dispatcher.dispatch() == 1
+
+    [handled] = bus.handled
+    assert (type(handled), handled.__reference__, handled.reference) == (type(event), event.__reference__,
+                                                                          event.reference)
+    assert engine.statements[-1] == (Statement.delete_events, dict(ids=[1]))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('attempts, expected', [
+    (2, []),
+    (3, [(Statement.dead_letter_events, dict(ids=[1]))]),
+])
+async def test_failed_event_is_dead_lettered_after_max_attempts(attempts, expected):
+    reference = uuid.uuid4()
+    event = UpdatePolicyStatusEvent(reference=reference, channel_id='web')
+    engine = _Engine(_rows(types.SimpleNamespace(reference=reference), [event], attempts=attempts))
+    dispatcher = OutboxDispatcherService(engine, _MessageBus(fail={reference}), max_attempts=3)
+
+    await dispatcher.dispatch()
+
+    assert engine.statements[1:] == expected
+
+
+@pytest.mark.asyncio
+async def test_start_switches_outbox_on():
+    repository = type('Repository', (), dict(outbox=False))
+    dispatcher = OutboxDispatcherService(_Engine([]), _MessageBus(), repositories=[repository], poll_interval=60)
+
+    await dispatcher.start()
+    try:
+        assert repository.outbox is True
+    finally:
+        await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_polls_again_while_events_are_claimed(monkeypatch):
+    claims = [3, 1, 1, 0]
+    drained = asyncio.Event()
+
+    async def dispatch(self):
+        claimed = claims.pop(0)
+        if not claims:
+            drained.set()
+        return claimed
+
+    monkeypatch.setattr(OutboxDispatcherService, 'dispatch', dispatch)
+    dispatcher = OutboxDispatcherService(_Engine([]), _MessageBus(), poll_interval=60)
+
+    await dispatcher.start()
+    try:
+        await asyncio.wait_for(drained.wait(), 1)
+    finally:
+        await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_events_with_earlier_undelivered_event(engine):
+    reference, other = uuid.uuid4(), uuid.uuid4()
+    async with engine.begin() as conn:
+        await conn.execute(text(f'create schema if not exists {SCHEMA_NAME}'))
+        await conn.run_sync(OutboxEventTable.drop, checkfirst=True)
+        await conn.run_sync(OutboxEventTable.create)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("set local search_path to insurances_policy"))
+            await conn.execute(text("""
+            insert into outbox_event(aggregate_reference, payload)
+            values (:reference, '{}'), (:reference, '{}'), (:other, '{}')
+            """), dict(reference=reference, other=other))
+            first = await conn.execute(Statement.claim_events, dict(lease=60, batch_size=10))
+            second = await conn.execute(Statement.claim_events, dict(lease=60, batch_size=10))
+
+        assert sorted(row.id for row in first.fetchall()) == [1, 3]
+        assert second.fetchall() == []
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(OutboxEventTable.drop)
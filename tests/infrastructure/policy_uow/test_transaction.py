@@ -0,0 +1,143 @@
+import contextlib
+
+import pytest
+
+from insurance.infrastructure.policy_uow import UOWTransaction
+
+
+class FakeConnection:
+    def __init__(self, fail_commit: bool = False):
+        self.fail_commit = fail_commit
+        self.calls = []
+
+    async def begin(self):
+        self.calls.append('begin')
+
+    async def commit(self):
+        self.calls.append('commit')
+        if self.fail_commit:
+            raise RuntimeError('commit failed')
+
+    async def rollback(self):
+        self.calls.append('rollback')
+
+    async def close(self):
+        self.calls.append('close')
+
+
+class FakeEngine:
+    def __init__(self, connection: FakeConnection):
+        self.conn = connection
+        self.connects = 0
+        self.begins = 0
+
+    async def connect(self):
+        self.connects += 1
+        return self.conn
+
+    @contextlib.asynccontextmanager
+    async def begin(self):
+        self.begins += 1
+        yield FakeConnection()
+
+
+@pytest.mark.asyncio
+async def test_connection_is_opened_once_with_transaction():
+    engine = FakeEngine(FakeConnection())
+    transaction = UOWTransaction(engine)
+
+    assert not transaction.in_transaction
+    assert await transaction.connection() is engine.conn
+    assert await transaction.connection() is engine.conn
+    assert transaction.in_transaction
+    assert engine.connects == 1
+    assert engine.conn.calls == ['begin']
+
+
+@pytest.mark.asyncio
+async def test_begin_reuses_open_connection():
+    engine = FakeEngine(FakeConnection())
+    transaction = UOWTransaction(engine)
+
+    async with transaction.begin() as conn:
+        assert conn is not engine.conn
+    assert engine.begins == 1
+
+    await transaction.connection()
+    async with transaction.begin() as conn:
+        assert conn is engine.conn
+    assert engine.begins == 1
+
+
+@pytest.mark.asyncio
+async def test_commit_callbacks_run_after_commit():
+    engine = FakeEngine(FakeConnection())
+    transaction = UOWTransaction(engine)
+    called = []
+
+    async def callback():
+        called.append(list(engine.conn.calls))
+
+    await transaction.connection()
+    transaction.on_commit(callback)
+    await transaction.commit()
+
+    assert called == [['begin', 'commit', 'close']]
+    assert not transaction.in_transaction
+
+
+@pytest.mark.asyncio
+async def test_failed_callback_does_not_stop_the_rest():
+    transaction = UOWTransaction(FakeEngine(FakeConnection()))
+    called = []
+
+    async def failed():
+        raise RuntimeError()
+
+    async def callback():
+        called.append(True)
+
+    await transaction.connection()
+    transaction.on_commit(failed)
+    transaction.on_commit(callback)
+    await transaction.commit()
+
+    assert called == [True]
+
+
+@pytest.mark.asyncio
+async def test_commit_callbacks_are_dropped_on_rollback():
+    engine = FakeEngine(FakeConnection())
+    transaction = UOWTransaction(engine)
+    called = []
+
+    async def callback():
+        called.append(True)
+
+    await transaction.connection()
+    transaction.on_commit(callback)
+    await transaction.rollback()
+    await transaction.connection()
+    await transaction.commit()
+
+    assert called == []
+    assert engine.conn.calls == ['begin', 'rollback', 'close', 'begin', 'commit', 'close']
+
+
+@pytest.mark.asyncio
+async def test_commit_callbacks_are_dropped_on_failed_commit():
+    engine = FakeEngine(FakeConnection(fail_commit=True))
+    transaction = UOWTransaction(engine)
+    called = []
+
+    async def callback():
+        called.append(True)
+
+    await transaction.connection()
+    transaction.on_commit(callback)
+    with pytest.raises(RuntimeError):
+        await transaction.commit()
+
+    assert called == []
+    assert engine.conn.calls == ['begin', 'commit', 'close']
+    assert not transaction.in_transaction
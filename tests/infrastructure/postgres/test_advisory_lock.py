@@ -0,0 +1,33 @@
+import pytest
+from aioredlock import LockError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from insurance.infrastructure.postgres import AdvisoryLockClient
+
+
+class _ExhaustedEngine:
+    async def connect(self):
+        raise PoolTimeoutError('QueuePool limit reached')
+
+
+@pytest.mark.asyncio
+async def test_lock_fails_when_lock_pool_is_exhausted():
+    client = AdvisoryLockClient(_ExhaustedEngine())
+
+    with pytest.raises(LockError):
+        await client.lock('policy')
+
+
+@pytest.mark.asyncio
+async def test_lock_is_exclusive_until_released(engine):
+    client = AdvisoryLockClient(engine, acquire_timeout=0.2)
+
+    lock = await client.lock('advisory-lock-test')
+    try:
+        assert await client.is_locked('advisory-lock-test')
+        with pytest.raises(LockError):
+            await client.lock('advisory-lock-test')
+    finally:
+        await lock.release()
+
+    assert not await client.is_locked('advisory-lock-test')
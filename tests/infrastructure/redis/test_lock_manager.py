@@ -0,0 +1,52 @@
+import asyncio
+import types
+
+import pytest
+from aioredlock import LockError
+
+from insurance.infrastructure.redis import RedlockManager
+
+
+class _Client:
+    def __init__(self):
+        self.locked = []
+
+    async def lock(self, resource, lock_identifier=None, lock_timeout=60):
+        self.locked.append(resource)
+        client = self
+
+        async def release():
+            client.locked.remove(resource)
+
+        return types.SimpleNamespace(valid=True, release=release)
+
+
+@pytest.mark.asyncio
+async def test_waiters_of_resource_are_queued_locally():
+    client = _Client()
+    manager = RedlockManager(client)
+
+    lock = await manager.lock('policy')
+    waiter = asyncio.ensure_future(manager.lock('policy'))
+    await asyncio.sleep(0)
+
+    assert not waiter.done()
+    await lock.release()
+    await (await waiter).release()
+
+    assert client.locked == []
+    assert (manager.stats.acquired, manager.stats.contended) == (2, 1)
+    assert manager._local == {}
+
+
+@pytest.mark.asyncio
+async def test_local_wait_fails_after_acquire_timeout():
+    manager = RedlockManager(_Client(), acquire_timeout=0.01)
+
+    lock = await manager.lock('policy')
+    with pytest.raises(LockError):
+        await manager.lock('policy')
+    assert manager.stats.failed == 1
+
+    await lock.release()
+    assert manager._local == {}
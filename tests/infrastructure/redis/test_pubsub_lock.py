@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from aioredlock import LockError
+
+from insurance.infrastructure.redis import PubSubLockClient
+
+fakeredis = pytest.importorskip('fakeredis')
+# Release is a lua script, fakeredis runs scripts with lupa
+pytest.importorskip('lupa')
+
+
+@pytest_asyncio.fixture
+async def lock_client():
+    client = PubSubLockClient(fakeredis.FakeAsyncRedis(), acquire_timeout=5)
+    try:
+        yield client
+    finally:
+        await client.destroy()
+
+
+@pytest.mark.asyncio
+async def test_waiter_wakes_on_release(lock_client):
+    lock = await lock_client.lock('policy', lock_timeout=30)
+    waiter = asyncio.ensure_future(lock_client.lock('policy', lock_timeout=30))
+    await asyncio.sleep(0.1)
+    assert not waiter.done()
+
+    started = time.monotonic()
+    await lock.release()
+    acquired = await asyncio.wait_for(waiter, 1)
+
+    assert time.monotonic() - started < 1
+    assert acquired.valid and await lock_client.is_locked(acquired)
+    assert not lock_client._waiters
+
+
+@pytest.mark.asyncio
+async def test_expired_lock_is_taken_over(lock_client):
+    await lock_client.lock('policy', lock_timeout=0.3)
+
+    started = time.monotonic()
+    lock = await asyncio.wait_for(lock_client.lock('policy', lock_timeout=30), 2)
+
+    assert 0.2 < time.monotonic() - started < 2
+    assert await lock_client.is_locked(lock)
+
+
+@pytest.mark.asyncio
+async def test_acquire_timeout():
+    client = PubSubLockClient(fakeredis.FakeAsyncRedis(), acquire_timeout=0.2)
+    try:
+        await client.lock('policy', lock_timeout=30)
+
+        started = time.monotonic()
+        with pytest.raises(LockError):
+            await client.lock('policy', lock_timeout=30)
+
+        assert time.monotonic() - started < 1
+        assert not client._waiters
+    finally:
+        await client.destroy()
+
+
+@pytest.mark.asyncio
+async def test_listener_is_shared_and_resubscribes(lock_client):
+    first = await lock_client.lock('first', lock_timeout=30)
+    second = await lock_client.lock('second', lock_timeout=30)
+    waiters = [asyncio.ensure_future(lock_client.lock(resource, lock_timeout=30)) for resource in ('first', 'second')]
+    await asyncio.sleep(0.1)
+    listener = lock_client._listener
+
+    await first.release()
+    await asyncio.wait_for(waiters[0], 1)
+    assert lock_client._listener is listener
+
+    # Subscription is lost, the next waiter subscribes again and is still woken by the release
+    listener.cancel()
+    await asyncio.gather(listener, return_exceptions=True)
+    third = asyncio.ensure_future(lock_client.lock('second', lock_timeout=30))
+    await asyncio.sleep(0.1)
+    assert lock_client._listener is not listener
+
+    # Both waiters of the resource are woken, one of them takes the lock and the other waits for its release
+    await second.release()
+    done, pending = await asyncio.wait([waiters[1], third], timeout=1, return_when=asyncio.FIRST_COMPLETED)
+    assert len(done) == 1
+    await done.pop().result().release()
+    await asyncio.wait_for(pending.pop(), 1)
@@ -0,0 +1,80 @@
+import json
+import time
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from insurance.integrations.policy.person_domain import ClientDomainService, PersonDomainSDK
+
+_PERSON = dict(iin='990101300123', surname='Surname', name='Name', reference=str(uuid.uuid4()),
+               id_document=None, driver_license=None, required_id_document=False, can_drive_car=True,
+               phone=None, required_phone_number=None)
+
+_REQUESTS = 50
+
+
+@pytest.fixture
+def person_server(stub_server):
+    stub_server.body = json.dumps(dict(status='OK', data=[_PERSON])).encode()
+    return stub_server
+
+
+async def _mean_latency(get_client) -> float:
+    started = time.perf_counter()
+    for _ in range(_REQUESTS):
+        person = await get_client()
+        assert str(person.reference) == _PERSON['reference']
+    return (time.perf_counter() - started) / _REQUESTS
+
+
+@pytest.mark.asyncio
+async def test_service_reuses_one_connection(person_server):
+    service = ClientDomainService(base_url=person_server.url, timeout=5)
+    try:
+        await _mean_latency(lambda: service.client.get_client(iin=None, reference=uuid.UUID(_PERSON['reference'])))
+    finally:
+        await service.stop()
+
+    assert (person_server.requests, person_server.connections) == (_REQUESTS, 1)
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_is_faster_than_client_per_request(person_server):
+    """
+    Latency of the pooled service client against a client opened per request, as the SDK did before
+    """
+    reference = uuid.UUID(_PERSON['reference'])
+
+    async def per_request():
+        sdk = PersonDomainSDK()
+        sdk.set_session(AsyncClient(base_url=person_server.url, timeout=5))
+        try:
+            return await sdk.get_client(iin=None, reference=reference)
+        finally:
+            await sdk.aclose()
+
+    service = ClientDomainService(base_url=person_server.url, timeout=5)
+    try:
+        pooled = await _mean_latency(lambda: service.client.get_client(iin=None, reference=reference))
+    finally:
+        await service.stop()
+    per_request_latency = await _mean_latency(per_request)
+
+    print(f'pooled {pooled * 1000:.3f}ms, client per request {per_request_latency * 1000:.3f}ms')
+    assert pooled < per_request_latency
+    assert person_server.connections == 1 + _REQUESTS
+
+
+@pytest.mark.asyncio
+async def test_stop_closes_only_own_session(person_server):
+    session = AsyncClient(base_url=person_server.url, timeout=5)
+    injected = ClientDomainService(base_url=person_server.url, timeout=5, session=session)
+    own = ClientDomainService(base_url=person_server.url, timeout=5)
+
+    await injected.stop()
+    await own.stop()
+
+    assert not session.is_closed
+    assert own.client._session.is_closed
+    await session.aclose()
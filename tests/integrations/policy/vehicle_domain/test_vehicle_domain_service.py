@@ -0,0 +1,69 @@
+import json
+import time
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from insurance.integrations.policy.vehicle_domain import VehicleDomainService
+from insurance.integrations.policy.vehicle_domain.sdk import VehicleDomainSDK
+
+_VEHICLE = dict(reference=str(uuid.uuid4()), registration_number='123ABC02', mark='Mark', model='Model',
+                region_id=2, ts_type=1)
+
+_REQUESTS = 50
+
+
+@pytest.fixture
+def vehicle_server(stub_server):
+    stub_server.body = json.dumps(dict(status='OK', data=_VEHICLE)).encode()
+    return stub_server
+
+
+async def _mean_latency(get_vehicle) -> float:
+    started = time.perf_counter()
+    for _ in range(_REQUESTS):
+        vehicle = await get_vehicle()
+        assert str(vehicle.reference) == _VEHICLE['reference']
+    return (time.perf_counter() - started) / _REQUESTS
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_is_faster_than_client_per_request(vehicle_server):
+    """
+    Latency of the pooled service client against a client opened per request, as the SDK did before
+    """
+    reference = uuid.UUID(_VEHICLE['reference'])
+
+    async def per_request():
+        sdk = VehicleDomainSDK()
+        sdk.set_session(AsyncClient(base_url=vehicle_server.url, timeout=5))
+        try:
+            return await sdk.get_vehicle(registration_number=None, reference=reference)
+        finally:
+            await sdk.aclose()
+
+    service = VehicleDomainService(base_url=vehicle_server.url, timeout=5)
+    try:
+        pooled = await _mean_latency(lambda: service.client.get_vehicle(registration_number=None, reference=reference))
+    finally:
+        await service.stop()
+    per_request_latency = await _mean_latency(per_request)
+
+    print(f'pooled {pooled * 1000:.3f}ms, client per request {per_request_latency * 1000:.3f}ms')
+    assert pooled < per_request_latency
+    assert vehicle_server.connections == 1 + _REQUESTS
+
+
+@pytest.mark.asyncio
+async def test_stop_closes_only_own_session(vehicle_server):
+    session = AsyncClient(base_url=vehicle_server.url, timeout=5)
+    injected = VehicleDomainService(base_url=vehicle_server.url, timeout=5, session=session)
+    own = VehicleDomainService(base_url=vehicle_server.url, timeout=5)
+
+    await injected.stop()
+    await own.stop()
+
+    assert not session.is_closed
+    assert own.client._session.is_closed
+    await session.aclose()
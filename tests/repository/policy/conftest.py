@@ -0,0 +1,25 @@
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from insurance.database.policy import metadata
+from insurance.database.policy.table import SCHEMA_NAME
+
+
+@pytest_asyncio.fixture
+async def policy_engine(engine):
+    """
+    Engine on freshly created policy tables, statements resolve them through the search path
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text(f'drop schema if exists {SCHEMA_NAME} cascade'))
+        await conn.execute(text(f'create schema {SCHEMA_NAME}'))
+        await conn.run_sync(metadata.create_all)
+    policy_engine = create_async_engine(engine.url,
+                                        connect_args=dict(server_settings=dict(search_path=SCHEMA_NAME)))
+    try:
+        yield policy_engine
+    finally:
+        await policy_engine.dispose()
+        async with engine.begin() as conn:
+            await conn.execute(text(f'drop schema {SCHEMA_NAME} cascade'))
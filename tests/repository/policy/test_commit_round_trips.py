@@ -0,0 +1,84 @@
+import contextlib
+import types
+
+import pytest
+
+from insurance.infrastructure.policy_uow import UOWTransaction
+from insurance.repository.policy.repository import PolicyRepository
+from insurance.repository.policy.statement import Statement
+
+
+class _Connection:
+    def __init__(self, engine: '_Engine'):
+        self._engine = engine
+
+    async def execute(self, stmt, params):
+        self._engine.statements.append(stmt)
+        return types.SimpleNamespace(fetchone=lambda: types.SimpleNamespace(version=len(self._engine.statements)))
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        self._engine.commits += 1
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class _Engine:
+    """
+    Counts pool checkouts, commits and statements
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.commits = 0
+        self.statements = []
+
+    async def connect(self):
+        self.checkouts += 1
+        return _Connection(self)
+
+    @contextlib.asynccontextmanager
+    async def begin(self):
+        self.checkouts += 1
+        yield _Connection(self)
+        self.commits += 1
+
+    def reset(self):
+        self.checkouts, self.commits, self.statements = 0, 0, []
+
+
+@pytest.mark.asyncio
+async def test_commit_takes_one_connection_and_one_transaction(monkeypatch, new_policy_factory):
+    """
+    Round trips of create_policy and a status update. Before the unit of work shared one connection,
+    every statement of a write took its own checkout and commit, 5-8 per commit
+    """
+    engine = _Engine()
+    policy = new_policy_factory()
+
+    repository = PolicyRepository(UOWTransaction(engine))
+    repository.add(policy)
+    await repository.apply_changes()
+    await repository._connection.commit()
+    created = (engine.checkouts, engine.commits, len(engine.statements))
+    assert engine.statements == [Statement.create_policy]
+
+    engine.reset()
+    monkeypatch.setattr(PolicyRepository, '_decode', lambda self, row: policy)
+    repository = PolicyRepository(UOWTransaction(engine))
+    loaded = await repository.get(policy.reference)
+    loaded.set_insurance_info('ins-1', 'https://insurance.kz/pay')
+    await repository.apply_changes()
+    await repository._connection.commit()
+    updated = (engine.checkouts, engine.commits, len(engine.statements))
+
+    print(f'create_policy: {created}, status update: {updated} (checkouts, commits, statements)')
+    assert created == (1, 1, 1)
+    # The read and the write, both one statement in their own transaction
+    assert updated == (2, 2, 2)
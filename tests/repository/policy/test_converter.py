@@ -0,0 +1,172 @@
+import datetime as dt
+import gc
+import time
+import tracemalloc
+import uuid
+from types import SimpleNamespace
+
+from insurance.repository.policy.converter import Converter
+
+REFERENCE = uuid.uuid4()
+STATE_REFERENCES = [uuid.uuid4(), uuid.uuid4()]
+DOCUMENT_REFERENCE = uuid.uuid4()
+ITEM_REFERENCES = [uuid.uuid4(), uuid.uuid4()]
+INSURER_REFERENCE = uuid.uuid4()
+LEAD_REFERENCE = uuid.uuid4()
+CREATOR_REFERENCE = uuid.uuid4()
+
+
+def _policy_columns(**kwargs) -> dict:
+    return dict(
+        reference=REFERENCE,
+        product='osgpo-vts',
+        insurance='eurasia',
+        channel='web',
+        phone='77000000000',
+        prev_global_id='prev-1',
+        downloaded=False,
+        premium=10_000,
+        cost=9_000,
+        reward='1000.00',
+        retention_reward=None,
+        conditions=['no-claims'],
+        status='COMPLETED',
+        attributes={'source': 'test'},
+        lead_reference=LEAD_REFERENCE,
+        creator_reference=CREATOR_REFERENCE,
+        period_type='year',
+        period_value=1,
+        actual_insurance_state=STATE_REFERENCES[1],
+        created_time=dt.datetime(2024, 1, 1),
+        updated_time=dt.datetime(2024, 1, 2),
+        version=3,
+    ) | kwargs
+
+
+def _json_row(details_loaded: bool = True) -> SimpleNamespace:
+    insurance_states = [
+        dict(reference=str(reference), begin_date=begin_date, email='a@b.kz', payment_type=2,
+             redirect_url=None, insurance_reference=f'ins-{index}', global_id=f'gid-{index}', status=status,
+             document_collection=documents)
+        for index, (reference, begin_date, status, documents) in enumerate(zip(
+            STATE_REFERENCES,
+            ['2023-01-01', '2024-01-01'],
+            ['COMPLETED', 'COMPLETED'],
+            [[], [dict(reference=str(DOCUMENT_REFERENCE), type='ACCRUE', status='CONFIRMED')]],
+        ))
+    ]
+    return SimpleNamespace(**_policy_columns(
+        details_loaded=details_loaded,
+        insurance_states=insurance_states,
+        structure=[dict(item_reference=str(ITEM_REFERENCES[0]), type='driver', title='Driver',
+                        attrs=dict(iin='900101300000', is_privileged=True)),
+                   dict(item_reference=str(ITEM_REFERENCES[1]), type='vehicle', title='Vehicle',
+                        attrs=dict(registration_number='777AAA01'))],
+        insurer=dict(reference=str(INSURER_REFERENCE), is_privileged=False, title='Eurasia'),
+    ))
+
+
+def _typed_row(details_loaded: bool = True) -> SimpleNamespace:
+    return SimpleNamespace(**_policy_columns(
+        details_loaded=details_loaded,
+        state_references=STATE_REFERENCES,
+        state_begin_dates=[dt.date(2023, 1, 1), dt.date(2024, 1, 1)],
+        state_emails=['a@b.kz', 'a@b.kz'],
+        state_payment_types=[2, 2],
+        state_redirect_urls=[None, None],
+        state_insurance_references=['ins-0', 'ins-1'],
+        state_global_ids=['gid-0', 'gid-1'],
+        state_statuses=['COMPLETED', 'COMPLETED'],
+        document_state_references=[STATE_REFERENCES[1]],
+        document_references=[DOCUMENT_REFERENCE],
+        document_types=['ACCRUE'],
+        document_statuses=['CONFIRMED'],
+        structure_item_references=ITEM_REFERENCES,
+        structure_types=['driver', 'vehicle'],
+        structure_titles=['Driver', 'Vehicle'],
+        structure_attrs=[dict(iin='900101300000', is_privileged=True), dict(registration_number='777AAA01')],
+        insurer_reference=INSURER_REFERENCE,
+        insurer_is_privileged=False,
+        insurer_title='Eurasia',
+    ))
+
+
+def test_typed_row_decodes_to_the_same_policy_as_json_row():
+    from_json = Converter.get_policy(_json_row())
+    typed = Converter.get_policy_typed(_typed_row())
+
+    assert Converter.dump_policy(typed) == Converter.dump_policy(from_json)
+    assert typed.state.structure == from_json.state.structure
+    assert typed.state.insurer == from_json.state.insurer
+    assert getattr(typed, '__version') == 3
+
+
+def test_typed_row_without_details():
+    from_json = Converter.get_policy(_json_row(details_loaded=False))
+    typed = Converter.get_policy_typed(_typed_row(details_loaded=False))
+
+    assert not typed.details_loaded and not from_json.details_loaded
+    assert [state.reference for state in typed.state.insurance_states.states] == STATE_REFERENCES
+    assert typed.state.actual_insurance_state.reference == from_json.state.actual_insurance_state.reference
+
+
+def test_typed_rows_keep_order():
+    rows = [_typed_row(), _typed_row(details_loaded=False)]
+
+    policies = Converter.get_policies_typed(rows)
+
+    assert [policy.details_loaded for policy in policies] == [True, False]
+
+
+_DECODES = 500
+
+_ROUNDS = 7
+
+
+def _decode_time(decode, row) -> float:
+    started = time.perf_counter()
+    for _ in range(_DECODES):
+        decode(row)
+    return (time.perf_counter() - started) / _DECODES
+
+
+def test_typed_row_decode_time():
+    """
+    Time of one aggregate decode from the json row and from the typed row. Rounds are interleaved and
+    the best one is taken, the least disturbed by the rest of the machine. Most of the time goes to the
+    aggregate itself, shared by both paths, so the typed row only has to be no slower
+    """
+    json_row, typed_row = _json_row(), _typed_row()
+    from_json, typed = float('inf'), float('inf')
+    for _ in range(_ROUNDS):
+        from_json = min(from_json, _decode_time(Converter.get_policy, json_row))
+        typed = min(typed, _decode_time(Converter.get_policy_typed, typed_row))
+
+    print(f'json {from_json * 1e6:.1f}us, typed {typed * 1e6:.1f}us per aggregate')
+    assert typed < from_json * 1.25
+
+
+_BATCH = 10_000
+
+
+def test_loaded_aggregate_size():
+    """
+    Memory held by one aggregate and by a batch of aggregates loaded from the cached form,
+    each of them decoded into its own objects
+    """
+    data = Converter.dump_policy(Converter.get_policy_typed(_typed_row()))
+    Converter.load_policy(data)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        started = tracemalloc.get_traced_memory()[0]
+        policy = Converter.load_policy(data)
+        single = tracemalloc.get_traced_memory()[0] - started
+        batch = [Converter.load_policy(data) for _ in range(_BATCH)]
+        batch_size = tracemalloc.get_traced_memory()[0] - started - single
+    finally:
+        tracemalloc.stop()
+
+    print(f'{single} bytes per aggregate, {batch_size / 2 ** 20:.1f}MiB per {_BATCH} aggregates')
+    assert policy.details_loaded and len(batch) == _BATCH
+    assert batch_size / _BATCH < 12_000
@@ -0,0 +1,83 @@
+import uuid
+
+import pytest
+
+from insurance.domains.policy.dto import Document, DocumentCollection, DocumentStatus, DocumentType
+from insurance.domains.policy.model import Policy
+from insurance.repository.policy.converter import Converter
+from insurance.repository.policy.repository import PolicyRepository
+from insurance.repository.policy.statement import Statement
+
+_POLICY_COLUMNS = ('downloaded', 'premium', 'cost', 'reward', 'retention_reward', 'status', 'conditions',
+                   'attributes', 'actual_insurance_state')
+_CHILD_ARRAYS = ('policy_record_statuses', 'state_references', 'state_record_statuses', 'document_references')
+
+
+def _loaded(policy: Policy) -> Policy:
+    setattr(policy, '__version', 1)
+    return policy
+
+
+def _written_children(params: dict) -> set:
+    return {name for name in _CHILD_ARRAYS if params[name]}
+
+
+def test_pdf_downloaded_writes_only_downloaded(policy):
+    policy = _loaded(policy)
+
+    policy.set_pdf_downloaded()
+    params = Converter.update_policy(policy)
+    sql = Statement.update_policy(tuple(sorted(policy.state.changed_fields))).text
+
+    assert policy.state.changed_fields == {'downloaded'}
+    assert [column for column in _POLICY_COLUMNS if column in params] == ['downloaded']
+    assert _written_children(params) == set()
+    assert 'downloaded=:downloaded' in sql
+    assert not [column for column in _POLICY_COLUMNS if f'{column}=:{column}' in sql and column != 'downloaded']
+
+
+def test_confirm_accrue_reward_writes_only_documents(insurance_state_factory, policy_state_factory):
+    document = Document(reference=uuid.uuid4(), document_type=DocumentType.ACCRUE, status=DocumentStatus.CREATED)
+    state = insurance_state_factory(document_collection=DocumentCollection(documents=[document]))
+    policy = _loaded(Policy.restore(policy_state_factory(state)))
+
+    policy.confirm_accrue_reward(state.insurance_reference)
+    params = Converter.update_policy(policy)
+
+    assert policy.state.changed_fields == frozenset()
+    assert [column for column in _POLICY_COLUMNS if column in params] == []
+    assert _written_children(params) == {'document_references'}
+    assert params['document_references'] == [document.reference]
+    assert params['document_statuses'] == [DocumentStatus.CONFIRMED.value]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_policy_is_not_written(monkeypatch, policy):
+    statements = []
+
+    async def execute(self, stmt, params):
+        statements.append(stmt)
+
+    monkeypatch.setattr(PolicyRepository, '_execute', execute)
+    repository = PolicyRepository(None)
+
+    await repository._update_policy(_loaded(policy))
+
+    assert statements == []
+
+
+def test_restore_and_clear_changes_reset_tracking(policy_state_factory):
+    state = policy_state_factory()
+    assert not state.has_changes
+    assert state.changed_fields == frozenset()
+
+    policy = _loaded(Policy.restore(state))
+    policy.set_pdf_downloaded()
+    policy.create_accrue_reward(policy.state.insurance_reference, uuid.uuid4())
+    assert policy.state.has_changes
+
+    policy.clear_changes()
+
+    assert not policy.state.has_changes
+    assert policy.state.changed_fields == frozenset()
+    assert _written_children(Converter.update_policy(policy)) == set()
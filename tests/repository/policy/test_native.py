@@ -0,0 +1,144 @@
+import time
+import uuid
+
+import orjson
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from insurance.infrastructure.policy_uow import UOWTransaction
+from insurance.repository.policy import native
+from insurance.repository.policy.repository import PolicyRepository
+from insurance.repository.policy.statement import Statement
+
+
+def test_compile_statement_numbers_parameters_in_order():
+    stmt = text("select :b, cast(:a as jsonb), :b::text where x = any(cast(:c as uuid[]))")
+
+    sql, names = native.compile_statement(stmt)
+
+    assert sql == "select $1, cast($2 as jsonb), $1::text where x = any(cast($3 as uuid[]))"
+    assert names == ('b', 'a', 'c')
+
+
+def test_compile_statement_is_cached():
+    stmt = text("select :a")
+
+    assert native.compile_statement(stmt) is native.compile_statement(stmt)
+
+
+def test_result_reads_rows_once():
+    result = native.Result([(1, 'a'), (2, 'b')])
+
+    assert result.fetchone() == (1, 'a')
+    assert result.fetchall() == [(2, 'b')]
+    assert result.fetchone() is None
+
+
+def test_scalar_of_empty_result_is_none():
+    assert native.Result([]).scalar() is None
+
+
+class _Connection:
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, stmt, params):
+        self.calls.append(('execute', stmt.text, params))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('native_backend, expected', [
+    (False, ('execute', 'select :a, :b', dict(b=2, a=1))),
+    (True, ('native', 'select :a, :b', dict(b=2, a=1))),
+])
+async def test_run_selects_backend(monkeypatch, native_backend, expected):
+    monkeypatch.setattr(PolicyRepository, 'native_backend', native_backend)
+    repository = PolicyRepository.__new__(PolicyRepository)
+    conn = _Connection()
+
+    async def execute(conn, stmt, params):
+        conn.calls.append(('native', stmt.text, params))
+
+    monkeypatch.setattr(native, 'execute', execute)
+    await repository._run(conn, text('select :a, :b'), dict(b=2, a=1))
+
+    assert conn.calls == [expected]
+
+
+@pytest.mark.asyncio
+async def test_native_write_is_rolled_back_with_transaction(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("drop table if exists native_rollback_test"))
+        await conn.execute(text("create table native_rollback_test (value int)"))
+    try:
+        transaction = UOWTransaction(engine)
+        conn = await transaction.connection()
+        await native.execute(conn, text("insert into native_rollback_test values (:value)"), dict(value=1))
+        await transaction.rollback()
+
+        async with engine.connect() as conn:
+            count = await native.execute(conn, text("select count(*) from native_rollback_test"), {})
+            assert count.scalar() == 0
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("drop table native_rollback_test"))
+
+
+@pytest.mark.asyncio
+async def test_native_rows_have_attribute_access(engine):
+    async with engine.begin() as conn:
+        result = await native.execute(conn, text("select cast(:a as int) as a, :b as b"), dict(a=1, b='x'))
+        row = result.fetchone()
+
+    assert (row.a, row.b) == (1, 'x')
+    with pytest.raises(AttributeError):
+        row.c
+
+
+@pytest.mark.asyncio
+async def test_json_is_decoded_with_orjson_codecs(engine, monkeypatch):
+    monkeypatch.setattr(PolicyRepository, 'native_backend', False)
+    engine = create_async_engine(engine.url)
+    PolicyRepository.use_native_backend(engine)
+    decoded, loads = [], orjson.loads
+    monkeypatch.setattr(orjson, 'loads', lambda value: decoded.append(value) or loads(value))
+    try:
+        async with engine.begin() as conn:
+            result = await native.execute(conn, text("select cast(:value as jsonb) as value, json_build_object('a', 1)"),
+                                          dict(value=dict(b=[1, 2])))
+            row = result.fetchone()
+    finally:
+        await engine.dispose()
+
+    assert PolicyRepository.native_backend
+    assert (row.value, row[1]) == (dict(b=[1, 2]), dict(a=1))
+    assert len(decoded) == 2
+
+
+_CALLS = 2000
+
+
+@pytest.mark.asyncio
+async def test_native_backend_per_call_overhead(policy_engine):
+    """
+    Mean time of one version lookup through sqlalchemy and through the native backend on the same connection
+    """
+    params = dict(reference=uuid.uuid4())
+    async with policy_engine.begin() as conn:
+        # Both paths prepare the statement on the first call
+        await conn.execute(Statement.get_policy_version, params)
+        await native.execute(conn, Statement.get_policy_version, params)
+
+        started = time.perf_counter()
+        for _ in range(_CALLS):
+            (await conn.execute(Statement.get_policy_version, params)).scalar()
+        sqlalchemy_call = (time.perf_counter() - started) / _CALLS
+
+        started = time.perf_counter()
+        for _ in range(_CALLS):
+            (await native.execute(conn, Statement.get_policy_version, params)).scalar()
+        native_call = (time.perf_counter() - started) / _CALLS
+
+    print(f'sqlalchemy {sqlalchemy_call * 1e6:.1f}us, native {native_call * 1e6:.1f}us per call')
+    assert native_call < sqlalchemy_call
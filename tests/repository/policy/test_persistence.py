@@ -0,0 +1,137 @@
+import datetime as dt
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from insurance.domains.policy.dto import DocumentStatus, PolicyStatusEnum, StatusInfo
+from insurance.domains.policy.exceptions import PolicyAlreadyUpdatedError
+from insurance.infrastructure.policy_uow import UOWTransaction
+from insurance.repository.policy.converter import Converter
+from insurance.repository.policy.repository import PolicyRepository
+from insurance.repository.policy.statement import Statement
+
+_COUNTS = text("""
+select (select count(*) from policy_status_record where policy_reference = :reference) policy_records,
+       (select count(*) from insurance_state where policy_reference = :reference) states,
+       (select count(*)
+        from insurance_state_status_record record
+                 join insurance_state state on state.reference = record.insurance_state_reference
+        where state.policy_reference = :reference) state_records,
+       (select count(*)
+        from fin_document document
+                 join insurance_state state on state.reference = document.insurance_state_reference
+        where state.policy_reference = :reference) documents,
+       (select count(*) from structure_item where policy_reference = :reference) structure,
+       (select count(*) from insurer where policy_reference = :reference) insurers,
+       (select version from policy where reference = :reference) version
+""")
+
+
+async def _counts(conn, reference: uuid.UUID) -> dict:
+    cursor = await conn.execute(_COUNTS, dict(reference=reference))
+    return cursor.fetchone()._asdict()
+
+
+async def _save(engine, policy, repository: PolicyRepository = None):
+    repository = repository or PolicyRepository(UOWTransaction(engine))
+    repository.add(policy)
+    await repository.apply_changes()
+    await repository._connection.commit()
+
+
+async def _load(engine, reference: uuid.UUID):
+    repository = PolicyRepository(UOWTransaction(engine))
+    return repository, await repository.get(reference)
+
+
+def _complete(policy, offer, insurance_reference: str = 'ins-1'):
+    policy.set_insurance_info(insurance_reference, 'https://insurance.kz/pay')
+    policy.update_status(StatusInfo(status_type=PolicyStatusEnum.COMPLETED_IN_INSURANCE,
+                                    timestamp=dt.datetime(2024, 1, 1, 12),
+                                    insurance_reference=insurance_reference,
+                                    global_id='global-1'))
+    policy.update_offer(offer, insurance_reference)
+
+
+@pytest.mark.asyncio
+async def test_create_writes_policy_with_children(policy_engine, new_policy_factory):
+    policy = new_policy_factory()
+
+    await _save(policy_engine, policy)
+
+    async with policy_engine.connect() as conn:
+        counts = await _counts(conn, policy.reference)
+    state = policy.state
+    assert counts == dict(policy_records=len(state.status_history.records),
+                          states=1,
+                          state_records=len(state.actual_insurance_state.status_history.records),
+                          documents=0,
+                          structure=len(state.structure),
+                          insurers=1,
+                          version=1)
+    _, loaded = await _load(policy_engine, policy.reference)
+    assert Converter.dump_policy(loaded) == Converter.dump_policy(policy)
+
+
+@pytest.mark.asyncio
+async def test_update_writes_changed_states_documents_and_records(policy_engine, new_policy_factory, offer_factory):
+    policy = new_policy_factory()
+    await _save(policy_engine, policy)
+
+    repository, loaded = await _load(policy_engine, policy.reference)
+    _complete(loaded, offer_factory())
+    document_reference = uuid.uuid4()
+    loaded.create_accrue_reward('ins-1', document_reference)
+    await _save(policy_engine, loaded, repository)
+
+    repository, loaded = await _load(policy_engine, policy.reference)
+    assert loaded.state.status == PolicyStatusEnum.COMPLETED
+    assert loaded.state.insurance_reference == 'ins-1'
+    assert loaded.state.global_id == 'global-1'
+    assert loaded.accrue_reward_document.reference == document_reference
+    assert getattr(loaded, '__version') == 2
+
+    loaded.confirm_accrue_reward('ins-1')
+    await _save(policy_engine, loaded, repository)
+
+    _, loaded = await _load(policy_engine, policy.reference)
+    async with policy_engine.connect() as conn:
+        counts = await _counts(conn, policy.reference)
+    assert loaded.accrue_reward_document.status == DocumentStatus.CONFIRMED
+    assert counts['version'] == 3
+    assert counts['documents'] == 1
+    assert counts['policy_records'] == len(loaded.state.status_history.records)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_update_fails_version_check(policy_engine, new_policy_factory):
+    policy = new_policy_factory()
+    await _save(policy_engine, policy)
+    first_repository, first = await _load(policy_engine, policy.reference)
+    second_repository, second = await _load(policy_engine, policy.reference)
+
+    first.set_pdf_downloaded()
+    await _save(policy_engine, first, first_repository)
+    second.set_pdf_downloaded()
+
+    with pytest.raises(PolicyAlreadyUpdatedError):
+        await _save(policy_engine, second, second_repository)
+    await second_repository._connection.rollback()
+
+
+@pytest.mark.asyncio
+async def test_children_are_not_written_when_version_check_fails(policy_engine, new_policy_factory, offer_factory):
+    policy = new_policy_factory()
+    await _save(policy_engine, policy)
+    _, loaded = await _load(policy_engine, policy.reference)
+    _complete(loaded, offer_factory())
+    loaded.create_accrue_reward('ins-1', uuid.uuid4())
+    setattr(loaded, '__version', 99)
+
+    async with policy_engine.begin() as conn:
+        before = await _counts(conn, policy.reference)
+        cursor = await conn.execute(Statement.update_policy(tuple(sorted(loaded.state.changed_fields))),
+                                    Converter.update_policy(loaded))
+        assert cursor.fetchone() is None
+        assert await _counts(conn, policy.reference) == before
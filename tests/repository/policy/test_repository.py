@@ -0,0 +1,137 @@
+import contextlib
+import types
+import uuid
+
+import pytest
+
+from insurance.domains.policy.abstractions import PolicyLoadProfile
+from insurance.domains.policy.exceptions import PolicyDetailsNotLoadedError, PolicyNotFoundError
+from insurance.domains.policy.model import Policy
+from insurance.repository.policy.converter import Converter
+from insurance.repository.policy.repository import PolicyRepository
+from insurance.repository.policy.statement import Statement
+
+
+class _Transaction:
+    in_transaction = False
+
+    @contextlib.asynccontextmanager
+    async def begin(self):
+        yield None
+
+
+@pytest.mark.asyncio
+async def test_unknown_insurance_reference_is_looked_up_again(monkeypatch):
+    calls = []
+
+    async def run(self, conn, stmt, params):
+        calls.append(params)
+        return types.SimpleNamespace(fetchone=lambda: None)
+
+    monkeypatch.setattr(PolicyRepository, '_run', run)
+    repository = PolicyRepository(_Transaction())
+
+    for _ in range(2):
+        with pytest.raises(PolicyNotFoundError):
+            await repository.get_by_insurance_reference('unknown', profile=PolicyLoadProfile.STATUS)
+
+    assert calls == [dict(insurance_reference='unknown')] * 2
+
+
+class _Cache:
+    def __init__(self, policies):
+        self._policies = policies
+
+    async def get(self, reference, version):
+        cached_version, policy = self._policies.get(reference, (None, None))
+        return policy if cached_version == version else None
+
+
+@pytest.mark.asyncio
+async def test_get_many_serves_current_versions_from_cache(monkeypatch, policy_state_factory):
+    cached = Policy.restore(policy_state_factory(details=True))
+    stale = Policy.restore(policy_state_factory(details=True))
+    loaded = Policy.restore(policy_state_factory(details=True, reference=stale.reference))
+    calls = []
+
+    async def run(self, conn, stmt, params):
+        calls.append(stmt)
+        if stmt is Statement.get_policy_versions:
+            rows = [types.SimpleNamespace(reference=cached.reference, version=2),
+                    types.SimpleNamespace(reference=stale.reference, version=2)]
+        else:
+            assert params == dict(references=[stale.reference])
+            rows = ['row']
+        return types.SimpleNamespace(fetchall=lambda: rows)
+
+    monkeypatch.setattr(PolicyRepository, '_run', run)
+    monkeypatch.setattr(PolicyRepository, 'cache', _Cache({cached.reference: (2, cached), stale.reference: (1, stale)}))
+    monkeypatch.setattr(Converter, 'get_policies', classmethod(lambda cls, rows: [loaded]))
+    repository = PolicyRepository(_Transaction())
+
+    policies = await repository.get_many([cached.reference, stale.reference])
+
+    assert len(policies) == 2
+    assert policies[0] is cached and policies[1] is loaded
+    assert calls[0] is Statement.get_policy_versions and len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_many_keeps_order_of_references(monkeypatch, policy_state_factory):
+    first, second = (Policy.restore(policy_state_factory(details=True)) for _ in range(2))
+    unknown = uuid.uuid4()
+    calls = []
+
+    async def run(self, conn, stmt, params):
+        calls.append(params)
+        return types.SimpleNamespace(fetchall=lambda: ['row'])
+
+    monkeypatch.setattr(PolicyRepository, '_run', run)
+    # Rows come back in table order, not in the order of references
+    monkeypatch.setattr(Converter, 'get_policies', classmethod(lambda cls, rows: [first, second]))
+    repository = PolicyRepository(_Transaction())
+
+    policies = await repository.get_many([second.reference, unknown, first.reference, second.reference])
+
+    assert len(policies) == 2
+    assert policies[0] is second and policies[1] is first
+    assert calls == [dict(references=[second.reference, unknown, first.reference])]
+
+
+def test_details_of_status_loaded_policy_are_not_readable(policy_state_factory):
+    state = policy_state_factory()
+
+    with pytest.raises(PolicyDetailsNotLoadedError):
+        state.structure
+    with pytest.raises(PolicyDetailsNotLoadedError):
+        Policy.restore(state).state.insurer
+
+
+@pytest.mark.asyncio
+async def test_status_loaded_policy_is_completed_in_place(monkeypatch, policy_state_factory):
+    loaded = Policy.restore(policy_state_factory())
+    details = policy_state_factory(details=True, reference=loaded.reference)
+    decoded = [loaded, Policy.restore(details)]
+    statements = []
+
+    async def run(self, conn, stmt, params):
+        statements.append(stmt)
+        return types.SimpleNamespace(fetchone=lambda: 'row', fetchall=lambda: ['row'])
+
+    monkeypatch.setattr(PolicyRepository, '_run', run)
+    monkeypatch.setattr(PolicyRepository, '_decode', lambda self, row: decoded.pop(0))
+    repository = PolicyRepository(_Transaction())
+
+    policy = await repository.get(loaded.reference, profile=PolicyLoadProfile.STATUS)
+    policy.set_pdf_downloaded()
+    assert await repository.get(loaded.reference, profile=PolicyLoadProfile.STATUS) is policy
+    assert len(statements) == 1
+
+    assert await repository.get(loaded.reference) is policy
+    assert await repository.get(loaded.reference) is policy
+    assert statements[1] is Statement.select_policies('references', typed=False, details=True)
+    assert len(statements) == 2
+    assert policy.details_loaded
+    assert policy.state.structure == details.structure
+    assert policy.state.insurer == details.insurer
+    assert policy.state.downloaded and policy.state.changed_fields == {'downloaded'}
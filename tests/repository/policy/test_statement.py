@@ -0,0 +1,104 @@
+import datetime as dt
+import typing as t
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from insurance.repository.policy.converter import Converter
+from insurance.repository.policy.statement import Statement
+
+
+async def _insert_policy(conn, documents: int) -> uuid.UUID:
+    reference, state_reference = uuid.uuid4(), uuid.uuid4()
+    now = dt.datetime(2024, 1, 1)
+    await conn.execute(text("""
+    insert into policy(reference, product, insurance, channel, phone, downloaded, premium, cost, reward, status,
+                       attributes, lead_reference, creator_reference, period_type, period_value,
+                       actual_insurance_state, created_time, updated_time, version, conditions)
+    values (:reference, 'osgpo-vts', 'eurasia', 'web', '77000000000', false, 100, 100, 10, 'COMPLETED',
+            '{}', :reference, :reference, 'year', 1, :state_reference, :now, :now, 1, '{}')
+    """), dict(reference=reference, state_reference=state_reference, now=now))
+    await conn.execute(text("""
+    insert into insurance_state(reference, policy_reference, begin_date, end_date, payment_type, status)
+    values (:state_reference, :reference, '2024-01-01', '2025-01-01', 2, 'COMPLETED')
+    """), dict(reference=reference, state_reference=state_reference))
+    for _ in range(documents):
+        await conn.execute(text("""
+        insert into fin_document(reference, insurance_state_reference, type, status)
+        values (:document_reference, :state_reference, 'ACCRUE', 'CONFIRMED')
+        """), dict(document_reference=uuid.uuid4(), state_reference=state_reference))
+    return reference
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('typed', [False, True])
+async def test_policy_is_loaded_with_own_fin_documents(policy_engine, typed):
+    async with policy_engine.begin() as conn:
+        reference = await _insert_policy(conn, documents=1)
+        await _insert_policy(conn, documents=3)
+
+        cursor = await conn.execute(Statement.select_policies('reference', typed=typed, details=False),
+                                    dict(reference=reference))
+        rows = cursor.fetchall()
+
+    assert len(rows) == 1
+    policy = Converter.get_policy_typed(rows[0]) if typed else Converter.get_policy(rows[0])
+    assert policy.reference == reference
+    assert len(policy.state.actual_insurance_state.document_collection.documents) == 1
+
+
+_POLICIES = 1000
+
+_DOCUMENTS = 1_000_000
+
+
+async def _seed(conn):
+    """
+    Policies with one insurance state each and documents spread over the states
+    """
+    await conn.execute(text("""
+    insert into policy(reference, product, insurance, channel, phone, downloaded, premium, cost, reward, status,
+                       attributes, lead_reference, creator_reference, period_type, period_value,
+                       actual_insurance_state, created_time, updated_time, version, conditions)
+    select md5('policy' || i)::uuid, 'osgpo-vts', 'eurasia', 'web', '77000000000', false, 100, 100, 10, 'COMPLETED',
+           '{}', md5('policy' || i)::uuid, md5('policy' || i)::uuid, 'year', 1, md5('state' || i)::uuid,
+           now(), now(), 1, '{}'
+    from generate_series(1, :policies) i
+    """), dict(policies=_POLICIES))
+    await conn.execute(text("""
+    insert into insurance_state(reference, policy_reference, begin_date, end_date, payment_type, status)
+    select md5('state' || i)::uuid, md5('policy' || i)::uuid, '2024-01-01', '2025-01-01', 2, 'COMPLETED'
+    from generate_series(1, :policies) i
+    """), dict(policies=_POLICIES))
+    await conn.execute(text("""
+    insert into fin_document(reference, insurance_state_reference, type, status)
+    select md5('document' || i)::uuid, md5('state' || (i % :policies + 1))::uuid, 'ACCRUE', 'CONFIRMED'
+    from generate_series(1, :documents) i
+    """), dict(policies=_POLICIES, documents=_DOCUMENTS))
+    await conn.execute(text('analyze'))
+
+
+def _scans(plan: dict) -> t.Iterator[dict]:
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from _scans(child)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('typed', [False, True])
+async def test_fin_documents_are_read_by_index(policy_engine, typed):
+    """
+    Plan regression check: documents of the loaded policy are looked up by the state index,
+    the document table is never scanned whole
+    """
+    async with policy_engine.begin() as conn:
+        await _seed(conn)
+        stmt = Statement.select_policies('reference', typed=typed, details=True)
+        reference = (await conn.execute(text("select md5('policy1')::uuid"))).scalar()
+        cursor = await conn.execute(text(f'explain (format json) {stmt.text}'), dict(reference=reference))
+        plan = cursor.scalar()[0]['Plan']
+
+    document_scans = [node['Node Type'] for node in _scans(plan) if node.get('Relation Name') == 'fin_document']
+    assert document_scans
+    assert set(document_scans) <= {'Index Scan', 'Index Only Scan', 'Bitmap Heap Scan'}